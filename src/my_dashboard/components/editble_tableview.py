@@ -1,11 +1,14 @@
 import csv
 import tkinter as tk
+from contextlib import nullcontext
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import CENTER, INFO, PRIMARY, SUCCESS, E, W
 from ttkbootstrap.tableview import Tableview
 from ttkbootstrap.toast import ToastNotification
 
+from ..utils.io_worker import get_io_worker
+
 
 class EditableTableView(Tableview):
     """
@@ -221,33 +224,81 @@ class EditableTableView(Tableview):
         self.rowdata = [tuple(r.values) for r in self.tablerows]
         return row
 
-    def save_to_csv(self, filepath, include_headers=True, encoding="utf-8"):
-        """Simpan isi tabel ke CSV."""
+    def snapshot(self):
+        """Ambil isi tabel saat ini sebagai list tuple."""
         snapshot = [tuple(row.values) for row in self.tablerows]
         self.rowdata = snapshot
+        return snapshot
+
+    @staticmethod
+    def write_csv(filepath, headers, rows, encoding="utf-8"):
+        """Tulis header (opsional) dan baris ke file CSV."""
+        with open(filepath, "w", encoding=encoding, newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            if headers:
+                writer.writerow(headers)
+            writer.writerows(rows)
+
+    def save_to_csv(self, filepath, include_headers=True, encoding="utf-8"):
+        """Simpan isi tabel ke CSV."""
+        snapshot = self.snapshot()
+        headers = self._col_headers if include_headers else None
+
+        try:
+            self.write_csv(filepath, headers, snapshot, encoding)
+        except OSError as exc:
+            self._notify_save_failed(filepath, exc)
+            raise IOError(f"Gagal menulis CSV ke {filepath!r}: {exc}") from exc
+        self._notify_saved(filepath)
+
+    async def save_to_csv_async(
+        self,
+        filepath,
+        include_headers=True,
+        encoding="utf-8",
+        after_write=None,
+        lock=None,
+    ):
+        """Simpan isi tabel ke CSV lewat antrean I/O latar belakang.
+
+        ``after_write(rows)`` dijalankan di thread I/O setelah file ditulis.
+        ``lock`` (opsional) dipegang selama penulisan, agar pembaca lain
+        tidak membaca file yang baru setengah ditulis.
+        Penyimpanan berulang ke file yang sama yang masih mengantre digabung.
+        """
+        snapshot = self.snapshot()
+        headers = self._col_headers if include_headers else None
+
+        def write():
+            with lock or nullcontext():
+                self.write_csv(filepath, headers, snapshot, encoding)
+                if after_write is not None:
+                    after_write(snapshot)
 
         try:
-            with open(filepath, "w", encoding=encoding, newline="") as csvfile:
-                writer = csv.writer(csvfile)
-                if include_headers and self._col_headers:
-                    writer.writerow(self._col_headers)
-                writer.writerows(snapshot)
-                ToastNotification(
-                    title="Information",
-                    message=f"Data berhasil disimpan ke {filepath!r}",
-                    bootstyle="success",
-                    duration=3000,
-                    alert=True,
-                ).show_toast()
+            await get_io_worker().run(write, key=("csv", str(filepath)))
         except OSError as exc:
-            ToastNotification(
-                title="Error",
-                message=f"Gagal menulis CSV ke {filepath!r}: {exc}",
-                bootstyle="danger",
-                duration=3000,
-                alert=True,
-            ).show_toast()
+            self._notify_save_failed(filepath, exc)
             raise IOError(f"Gagal menulis CSV ke {filepath!r}: {exc}") from exc
+        self._notify_saved(filepath)
+
+    def _notify_saved(self, filepath):
+        ToastNotification(
+            title="Information",
+            message=f"Data berhasil disimpan ke {filepath!r}",
+            bootstyle="success",
+            duration=3000,
+            alert=True,
+        ).show_toast()
+
+    def _notify_save_failed(self, filepath, exc):
+        ToastNotification(
+            title="Error",
+            message=f"Gagal menulis CSV ke {filepath!r}: {exc}",
+            bootstyle="danger",
+            duration=3000,
+            alert=True,
+        ).show_toast()
 
     def load_from_csv(self, filepath, has_headers=True, encoding="utf-8"):
         """Muat data tabel dari CSV."""
@@ -1,23 +1,261 @@
-import pandas as pd
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from datetime import date
+from typing import Callable, Optional, Sequence
+
 import ttkbootstrap as ttk
-from .editble_tableview import EditableTableView
+from async_tkinter_loop import async_handler
+from ttkbootstrap.constants import BOTH, LEFT, PRIMARY, RIGHT, TOP, W, X, Y, YES
+from ttkbootstrap.toast import ToastNotification
+
+from ..services.card_service import CardPage, CardRecord
+
+SHIFT_VALUES = ["", "Shift 1", "Shift 2", "Shift 3"]
+
+# (field, heading, width)
+COLUMNS = (
+    ("tanggal", "Tanggal", 90),
+    ("shift", "Shift", 65),
+    ("lu", "LU", 55),
+    ("user", "User", 90),
+    ("issue", "Issue", 200),
+    ("detail", "Detail", 200),
+    ("action", "Action", 200),
+    ("saved_at", "Disimpan", 140),
+)
 
 
 class HistoryWindow(ttk.Toplevel):
-    def __init__(self, master: ttk.Window):
+    """Saved issue cards, newest first, loaded page by page while scrolling.
+
+    ``query`` is :meth:`CardStore.query` (or anything with the same
+    keyword arguments), so filtering happens in the database. ``query`` and
+    ``count`` run in a worker thread and rows are inserted when they come
+    back; results of a search that has been replaced are dropped. At most
+    ``max_pages`` pages are kept in the table: scrolling down drops pages
+    from the top and scrolling back up reloads them, so memory stays the
+    same however many cards are stored.
+    """
+
+    def __init__(
+        self,
+        master: ttk.Window,
+        query: Callable[..., CardPage],
+        *,
+        count: Optional[Callable[..., int]] = None,
+        link_up_values: Sequence[str] = (),
+        page_size: int = 100,
+        max_pages: int = 5,
+    ):
         super().__init__(master)
-        self.title("History Window")
-        self.geometry("400x300")
-        ttk.Label(self, text="This is the history window").pack(pady=20)
-        self.history_data = pd.read_csv("history_data.csv")  # Example data source
-        self.history_table = EditableTableView(
-            self,
-            coldata=["Column 1", "Column 2", "Column 3"],
-            rowdata=[
-                ["Row1-Col1", "Row1-Col2", "Row1-Col3"],
-                ["Row2-Col1", "Row2-Col2", "Row2-Col3"],
-                ["Row3-Col1", "Row3-Col2", "Row3-Col3"],
-                ["Row4-Col1", "Row4-Col2", "Row4-Col3"],
-            ],
+        self.title("Riwayat Card")
+        self.geometry("1100x560")
+
+        self._query = query
+        self._count = count
+        self._page_size = max(1, page_size)
+        self._max_pages = max(2, max_pages)
+        self._filters: dict[str, str] = {}
+
+        # (cursor the page was loaded with, its tree items), top to bottom.
+        self._pages: deque[tuple[Optional[int], list[str]]] = deque()
+        # Cursors of pages dropped above the window, last dropped on top.
+        self._dropped: list[Optional[int]] = []
+        self._next_cursor: Optional[int] = None
+        self._loading = False
+        # Bumped by every search so late results of an older one are dropped.
+        self._generation = 0
+
+        self._create_filters(link_up_values)
+        self._create_table()
+        self.search()
+
+    # ------------------------------------------------------------------
+    # Widgets ----------------------------------------------------------
+    # ------------------------------------------------------------------
+    def _create_filters(self, link_up_values: Sequence[str]) -> None:
+        bar = ttk.Frame(self, padding=(10, 10, 10, 0))
+        bar.pack(side=TOP, fill=X)
+
+        def labelled(text: str, widget_cls, **kwargs):
+            ttk.Label(bar, text=text).pack(side=LEFT, padx=(0, 4))
+            widget = widget_cls(bar, **kwargs)
+            widget.pack(side=LEFT, padx=(0, 10))
+            return widget
+
+        self.lu = labelled("LU", ttk.Combobox, values=["", *link_up_values], width=8)
+        self.date_from = labelled("Dari", ttk.Entry, width=11)
+        self.date_to = labelled("Sampai", ttk.Entry, width=11)
+        self.shift = labelled(
+            "Shift", ttk.Combobox, values=SHIFT_VALUES, width=8, state="readonly"
+        )
+        self.user = labelled("User", ttk.Entry, width=12)
+
+        for entry in (self.date_from, self.date_to, self.user):
+            entry.bind("<Return>", lambda _event: self.search())
+        for combo in (self.lu, self.shift):
+            combo.bind("<<ComboboxSelected>>", lambda _event: self.search())
+
+        ttk.Button(
+            bar, text="Cari", bootstyle=PRIMARY, command=self.search, cursor="hand2"
+        ).pack(side=LEFT)
+        self.status = ttk.Label(bar, text="")
+        self.status.pack(side=RIGHT)
+
+    def _create_table(self) -> None:
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(side=TOP, fill=BOTH, expand=YES)
+
+        self._scrollbar = ttk.Scrollbar(frame, orient="vertical")
+        self._scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree = ttk.Treeview(
+            frame,
+            columns=[field for field, _, _ in COLUMNS],
+            show="headings",
+            yscrollcommand=self._on_scroll,
+        )
+        for field, heading, width in COLUMNS:
+            self.tree.heading(field, text=heading, anchor=W)
+            self.tree.column(field, width=width, anchor=W, stretch=field != "saved_at")
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+        self._scrollbar.configure(command=self.tree.yview)
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def search(self) -> None:
+        """Apply the filter bar and show the newest matching cards."""
+
+        filters = {
+            "lu": self.lu.get().strip(),
+            "date_from": self.date_from.get().strip(),
+            "date_to": self.date_to.get().strip(),
+            "shift": self.shift.get().strip(),
+            "user": self.user.get().strip(),
+        }
+        for key in ("date_from", "date_to"):
+            if filters[key]:
+                try:
+                    date.fromisoformat(filters[key])
+                except ValueError:
+                    ToastNotification(
+                        title="Peringatan",
+                        message="Format tanggal harus YYYY-MM-DD.",
+                        bootstyle="warning",
+                        duration=3000,
+                    ).show_toast()
+                    return
+        self._filters = {key: value for key, value in filters.items() if value}
+
+        self._generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self._pages.clear()
+        self._dropped.clear()
+        self._next_cursor = None
+        self.status.configure(text="Memuat...")
+        self._load_first()
+
+    @async_handler
+    async def _load_first(self) -> None:
+        generation, filters = self._generation, dict(self._filters)
+        if await self._load_page(None, at_end=True):
+            self.tree.yview_moveto(0)
+
+        text = ""
+        if self._count is not None:
+            total = await asyncio.to_thread(self._count, **filters)
+            text = f"{total} baris"
+        if generation == self._generation and self.winfo_exists():
+            self.status.configure(text=text)
+
+    # ------------------------------------------------------------------
+    # Paging -----------------------------------------------------------
+    # ------------------------------------------------------------------
+    def _on_scroll(self, first: str, last: str) -> None:
+        self._scrollbar.set(first, last)
+        if self._loading:
+            return
+        if float(last) >= 0.95 and self._next_cursor is not None:
+            self.after_idle(self._load_next)
+        elif float(first) <= 0.05 and self._dropped:
+            self.after_idle(self._load_previous)
+
+    @async_handler
+    async def _load_next(self) -> None:
+        if self._loading or self._next_cursor is None:
+            return
+        anchor = self._top_item()
+        if not await self._load_page(self._next_cursor, at_end=True):
+            return
+        if len(self._pages) > self._max_pages:
+            cursor, items = self._pages.popleft()
+            self.tree.delete(*items)
+            self._dropped.append(cursor)
+            self._keep_in_view(anchor)
+
+    @async_handler
+    async def _load_previous(self) -> None:
+        if self._loading or not self._dropped:
+            return
+        anchor = self._top_item()
+        if not await self._load_page(self._dropped.pop(), at_end=False):
+            return
+        if len(self._pages) > self._max_pages:
+            cursor, items = self._pages.pop()
+            self.tree.delete(*items)
+            # Scrolling down again reloads the page just dropped.
+            self._next_cursor = cursor
+        self._keep_in_view(anchor)
+
+    async def _load_page(self, cursor: Optional[int], *, at_end: bool) -> bool:
+        """Fetch one page off the Tk thread and insert it.
+
+        ``_loading`` stays set until the rows are in, so scrolling does not
+        ask for the same page again. Returns False when the result was
+        dropped because a new search started or the window was closed.
+        """
+
+        generation = self._generation
+        self._loading = True
+        try:
+            page = await asyncio.to_thread(
+                self._query, **self._filters, limit=self._page_size, before=cursor
+            )
+            if generation != self._generation or not self.winfo_exists():
+                return False
+            items = [
+                self.tree.insert(
+                    "", "end" if at_end else offset, values=_record_values(record)
+                )
+                for offset, record in enumerate(page.records)
+            ]
+            if at_end:
+                self._pages.append((cursor, items))
+                self._next_cursor = page.next_cursor
+            else:
+                self._pages.appendleft((cursor, items))
+            return True
+        finally:
+            if generation == self._generation:
+                self._loading = False
+
+    def _top_item(self) -> str:
+        return self.tree.identify_row(1)
+
+    def _keep_in_view(self, item: str) -> None:
+        children = self.tree.get_children()
+        if item and self.tree.exists(item) and children:
+            self.tree.yview_moveto(self.tree.index(item) / len(children))
+
+
+def _record_values(record: CardRecord) -> tuple[str, ...]:
+    return tuple(
+        (
+            record.saved_at.isoformat(sep=" ", timespec="seconds")
+            if field == "saved_at"
+            else getattr(record, field)
         )
-        self.history_table.pack(fill="both", expand=True)
+        for field, _, _ in COLUMNS
+    )
@@ -106,6 +106,34 @@ class Sidebar(ttk.Frame):
             pass
         self.btn_get_data.pack(side=TOP, padx=10, pady=(5, 10))
 
+        # Auto refresh toggle for the running shift
+        self.auto_refresh = ttk.BooleanVar(value=False)
+        self.chk_auto_refresh = ttk.Checkbutton(
+            self,
+            text="Auto Refresh",
+            variable=self.auto_refresh,
+            bootstyle="success-round-toggle",
+            cursor="hand2",
+        )
+        ToolTip(
+            self.chk_auto_refresh,
+            "Perbarui data shift berjalan secara otomatis",
+            delay=0,
+        )
+        self.chk_auto_refresh.pack(side=TOP, padx=10, pady=(0, 10), anchor=W)
+
+        # Backfill button for multi-day history
+        self.btn_backfill = self._create_button(
+            "Backfill", PRIMARY, "Ambil riwayat beberapa hari untuk line ini"
+        )
+        self.btn_backfill.pack(side=TOP, padx=10, pady=(0, 10))
+
+        # Saved issue cards
+        self.btn_history = self._create_button(
+            "History", PRIMARY, "Lihat riwayat card yang tersimpan"
+        )
+        self.btn_history.pack(side=TOP, padx=10, pady=(0, 10))
+
         # # Link Up combobox
         # self.func_location = ttk.Combobox(
         #     self,
@@ -1,4 +1,7 @@
+from typing import Callable, ContextManager, Optional, Sequence
+
 import ttkbootstrap as ttk
+from async_tkinter_loop import async_handler
 from ttkbootstrap.constants import BOTH, SUCCESS
 from ttkbootstrap.tooltip import ToolTip
 
@@ -7,7 +10,12 @@ from ..utils.csvhandle import load_targets_df
 
 
 class TargetEditor(ttk.Toplevel):
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        on_save: Optional[Callable[[str, Sequence[str], list], None]] = None,
+        write_lock: Optional[ContextManager] = None,
+    ):
         super().__init__()
         self.title("Target Editor")
         self.resizable(False, False)
@@ -17,6 +25,11 @@ class TargetEditor(ttk.Toplevel):
         columns = target_df.columns.to_list()
         data = target_df.values.tolist()
 
+        self._file_path = file_path
+        self._columns = columns
+        self._on_save = on_save
+        self._write_lock = write_lock
+
         table = EditableTableView(
             self,
             coldata=columns,
@@ -27,13 +40,27 @@ class TargetEditor(ttk.Toplevel):
         table.pack(fill=BOTH, expand=False, padx=10, pady=10)
 
         table.load_from_csv(file_path)
+        self._table = table
 
         save_btn = ttk.Button(
             self,
             text="Save",
-            command=lambda: table.save_to_csv(file_path),
+            command=async_handler(self._save),
             bootstyle=SUCCESS,
         )
         save_btn.pack(pady=5)
 
         ToolTip(save_btn, "Save")
+
+    async def _save(self) -> None:
+        def after_write(rows) -> None:
+            if self._on_save is not None:
+                self._on_save(self._file_path, self._columns, rows)
+
+        try:
+            await self._table.save_to_csv_async(
+                self._file_path, after_write=after_write, lock=self._write_lock
+            )
+        except IOError:
+            # Already reported by the table.
+            pass
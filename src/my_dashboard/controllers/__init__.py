@@ -1,5 +1,17 @@
 """Controller layer for coordinating dashboard interactions."""
 
-from .dashboard_controller import DashboardController, ControllerError
+from .dashboard_controller import (
+    BackfillReport,
+    CircuitOpenError,
+    ControllerError,
+    DashboardController,
+    PlanReport,
+)
 
-__all__ = ["DashboardController", "ControllerError"]
+__all__ = [
+    "BackfillReport",
+    "CircuitOpenError",
+    "ControllerError",
+    "DashboardController",
+    "PlanReport",
+]
@@ -2,6 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as clock_time, timedelta
 from typing import Callable, Iterable, Optional, Sequence
 
 import httpx
@@ -12,15 +18,102 @@ from ..services.achievement_service import (
     fetch_actual_metrics,
     load_target_shift,
 )
-from ..services.card_service import append_cards_to_csv, build_card_rows
-from ..services.spa_service import SPADataProcessor
+from ..services.card_service import (
+    CardPage,
+    CardStore,
+    build_card_rows,
+    get_card_store,
+)
+from ..services.query_planner import (
+    ALL_SHIFTS,
+    Granularity,
+    QueryPlan,
+    QueryPlanner,
+    QueryUnit,
+    stitch_results,
+)
+from ..services.excel_export import (
+    append_to_data_sheet,
+    card_data_rows,
+    stop_reason_data_rows,
+    stop_rows_key,
+)
+from ..services.result_archive import (
+    TRUNCATED_PROFILES,
+    ResultArchive,
+    parse_result_url,
+)
+from ..services.result_store import SPAResultStore
+from ..services.spa_service import EquipmentDataExtractor, SPADataProcessor
 from ..utils.constants import HEADERS, NTLM_AUTH
+from ..utils.governor import background_priority, get_governor
+from ..utils.helpers import get_url_period_loss_tree, loss_tree_profile_of
+from ..utils.http_policy import (
+    DEFAULT_TRACKER,
+    CircuitBreaker,
+    RequestPolicy,
+    send_with_policy,
+)
+from ..utils.timing import (
+    DEFAULT_RECORDER,
+    RequestTiming,
+    RequestTimingRecorder,
+    attach_timing,
+)
+from .harvest import DEFAULT_BOUNDARIES, shift_end, shift_start
+from .prefetch import PrefetchScheduler
 
 
 class ControllerError(RuntimeError):
     """Raised when the controller cannot complete a request."""
 
 
+class CircuitOpenError(ControllerError):
+    """Raised without touching the network while the SPA host is failing.
+
+    ``stale`` holds the most recent successful result for the requested URL
+    (or ``None``), from memory or else the result store, and ``stale_since``
+    the moment it was fetched.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        stale: dict[str, pd.DataFrame] | None = None,
+        stale_since: datetime | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.stale = stale
+        self.stale_since = stale_since
+
+
+@dataclass
+class BackfillReport:
+    """Outcome of :meth:`DashboardController.backfill_history`."""
+
+    total: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    failed: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class PlanReport(BackfillReport):
+    """Outcome of :meth:`DashboardController.execute_plan`.
+
+    ``results`` holds the stitched result of every group whose units are
+    all available; groups missing a unit (one that failed, or a cached
+    entry that has since gone) are listed in ``incomplete`` instead of
+    being stitched from the remaining parts.
+    """
+
+    results: dict[tuple[str, str, str], dict[str, pd.DataFrame]] = field(
+        default_factory=dict
+    )
+    incomplete: list[tuple[str, str, str]] = field(default_factory=list)
+
+
 class DashboardController:
     """Coordinates service calls on behalf of the UI layer."""
 
@@ -41,9 +134,25 @@ class DashboardController:
         card_row_builder: Callable[
             [Iterable[dict], str, str, str, str], list[dict[str, str]]
         ] = build_card_rows,
-        card_persister: Callable[[list[dict[str, str]]], object] = append_cards_to_csv,
+        card_persister: Optional[Callable[[list[dict[str, str]]], object]] = None,
+        card_store: Optional[CardStore] = None,
+        excel_exporter: Callable[..., object] = append_to_data_sheet,
         request_headers: Optional[dict[str, str]] = None,
         request_auth=NTLM_AUTH,
+        url_builder: Callable[[str, str, str, str], str] = get_url_period_loss_tree,
+        prefetch_budget: int = 3,
+        prefetch_ttl: float = 300.0,
+        running_prefetch_ttl: float = 30.0,
+        warm_cache_size: int = 16,
+        request_policy: Optional[RequestPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        last_known_size: int = 32,
+        result_store: Optional[SPAResultStore] = None,
+        result_archive: Optional[ResultArchive] = None,
+        archive_results: bool = True,
+        keepalive_expiry: float = 60.0,
+        request_timings: Optional[RequestTimingRecorder] = None,
+        shift_boundaries: Sequence[clock_time] = DEFAULT_BOUNDARIES,
     ) -> None:
         self._spa_source = spa_source
         self._spa_scraper_cls = spa_scraper_cls
@@ -51,18 +160,56 @@ class DashboardController:
         self._fetch_actual_metrics = actual_fetcher
         self._compute_row_updates = row_updater
         self._build_card_rows = card_row_builder
-        self._append_cards_to_csv = card_persister
+        self._card_store = card_store
+        self._export_rows = excel_exporter
+        self._persist_cards = card_persister or (
+            lambda rows: self.card_store.upsert(rows)
+        )
 
         self._headers = request_headers or HEADERS
         self._auth = request_auth
+        self._request_policy = request_policy
+        self._keepalive_expiry = keepalive_expiry
         self._client_factory = http_client_factory or (
-            lambda: httpx.AsyncClient(timeout=30)
+            lambda: httpx.AsyncClient(
+                timeout=30, limits=httpx.Limits(keepalive_expiry=keepalive_expiry)
+            )
         )
+        self._client: httpx.AsyncClient | None = None
+        self._timings = request_timings or DEFAULT_RECORDER
+        self._last_activity: float | None = None
 
         self._current_scraper = self._make_scraper(spa_source)
         self._processed_cache: dict[str, pd.DataFrame] | None = None
         self._cached_url: str | None = None
 
+        self._build_url = url_builder
+        self._shift_boundaries = tuple(shift_boundaries)
+        self._prefetch_ttl = prefetch_ttl
+        self._running_prefetch_ttl = min(running_prefetch_ttl, prefetch_ttl)
+        self._warm_cache_size = max(1, warm_cache_size)
+        self._warm_cache: OrderedDict[str, tuple[float, SPADataProcessor]] = (
+            OrderedDict()
+        )
+        self._prefetcher = PrefetchScheduler(self._warm, budget=prefetch_budget)
+        # Only results that can still become current need their body hash.
+        self._content_hashes_size = self._warm_cache_size + max(1, last_known_size)
+        self._content_hashes: OrderedDict[str, str] = OrderedDict()
+
+        self._breaker = circuit_breaker or CircuitBreaker()
+        self._probe_task: asyncio.Task | None = None
+        self._last_known_size = max(1, last_known_size)
+        self._last_known: OrderedDict[str, tuple[datetime, dict[str, pd.DataFrame]]] = (
+            OrderedDict()
+        )
+        self._result_store = result_store or SPAResultStore()
+        if result_archive is None and archive_results and ResultArchive.available():
+            result_archive = ResultArchive()
+        self._result_archive = result_archive if archive_results else None
+        self._archive_tasks: set[asyncio.Task] = set()
+        self._equipment_task: asyncio.Task | None = None
+        self._equipment_url: str | None = None
+
     # ------------------------------------------------------------------
     # Internal helpers -------------------------------------------------
     # ------------------------------------------------------------------
@@ -72,6 +219,7 @@ class DashboardController:
             is_html=is_html,
             headers=self._headers,
             auth=self._auth,
+            policy=self._request_policy,
         )
 
     async def _ensure_processed(
@@ -90,8 +238,182 @@ class DashboardController:
     ) -> dict[str, pd.DataFrame]:
         self._processed_cache = processed
         self._cached_url = url
+        self._remember_last_known(url, processed)
         return processed
 
+    def _remember_last_known(
+        self, url: str, processed: dict[str, pd.DataFrame]
+    ) -> None:
+        self._last_known[url] = (datetime.now(), processed)
+        self._last_known.move_to_end(url)
+        while len(self._last_known) > self._last_known_size:
+            self._last_known.popitem(last=False)
+
+    def _remember_hash(self, url: str, content: bytes) -> None:
+        self._content_hashes[url] = hashlib.sha256(content).hexdigest()
+        self._content_hashes.move_to_end(url)
+        while len(self._content_hashes) > self._content_hashes_size:
+            self._content_hashes.popitem(last=False)
+
+    def _record_failure(self, url: str) -> None:
+        if self._breaker.record_failure():
+            self._probe_task = asyncio.get_running_loop().create_task(
+                self._probe_until_healthy(url)
+            )
+
+    async def _probe_until_healthy(self, url: str) -> None:
+        """Retry ``url`` in the background until the host answers again."""
+
+        while self._breaker.is_open:
+            await asyncio.sleep(self._breaker.reset_timeout)
+            try:
+                with background_priority():
+                    async with get_governor().slot():
+                        response = await self._get_client().get(
+                            url,
+                            follow_redirects=True,
+                            headers=self._headers,
+                            auth=self._auth,
+                        )
+            except httpx.HTTPError:
+                continue
+            if response.status_code < 500:
+                self._breaker.record_success()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the long-lived pooled client, creating it on first use."""
+
+        if self._client is None or self._client.is_closed:
+            self._client = attach_timing(self._client_factory(), self._timings)
+        return self._client
+
+    async def _send(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        self._last_activity = time.monotonic()
+        return await send_with_policy(
+            client,
+            url,
+            policy=self._request_policy,
+            follow_redirects=True,
+            headers=self._headers,
+            auth=self._auth,
+        )
+
+    async def _request(
+        self, url: str, *, client: httpx.AsyncClient | None = None
+    ) -> httpx.Response:
+        if not self._breaker.allow():
+            raise CircuitOpenError(
+                "Server SPA tidak merespons; permintaan dibatalkan sementara."
+            )
+
+        try:
+            response = await self._send(client or self._get_client(), url)
+        except httpx.TransportError:
+            self._record_failure(url)
+            raise
+
+        if response.status_code >= 500:
+            self._record_failure(url)
+        else:
+            self._breaker.record_success()
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise ControllerError(
+                f"Error Code {response.status_code}: {response.text}"
+            ) from exc
+
+        return response
+
+    async def _process_response(
+        self, url: str, response: httpx.Response
+    ) -> SPADataProcessor:
+        self._remember_hash(url, response.content)
+        scraper = self._make_scraper(response.text, is_html=True)
+        await scraper.process()
+        self._archive_result(url, scraper.processed_data)
+        return scraper
+
+    def _archive_result(self, url: str, processed: dict[str, pd.DataFrame]) -> None:
+        """Append a freshly processed result to the Parquet archive.
+
+        Runs in a worker thread without holding up the caller; archiving is
+        best effort and a failed write only loses that history entry.
+        """
+
+        if self._result_archive is None:
+            return
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._result_archive.archive, url, processed)
+        )
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_done)
+
+    def _archive_done(self, task: asyncio.Task) -> None:
+        self._archive_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def _download(
+        self, url: str, *, client: httpx.AsyncClient | None = None
+    ) -> SPADataProcessor:
+        response = await self._request(url, client=client)
+        return await self._process_response(url, response)
+
+    def _take_warm_entry(self, url: str) -> SPADataProcessor | None:
+        scraper = self._warm_scraper(url)
+        self._warm_cache.pop(url, None)
+        return scraper
+
+    def _warm_scraper(self, url: str) -> SPADataProcessor | None:
+        """The prefetched result for ``url`` if it can stand in for a fetch.
+
+        Entries expire after the prefetch TTL; one downloaded while its
+        shift was still running keeps changing upstream, so it only lives
+        for the much shorter ``running_prefetch_ttl``. Expired entries are
+        dropped, which lets the prefetcher warm the URL again.
+        """
+
+        entry = self._warm_cache.get(url)
+        if entry is None:
+            return None
+        stored_at, scraper = entry
+        age = time.monotonic() - stored_at
+        closed_at = self.result_closed_at(url)
+        running = (
+            closed_at is not None
+            and datetime.now() - timedelta(seconds=age) < closed_at
+        )
+        if age > (self._running_prefetch_ttl if running else self._prefetch_ttl):
+            del self._warm_cache[url]
+            return None
+        return scraper
+
+    def result_closed_at(self, url: str) -> datetime | None:
+        """End of the last shift a loss-tree URL covers, if it can be told."""
+
+        key = parse_result_url(url)
+        if key is None:
+            return None
+        unit = QueryUnit(
+            key["line"],
+            key["date"],
+            key["date_max"],
+            key["shift"],
+            key["func_location"],
+        )
+        return self._unit_bounds(unit)[1]
+
+    async def _warm(self, url: str) -> None:
+        if url == self._cached_url or self._warm_scraper(url) is not None:
+            return
+
+        scraper = await self._download(url)
+        self._warm_cache[url] = (time.monotonic(), scraper)
+        while len(self._warm_cache) > self._warm_cache_size:
+            self._warm_cache.popitem(last=False)
+
     # ------------------------------------------------------------------
     # SPA data ---------------------------------------------------------
     # ------------------------------------------------------------------
@@ -116,32 +438,501 @@ class DashboardController:
         processed = await self.fetch_remote_issue_data(url, use_cache=use_cache)
         return processed.get("data_losses", pd.DataFrame())
 
+    async def _fetch_equipment(self, url: str) -> pd.DataFrame:
+        response = await self._request(url)
+        return await asyncio.to_thread(EquipmentDataExtractor(response.text).extract)
+
+    def _start_equipment_fetch(self, url: str) -> None:
+        if url == self._equipment_url and self._equipment_task is not None:
+            return
+        if self._equipment_task is not None and not self._equipment_task.done():
+            self._equipment_task.cancel()
+
+        self._equipment_url = url
+        self._equipment_task = asyncio.get_running_loop().create_task(
+            self._fetch_equipment(url)
+        )
+        # Failures surface through get_equipment_data(); never log them as unhandled.
+        self._equipment_task.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+        )
+
     async def fetch_remote_issue_data(
-        self, url: str, *, use_cache: bool = False
+        self,
+        url: str,
+        *,
+        use_cache: bool = False,
+        equipment_url: str | None = None,
+        stored_after: datetime | None = None,
+        make_current: bool = True,
     ) -> dict[str, pd.DataFrame]:
-        """Fetch SPA data from a remote endpoint and cache the scraper."""
+        """Fetch SPA data from a remote endpoint and cache the scraper.
+
+        When ``equipment_url`` is given, the equipment data page is fetched
+        concurrently over the same pooled client; see
+        :meth:`get_equipment_data`. With ``stored_after`` (typically the end
+        of a closed shift), a persisted result saved at or after that moment
+        is returned without contacting the server. With ``make_current``
+        false the result is returned without replacing the current one, so
+        auto refresh and the Excel export keep working on what is shown.
+        """
+
+        if equipment_url:
+            self._start_equipment_fetch(equipment_url)
 
         if use_cache and self._processed_cache is not None and self._cached_url == url:
             return self._processed_cache
 
-        async with self._client_factory() as client:
-            response = await client.get(
-                url,
-                follow_redirects=True,
-                headers=self._headers,
-                auth=self._auth,
+        if stored_after is not None and self._stored_since(url, stored_after):
+            stored = await asyncio.to_thread(self._result_store.load, url)
+            if stored is not None:
+                return self._keep_result(stored, url, make_current)
+
+        scraper = self._take_warm_entry(url)
+        if scraper is None:
+            # User-initiated requests always take priority over prefetching.
+            self._prefetcher.pause()
+            try:
+                scraper = await self._download(url)
+            except CircuitOpenError as exc:
+                exc.stale_since, exc.stale = self._last_known.get(url, (None, None))
+                if exc.stale is None:
+                    # Nothing fetched this session; a saved result survives restarts.
+                    exc.stale_since, exc.stale = await asyncio.to_thread(
+                        self._load_stored, url
+                    )
+                raise
+            finally:
+                self._prefetcher.resume()
+
+        if make_current:
+            self._current_scraper = scraper
+        return self._keep_result(scraper.processed_data, url, make_current)
+
+    def _keep_result(
+        self, processed: dict[str, pd.DataFrame], url: str, make_current: bool
+    ) -> dict[str, pd.DataFrame]:
+        if make_current:
+            return self._cache_remote_data(processed, url)
+        self._remember_last_known(url, processed)
+        return processed
+
+    def has_current_result(self, url: str) -> bool:
+        """Whether ``url`` is the result currently held in memory."""
+
+        return self._cached_url == url and self._processed_cache is not None
+
+    def has_local_result(
+        self, url: str, *, stored_after: datetime | None = None
+    ) -> bool:
+        """Whether :meth:`fetch_remote_issue_data` can answer without a request."""
+
+        if self._warm_scraper(url) is not None:
+            return True
+        return stored_after is not None and self._stored_since(url, stored_after)
+
+    def _load_stored(
+        self, url: str
+    ) -> tuple[datetime | None, dict[str, pd.DataFrame] | None]:
+        """The persisted result for ``url`` and when it was saved."""
+
+        stored = self._result_store.load(url)
+        if stored is None:
+            return None, None
+        return self._result_store.saved_at(url), stored
+
+    def _stored_since(self, url: str, moment: datetime) -> bool:
+        """Whether the result store holds ``url`` saved at or after ``moment``."""
+
+        saved_at = self._result_store.saved_at(url)
+        return saved_at is not None and saved_at >= moment
+
+    async def poll_remote_issue_data(self, url: str) -> dict[str, pd.DataFrame] | None:
+        """Re-fetch ``url`` and return processed data only if the body changed.
+
+        The response body is hashed and compared with the last body seen for
+        the same URL; when nothing changed, parsing is skipped and ``None`` is
+        returned. ``None`` is also returned when another URL became current
+        while the poll was in flight.
+        """
+
+        response = await self._request(url)
+        digest = hashlib.sha256(response.content).hexdigest()
+        if self._content_hashes.get(url) == digest or self._cached_url != url:
+            return None
+
+        scraper = await self._process_response(url, response)
+        if self._cached_url != url:
+            return None
+        self._current_scraper = scraper
+        return self._cache_remote_data(scraper.processed_data, url)
+
+    def prefetch_neighbours(
+        self,
+        link_up: str,
+        date_value: str,
+        shift: str,
+        func_location: str,
+        *,
+        link_ups: Sequence[str] = (),
+    ) -> list[str]:
+        """Queue the selections a user is most likely to request next.
+
+        Candidates are, in priority order: the other functional location, the
+        previous shift and the next line in ``link_ups``. Returns the URLs that
+        were queued.
+        """
+
+        candidates: list[tuple[str, str, str, str]] = []
+
+        other_location = "MAKE" if func_location.upper().startswith("PACK") else "PACK"
+        candidates.append((link_up, date_value, shift, other_location))
+
+        try:
+            shift_number = int(shift)
+            current_date = date.fromisoformat(date_value)
+        except ValueError:
+            pass
+        else:
+            if shift_number > 1:
+                candidates.append(
+                    (link_up, date_value, str(shift_number - 1), func_location)
+                )
+            else:
+                previous_day = (current_date - timedelta(days=1)).isoformat()
+                candidates.append((link_up, previous_day, "3", func_location))
+
+        lines = [str(value).strip().strip("LU") for value in link_ups]
+        if link_up in lines:
+            position = lines.index(link_up)
+            if position + 1 < len(lines):
+                candidates.append(
+                    (lines[position + 1], date_value, shift, func_location)
+                )
+
+        urls = [self._build_url(*candidate) for candidate in candidates]
+        urls = [
+            url
+            for url in urls
+            if url and url != self._cached_url and self._warm_scraper(url) is None
+        ]
+        self._prefetcher.schedule(urls)
+        return self._prefetcher.pending
+
+    async def backfill_history(
+        self,
+        link_up: str,
+        func_location: str,
+        start_date: date,
+        end_date: date,
+        *,
+        shifts: Sequence[int] = (1, 2, 3),
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BackfillReport:
+        """Fetch every shift between two dates into the persistent result store.
+
+        Only shifts that have already ended are fetched. Results stored after
+        their shift ended are skipped and each result is saved as soon as it
+        is processed, so an interrupted run resumes where it stopped. At most
+        ``concurrency`` requests share one pooled client.
+        """
+
+        now = datetime.now()
+        entries: dict[str, datetime] = {}
+        day = start_date
+        while day <= end_date:
+            for shift in shifts:
+                closed_at = shift_end(day, shift, self._shift_boundaries)
+                if closed_at > now:
+                    # Running and future shifts are left to the harvester.
+                    continue
+                url = self._build_url(
+                    link_up, day.isoformat(), str(shift), func_location
+                )
+                if url:
+                    entries.setdefault(url, closed_at)
+            day += timedelta(days=1)
+
+        return await self._fetch_into_store(
+            entries, concurrency=concurrency, progress=progress
+        )
+
+    async def harvest_shift(
+        self,
+        day: date,
+        shift: str,
+        link_ups: Sequence[str],
+        *,
+        func_locations: Sequence[str] = ("PACK", "MAKE"),
+        concurrency: int = 4,
+    ) -> BackfillReport:
+        """Fetch one closed shift for every line and functional location.
+
+        Results land in the persistent result store, where
+        :meth:`fetch_remote_issue_data` can serve them via ``stored_after``.
+        A result stored while the shift was still running (by a backfill,
+        prefetch or plan) is fetched again.
+        """
+
+        closed_at = shift_end(day, shift, self._shift_boundaries)
+        entries: dict[str, datetime] = {}
+        for link_up in link_ups:
+            for func_location in func_locations:
+                url = self._build_url(
+                    str(link_up).strip().strip("LU"),
+                    day.isoformat(),
+                    str(shift),
+                    func_location,
+                )
+                if url:
+                    entries.setdefault(url, closed_at)
+        return await self._fetch_into_store(entries, concurrency=concurrency)
+
+    async def _fetch_into_store(
+        self,
+        entries: dict[str, datetime],
+        *,
+        concurrency: int = 4,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BackfillReport:
+        """Fetch and store every URL not stored since its shift ended.
+
+        ``entries`` maps each URL to the end of its shift; results are only
+        persisted once that moment has passed, so a partial shift never
+        poses as a complete one.
+        """
+
+        report = BackfillReport(total=len(entries))
+        pending = [
+            (url, closed_at)
+            for url, closed_at in entries.items()
+            if not self._stored_since(url, closed_at)
+        ]
+        report.skipped = report.total - len(pending)
+        if progress:
+            progress(report.skipped, report.total)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_one(url: str, closed_at: datetime) -> None:
+            async with semaphore:
+                try:
+                    scraper = await self._download(url)
+                    if datetime.now() >= closed_at:
+                        await asyncio.to_thread(
+                            self._result_store.save, url, scraper.processed_data
+                        )
+                except (httpx.HTTPError, ControllerError, ValueError) as exc:
+                    report.failed.append((url, str(exc)))
+                else:
+                    report.fetched += 1
+                if progress:
+                    progress(
+                        report.skipped + report.fetched + len(report.failed),
+                        report.total,
+                    )
+
+        # Bulk work yields to user-initiated requests at the governor.
+        with background_priority():
+            await asyncio.gather(*(fetch_one(*entry) for entry in pending))
+
+        return report
+
+    # ------------------------------------------------------------------
+    # History planning -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _unit_url(self, unit: QueryUnit) -> str:
+        if unit.date_max == unit.date_min:
+            return self._build_url(
+                unit.line, unit.date_min.isoformat(), unit.shift, unit.func_location
             )
+        return self._build_url(
+            unit.line,
+            unit.date_min.isoformat(),
+            unit.shift,
+            unit.func_location,
+            date_max=unit.date_max.isoformat(),
+        )
+
+    def _unit_bounds(self, unit: QueryUnit) -> tuple[datetime, datetime]:
+        """Start of the unit's first shift and end of its last one."""
+
+        first, last = (
+            (unit.shift, unit.shift) if unit.shift else (1, len(self._shift_boundaries))
+        )
+        return (
+            shift_start(unit.date_min, first, self._shift_boundaries),
+            shift_end(unit.date_max, last, self._shift_boundaries),
+        )
+
+    async def _cached_result(self, url: str) -> dict[str, pd.DataFrame] | None:
+        if url == self._cached_url and self._processed_cache is not None:
+            return self._processed_cache
+        warmed = self._warm_scraper(url)
+        if warmed is not None:
+            return warmed.processed_data
+        return await asyncio.to_thread(self._result_store.load, url)
+
+    def plan_history(
+        self,
+        lines: Sequence[str],
+        start_date: date,
+        end_date: date,
+        *,
+        shifts: Sequence[str] = ALL_SHIFTS,
+        granularity: Granularity = "shift",
+        func_location: str = "PACK",
+        span_cost_ratio: float = 0.1,
+    ) -> QueryPlan:
+        """Pick the cheapest mix of aggregated and per-shift queries.
+
+        Cached results (current selection, prefetched entries and results
+        stored after the unit's last shift ended) cost nothing; the cost of
+        a fetch is estimated from the median observed request latency.
+        """
+
+        request_cost = DEFAULT_TRACKER.percentile(0.5) or 1.0
+
+        def is_cached(unit: QueryUnit) -> bool:
+            url = self._unit_url(unit)
+            return (
+                url == self._cached_url
+                or self._warm_scraper(url) is not None
+                or self._stored_since(url, self._unit_bounds(unit)[1])
+            )
+
+        planner = QueryPlanner(
+            is_cached,
+            request_cost=request_cost,
+            span_cost=request_cost * span_cost_ratio,
+        )
+        return planner.plan(
+            [str(line).strip().strip("LU") for line in lines],
+            start_date,
+            end_date,
+            shifts,
+            granularity,
+            func_location,
+        )
+
+    async def execute_plan(
+        self, plan: QueryPlan, *, concurrency: int = 4
+    ) -> PlanReport:
+        """Fetch the plan's missing units and stitch every group's results.
+
+        A failed unit is recorded in the report and does not stop the
+        others; units already cached count as skipped. Fetched units are saved to the persistent result store once
+        their last shift has ended. Parts are weighted by the time they
+        cover when stitched; results are keyed by ``(line, period, shift)``.
+        """
+
+        units = {unit for group in plan.groups for unit in group.units}
+        report = PlanReport(total=len(units), skipped=len(units) - len(plan.to_fetch))
+        fetched: dict[str, dict[str, pd.DataFrame]] = {}
+        failed: set[QueryUnit] = set()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_one(unit: QueryUnit) -> None:
+            url = self._unit_url(unit)
+            try:
+                async with semaphore:
+                    scraper = await self._download(url)
+                fetched[url] = scraper.processed_data
+                if datetime.now() >= self._unit_bounds(unit)[1]:
+                    await asyncio.to_thread(
+                        self._result_store.save, url, scraper.processed_data
+                    )
+            except (httpx.HTTPError, ControllerError, ValueError) as exc:
+                failed.add(unit)
+                report.failed.append((url, str(exc)))
+            else:
+                report.fetched += 1
+
+        with background_priority():
+            await asyncio.gather(*(fetch_one(unit) for unit in plan.to_fetch))
+
+        for group in plan.groups:
+            parts, weights = [], []
+            for unit in group.units:
+                if unit in failed:
+                    break
+                url = self._unit_url(unit)
+                part = fetched.get(url) or await self._cached_result(url)
+                if not part:
+                    break
+                start, end = self._unit_bounds(unit)
+                parts.append(part)
+                weights.append((end - start).total_seconds())
+            else:
+                report.results[group.key] = stitch_results(parts, weights)
+                continue
+            report.incomplete.append(group.key)
+        return report
+
+    # ------------------------------------------------------------------
+    # Connection management --------------------------------------------
+    # ------------------------------------------------------------------
+    async def warm_connection(self, url: str) -> bool:
+        """Open and authenticate a pooled connection to ``url``'s host.
+
+        Sends a lightweight ``HEAD`` through the pooled client so DNS, TCP
+        connect and the NTLM handshake are paid before the first real query.
+        Returns ``True`` when the server accepted the credentials.
+        """
 
         try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise ControllerError(
-                f"Error Code {response.status_code}: {response.text}"
-            ) from exc
+            with background_priority():
+                async with get_governor().slot():
+                    response = await self._get_client().head(
+                        url,
+                        follow_redirects=True,
+                        headers=self._headers,
+                        auth=self._auth,
+                    )
+        except httpx.HTTPError:
+            return False
+
+        self._last_activity = time.monotonic()
+        return response.status_code not in (401, 407) and response.status_code < 500
+
+    def connection_idle_expired(self) -> bool:
+        """Whether pooled connections have idled past the keep-alive expiry."""
+
+        if self._last_activity is None:
+            return True
+        return time.monotonic() - self._last_activity >= self._keepalive_expiry
+
+    async def aclose(self) -> None:
+        self._prefetcher.cancel()
+        # The probe uses the client; let it unwind before the client closes.
+        probe, self._probe_task = self._probe_task, None
+        if probe is not None and not probe.done():
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_equipment_data(self) -> pd.DataFrame:
+        """Wait for the equipment data started by the last fetch.
+
+        Returns an empty DataFrame when no equipment URL was requested;
+        request errors are re-raised.
+        """
 
-        self._current_scraper = self._make_scraper(response.text, is_html=True)
-        processed = await self._current_scraper.process()
-        return self._cache_remote_data(processed, url)
+        if self._equipment_task is None:
+            return pd.DataFrame(columns=EquipmentDataExtractor.COLUMNS)
+        return await asyncio.shield(self._equipment_task)
+
+    @property
+    def equipment_data(self) -> pd.DataFrame | None:
+        """Equipment data if it has already arrived, otherwise ``None``."""
+
+        task = self._equipment_task
+        if task is None or not task.done() or task.cancelled() or task.exception():
+            return None
+        return task.result()
 
     def get_cached_processed_data(self) -> dict[str, pd.DataFrame] | None:
         return self._processed_cache
@@ -149,6 +940,9 @@ class DashboardController:
     def clear_cache(self) -> None:
         self._processed_cache = None
         self._cached_url = None
+        self._warm_cache.clear()
+        self._content_hashes.clear()
+        self._prefetcher.cancel()
 
     # ------------------------------------------------------------------
     # Achievement ------------------------------------------------------
@@ -165,7 +959,10 @@ class DashboardController:
     ) -> tuple[list[tuple[object, tuple]], dict[str, object]]:
         """Determine table updates and actual metrics for the given shift."""
 
-        target_shift = self._load_target_shift(lu_value, func_location, shift_number)
+        # Served from the target cache; writes keep the ordered I/O worker.
+        target_shift = await asyncio.to_thread(
+            self._load_target_shift, lu_value, func_location, shift_number
+        )
         data_losses = await self.load_data_losses_dataframe(data_url, use_cache=True)
         actual_values, actual_data = self._fetch_actual_metrics(
             data_losses, metric_names
@@ -190,12 +987,80 @@ class DashboardController:
         tanggal: str = "",
         shift: str = "",
     ) -> Optional[object]:
-        """Persist card data and return the created file path."""
+        """Persist card data and return the persister's result.
+
+        With the default store that is a :class:`CardUpsert`, telling which
+        cards were new, changed or already saved unchanged.
+        """
 
         rows = self._build_card_rows(cards, username, lu, tanggal, shift)
         if not rows:
             return None
-        return self._append_cards_to_csv(rows)
+        return self._persist_cards(rows)
+
+    def export_to_excel(
+        self,
+        cards: Iterable[dict],
+        username: str = "",
+        lu: str = "",
+        tanggal: str = "",
+        shift: str = "",
+        *,
+        include_stops: bool = True,
+    ) -> Optional[object]:
+        """Append cards (and the current stop reasons) to ``DB.xlsx``.
+
+        Stop reasons come from the result currently shown, labelled with
+        the line, date and shift of its query rather than the sidebar, and
+        are handed over as a ``once`` group so saving again does not write
+        the same table twice. Cards are appended as given; see
+        :mod:`..services.excel_export` for the append-log layout.
+        """
+
+        rows = card_data_rows(
+            self._build_card_rows(cards, username, lu, tanggal, shift)
+        )
+        stops: list[list[object]] = []
+        processed, url = self._processed_cache, self._cached_url
+        key = parse_result_url(url) if url else None
+        if (
+            include_stops
+            and processed is not None
+            and key is not None
+            # A cut-down page only holds the top reasons.
+            and loss_tree_profile_of(url) not in TRUNCATED_PROFILES
+        ):
+            stops = stop_reason_data_rows(
+                processed.get("stops_reason"),
+                lu=f"LU{key['line']}",
+                tanggal=key["date"].isoformat(),
+                shift=f"Shift {key['shift']}" if key["shift"] else "",
+                user=username,
+            )
+        if not rows and not stops:
+            return None
+        return self._export_rows(rows, once={stop_rows_key(stops): stops})
+
+    @property
+    def card_store(self) -> CardStore:
+        if self._card_store is None:
+            self._card_store = get_card_store()
+        return self._card_store
+
+    def query_cards(self, **filters) -> CardPage:
+        """Page through saved cards; see :meth:`CardStore.query`."""
+
+        return self.card_store.query(**filters)
+
+    def count_cards(self, **filters) -> int:
+        """Number of saved cards matching ``filters``; see :meth:`CardStore.count`."""
+
+        return self.card_store.count(**filters)
+
+    def compact_cards(self) -> list[str]:
+        """Move closed months of saved cards into their Parquet partitions."""
+
+        return self.card_store.compact()
 
     # ------------------------------------------------------------------
     # Utilities --------------------------------------------------------
@@ -203,3 +1068,28 @@ class DashboardController:
     @property
     def current_scraper(self) -> SPADataProcessor:
         return self._current_scraper
+
+    @property
+    def current_url(self) -> str | None:
+        return self._cached_url
+
+    @property
+    def circuit_open(self) -> bool:
+        return self._breaker.is_open
+
+    @property
+    def result_archive(self) -> ResultArchive | None:
+        """The Parquet history of processed results (``None`` when disabled)."""
+
+        return self._result_archive
+
+    def request_timings(
+        self, url: str | None = None, *, limit: int | None = None
+    ) -> list[RequestTiming]:
+        """Network timing breakdowns of recent requests, newest first."""
+
+        return self._timings.history(url, limit=limit)
+
+    @property
+    def slow_requests(self) -> list[RequestTiming]:
+        return list(self._timings.slow_requests)
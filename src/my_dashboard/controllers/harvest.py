@@ -0,0 +1,147 @@
+"""Harvest each just-closed shift into the persistent cache after handover."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Awaitable, Callable, Optional, Sequence
+
+from ..utils.governor import background_priority
+
+DEFAULT_BOUNDARIES = (time(6), time(14), time(22))
+
+
+def parse_boundaries(value: str) -> tuple[time, ...]:
+    """Parse ``"06:00,14:00,22:00"``; the first entry starts shift 1."""
+
+    boundaries = tuple(
+        time.fromisoformat(part.strip()) for part in value.split(",") if part.strip()
+    )
+    return boundaries or DEFAULT_BOUNDARIES
+
+
+def shift_start(
+    day: date, shift: int | str, boundaries: Sequence[time] = DEFAULT_BOUNDARIES
+) -> datetime:
+    """Start of ``shift`` on production day ``day``.
+
+    A production day begins at the first boundary; shifts starting earlier
+    on the clock (e.g. a 02:00 boundary) fall on the following calendar day.
+    """
+
+    index = int(shift) - 1
+    start = datetime.combine(day, boundaries[index])
+    if boundaries[index] < boundaries[0]:
+        start += timedelta(days=1)
+    return start
+
+
+def shift_end(
+    day: date, shift: int | str, boundaries: Sequence[time] = DEFAULT_BOUNDARIES
+) -> datetime:
+    index = int(shift)
+    if index >= len(boundaries):
+        return shift_start(day + timedelta(days=1), 1, boundaries)
+    return shift_start(day, index + 1, boundaries)
+
+
+def closed_shift_at(
+    moment: datetime, boundaries: Sequence[time] = DEFAULT_BOUNDARIES
+) -> tuple[date, str, datetime]:
+    """The latest shift that ended at or before ``moment``.
+
+    Returns ``(production_day, shift, end)``.
+    """
+
+    latest: Optional[tuple[date, str, datetime]] = None
+    for offset in (2, 1, 0):
+        day = moment.date() - timedelta(days=offset)
+        for shift in range(1, len(boundaries) + 1):
+            end = shift_end(day, shift, boundaries)
+            if end <= moment and (latest is None or end > latest[2]):
+                latest = (day, str(shift), end)
+    assert latest is not None
+    return latest
+
+
+class ShiftHarvestScheduler:
+    """Call ``harvest(day, shift)`` a little while after every shift ends.
+
+    Runs ``delay`` seconds after each boundary plus a random share of
+    ``jitter`` seconds so several workstations do not hit the server in the
+    same second. On :meth:`start`, a shift that closed less than one shift
+    length ago is harvested straight away. Harvests run at background
+    priority; failures are left to the next boundary.
+    """
+
+    def __init__(
+        self,
+        harvest: Callable[[date, str], Awaitable[object]],
+        *,
+        boundaries: Sequence[time] = DEFAULT_BOUNDARIES,
+        delay: float = 300.0,
+        jitter: float = 120.0,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._harvest = harvest
+        self.boundaries = tuple(boundaries)
+        self.delay = max(0.0, delay)
+        self.jitter = max(0.0, jitter)
+        self._clock = clock
+        self._runner: Optional[asyncio.Task] = None
+        self.last_harvested: Optional[tuple[date, str]] = None
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+        self._runner = None
+
+    def next_run(self) -> datetime:
+        """When the next scheduled harvest starts (before jitter)."""
+
+        # A boundary still inside its delay window is the next run.
+        pivot = self._clock() - timedelta(seconds=self.delay)
+        day, shift, next_end = closed_shift_at(pivot, self.boundaries)
+        while next_end <= pivot:
+            shift = str(int(shift) % len(self.boundaries) + 1)
+            if shift == "1":
+                day += timedelta(days=1)
+            next_end = shift_end(day, shift, self.boundaries)
+        return next_end + timedelta(seconds=self.delay)
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    async def _harvest_closed(self) -> None:
+        day, shift, _ = closed_shift_at(self._clock(), self.boundaries)
+        if self.last_harvested == (day, shift):
+            return
+        try:
+            with background_priority():
+                await self._harvest(day, shift)
+        except Exception:
+            # Best effort: the next boundary (or a restart) tries again.
+            return
+        self.last_harvested = (day, shift)
+
+    async def _run(self) -> None:
+        now = self._clock()
+        day, shift, end = closed_shift_at(now, self.boundaries)
+        shift_length = shift_end(day, shift, self.boundaries) - shift_start(
+            day, shift, self.boundaries
+        )
+        if timedelta(seconds=self.delay) <= now - end < shift_length:
+            await self._harvest_closed()
+
+        while True:
+            wait = (self.next_run() - self._clock()).total_seconds()
+            await asyncio.sleep(max(0.0, wait) + random.uniform(0, self.jitter))
+            await self._harvest_closed()
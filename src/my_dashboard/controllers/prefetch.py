@@ -0,0 +1,121 @@
+"""Low-priority background prefetching of likely next SPA queries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Optional
+
+from ..utils.governor import Priority, request_priority
+
+
+class PrefetchScheduler:
+    """Warm a small queue of URLs while no user-initiated request is running.
+
+    ``fetch`` is awaited for each queued URL. Calling :meth:`pause` cancels the
+    in-flight prefetch (it is put back at the front of the queue) and blocks
+    further work until :meth:`resume` is called.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[object]],
+        *,
+        budget: int = 3,
+        idle_delay: float = 1.0,
+    ) -> None:
+        self._fetch = fetch
+        self.budget = max(0, budget)
+        self.idle_delay = max(0.0, idle_delay)
+
+        self._queue: deque[str] = deque()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._pause_depth = 0
+        self._runner: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._inflight_url: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def schedule(self, urls: Iterable[str]) -> None:
+        """Replace the pending queue with ``urls`` (trimmed to the budget)."""
+
+        if self.budget == 0:
+            return
+
+        unique: list[str] = []
+        for url in urls:
+            if url and url not in unique:
+                unique.append(url)
+        self._queue = deque(unique[: self.budget])
+
+        if self._queue and (self._runner is None or self._runner.done()):
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def pause(self) -> None:
+        """Stop prefetching immediately; a cancelled URL is requeued."""
+
+        self._pause_depth += 1
+        self._idle.clear()
+        if self._inflight is not None and not self._inflight.done():
+            if self._inflight_url is not None:
+                self._queue.appendleft(self._inflight_url)
+            self._inflight.cancel()
+
+    def resume(self) -> None:
+        """Allow prefetching again once every :meth:`pause` is balanced."""
+
+        self._pause_depth = max(0, self._pause_depth - 1)
+        if self._pause_depth == 0:
+            self._idle.set()
+
+    def cancel(self) -> None:
+        """Drop the queue and stop the background runner."""
+
+        self._queue.clear()
+        if self._inflight is not None:
+            self._inflight.cancel()
+        if self._runner is not None:
+            self._runner.cancel()
+        self._runner = None
+
+    @property
+    def pending(self) -> list[str]:
+        return list(self._queue)
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    async def _wait_until_idle(self) -> None:
+        while True:
+            await self._idle.wait()
+            await asyncio.sleep(self.idle_delay)
+            if self._idle.is_set():
+                return
+
+    async def _run(self) -> None:
+        # This task runs in its own context copy, so the flag stays local.
+        request_priority.set(Priority.BACKGROUND)
+        while self._queue:
+            await self._wait_until_idle()
+            if not self._queue:
+                break
+
+            url = self._queue.popleft()
+            self._inflight_url = url
+            self._inflight = asyncio.ensure_future(self._fetch(url))
+            try:
+                await self._inflight
+            except asyncio.CancelledError:
+                # Cancelled by pause(): the URL has already been requeued.
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise
+            except Exception:
+                # Prefetching is best effort; a failure never reaches the UI.
+                pass
+            finally:
+                self._inflight = None
+                self._inflight_url = None
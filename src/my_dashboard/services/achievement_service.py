@@ -2,24 +2,178 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Mapping, Sequence
+import csv
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence
 
 import pandas as pd
 
-from ..utils.csvhandle import get_targets_file_path
+from ..utils.csvhandle import get_targets_file_path, get_targets_folder
+
+
+# ----------------------------------------------------------------------
+# Target tables --------------------------------------------------------
+# ----------------------------------------------------------------------
+def _parse_number(value: str) -> Optional[float]:
+    try:
+        return float(value.replace("%", "").strip())
+    except ValueError:
+        return None
+
+
+@dataclass
+class TargetTable:
+    """One ``target_<func>_<lu>.csv`` file, parsed per shift column.
+
+    ``values`` holds the cell text without ``%`` (what the achievement
+    table shows), ``numbers`` the same cells as floats (``None`` when a
+    cell is not numeric).
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    columns: list[str]
+    values: dict[str, list[str]] = field(default_factory=dict)
+    numbers: dict[str, list[Optional[float]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(
+        cls, path: str, stat: os.stat_result, columns: Sequence[str], rows
+    ) -> "TargetTable":
+        columns = [str(column).strip() for column in columns]
+        table = cls(path, stat.st_mtime_ns, stat.st_size, columns)
+        for index, column in enumerate(columns):
+            cells = [
+                str(row[index]).replace("%", "") if index < len(row) else ""
+                for row in rows
+            ]
+            table.values[column] = cells
+            table.numbers[column] = [_parse_number(cell) for cell in cells]
+        return table
+
+    @classmethod
+    def read(cls, path: str) -> "TargetTable":
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            stat = os.fstat(handle.fileno())
+            rows = [row for row in csv.reader(handle) if row]
+        if not rows:
+            raise pd.errors.EmptyDataError(f"File target kosong: {path}")
+        return cls.from_rows(path, stat, rows[0], rows[1:])
+
+
+class TargetCache:
+    """Every target table kept in memory, keyed by ``(lu, func_location)``.
+
+    :meth:`preload` reads all files in the target folder and is meant to
+    run in a worker thread at startup. A lookup costs one ``stat`` so
+    files edited outside the app are noticed; a changed mtime or size
+    re-reads that file.
+
+    Lookups may run on any thread. Writers of target files hold
+    :attr:`file_lock`, and a lookup that has to re-read a file waits for
+    it, so it never parses a half-written table.
+    """
+
+    def __init__(self, folder: str | os.PathLike[str] | None = None) -> None:
+        self._folder = folder
+        self._lock = threading.Lock()
+        self.file_lock = threading.Lock()
+        self._tables: dict[tuple[str, str], TargetTable] = {}
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def preload(self) -> int:
+        """Parse every ``target_*_*.csv``; returns the number loaded."""
+
+        folder = Path(self._folder or get_targets_folder())
+        loaded = 0
+        for path in folder.glob("target_*_*.csv"):
+            key = _key_of(path)
+            if key is None:
+                continue
+            try:
+                with self.file_lock:
+                    table = TargetTable.read(str(path))
+            except (OSError, ValueError):
+                continue
+            with self._lock:
+                self._tables[key] = table
+            loaded += 1
+        return loaded
+
+    def table(self, lu_value: str, func_location: str) -> TargetTable:
+        key = (_normalize_lu(lu_value), func_location.lower())
+        with self._lock:
+            table = self._tables.get(key)
+
+        if table is not None:
+            try:
+                stat = os.stat(table.path)
+            except OSError:
+                stat = None
+            if stat is not None and (stat.st_mtime_ns, stat.st_size) == (
+                table.mtime_ns,
+                table.size,
+            ):
+                return table
+
+        with self.file_lock:
+            table = TargetTable.read(self._path_for(*key))
+        with self._lock:
+            self._tables[key] = table
+        return table
+
+    def store(self, path: str, columns: Sequence[str], rows) -> None:
+        """Record rows just written to ``path`` (e.g. by the target editor)."""
+
+        key = _key_of(Path(path))
+        if key is None:
+            return
+        table = TargetTable.from_rows(str(path), os.stat(path), columns, rows)
+        with self._lock:
+            self._tables[key] = table
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _path_for(self, lu: str, func_location: str) -> str:
+        if self._folder is not None:
+            return str(Path(self._folder) / f"target_{func_location}_{lu}.csv")
+        # Writes the default table the first time a line is used.
+        return get_targets_file_path(lu, func_location=func_location)
+
+
+def _normalize_lu(lu_value: str) -> str:
+    return str(lu_value).strip().strip("LU")
+
+
+def _key_of(path: Path) -> Optional[tuple[str, str]]:
+    parts = path.stem.split("_")
+    if len(parts) != 3 or parts[0] != "target":
+        return None
+    return parts[2], parts[1].lower()
+
+
+TARGET_CACHE = TargetCache()
 
 
 def load_target_shift(
     lu_value: str, func_location: str, shift_number: int
 ) -> pd.Series:
-    target_path = get_targets_file_path(
-        lu_value.strip("LU"), func_location=func_location
-    )
-    target_df = pd.read_csv(target_path)
+    table = TARGET_CACHE.table(lu_value, func_location)
     shift_column = f"Shift {shift_number}"
-    if shift_column not in target_df.columns:
+    if shift_column not in table.values:
         raise KeyError(f"Kolom {shift_column!r} tidak ditemukan pada file target.")
-    return target_df[shift_column].astype(str).str.replace("%", "")
+    return pd.Series(table.values[shift_column], name=shift_column, dtype=object)
 
 
 def _normalize_metric_value(value: object) -> str:
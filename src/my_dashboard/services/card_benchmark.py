@@ -0,0 +1,89 @@
+"""Benchmark issue card saves against card files of growing size.
+
+Run from the project root::
+
+    PYTHONPATH=src python -m my_dashboard.services.card_benchmark
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+from .card_service import append_cards_to_csv, build_card_rows
+
+
+def append_by_rewrite(rows: list[dict[str, str]], file_path: Path) -> None:
+    """The former read-concat-rewrite save, kept for the benchmark."""
+
+    existing_df = pd.read_csv(file_path)
+    combined = pd.concat([existing_df, pd.DataFrame(rows)], ignore_index=True)
+    combined.to_csv(file_path, index=False, encoding="utf-8-sig")
+
+
+def main(
+    sizes: Iterable[int] = (1_000, 10_000, 100_000, 1_000_000),
+    *,
+    batch: int = 10,
+    repeat: int = 5,
+    rewrite_limit: int = 100_000,
+) -> None:
+    """Time one save of ``batch`` rows against files of growing size."""
+
+    sample = build_card_rows(
+        [
+            {
+                "id": f"card-{index}",
+                "issue": "MAX roll. block jam",
+                "details": [{"detail": "Roll aus", "actions": ["Ganti roll"]}],
+            }
+            for index in range(batch)
+        ],
+        "benchmark",
+        "LU18",
+        "2025-01-01",
+        "1",
+    )
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "issue_cards.csv"
+        written = 0
+        print(f"{'rows':>10} {'append':>10} {'rewrite':>10}")
+        for size in sizes:
+            # Grow the file in bulk; only the timed saves go through the API.
+            while written < size:
+                chunk = min(50_000, size - written)
+                append_cards_to_csv(
+                    [
+                        dict(sample[0], card_id=f"fill-{written + i}")
+                        for i in range(chunk)
+                    ],
+                    path,
+                )
+                written += chunk
+
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                append_cards_to_csv(sample, path)
+                timings.append(time.perf_counter() - started)
+                written += batch
+
+            rewrite = "-"
+            if size <= rewrite_limit:
+                copy = Path(folder) / "rewrite.csv"
+                shutil.copyfile(path, copy)
+                started = time.perf_counter()
+                append_by_rewrite(sample, copy)
+                rewrite = f"{(time.perf_counter() - started) * 1000:8.1f}ms"
+
+            print(f"{size:>10,} {min(timings) * 1000:8.2f}ms {rewrite:>10}")
+
+
+if __name__ == "__main__":  # pragma: no cover - benchmarking entry point
+    main()
@@ -2,14 +2,45 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import Iterable
+from typing import IO, Iterable, Iterator, Optional
 
-import pandas as pd
+from ..utils.csvhandle import (
+    get_cards_db_path,
+    get_cards_file_path,
+    get_cards_partition_dir,
+)
+from ..utils.filelock import locked
 
-from ..utils.csvhandle import get_cards_file_path
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional "archive" extra
+    pa = pc = pq = None
+
+CARD_COLUMNS = (
+    "card_id",
+    "issue",
+    "detail",
+    "action",
+    "saved_at",
+    "user",
+    "lu",
+    "tanggal",
+    "shift",
+)
 
 
 @dataclass
@@ -76,14 +107,774 @@ def build_card_rows(
     return rows
 
 
-def append_cards_to_csv(rows: list[dict[str, str]]) -> Path:
-    file_path = Path(get_cards_file_path())
+def _verify_cards_file(handle: IO[bytes]) -> list[str]:
+    """Check an open cards file and return its column names.
+
+    An empty file gets the BOM and header. A last row cut short by a crash
+    (no trailing newline) is truncated so the next append starts on a clean
+    line. Only the first line and the tail are read.
+    """
+
+    size = handle.seek(0, os.SEEK_END)
+    if size == 0:
+        handle.write(("\ufeff" + ",".join(CARD_COLUMNS) + "\r\n").encode("utf-8"))
+        return list(CARD_COLUMNS)
+
+    handle.seek(0)
+    header = next(csv.reader([handle.readline().decode("utf-8-sig")]), [])
+    if "card_id" not in header:
+        raise ValueError(f"Header file kartu tidak valid: {header}")
+
+    handle.seek(size - 1)
+    if handle.read(1) != b"\n":
+        position = size
+        while position > 0:
+            start = max(0, position - 4096)
+            handle.seek(start)
+            newline = handle.read(position - start).rfind(b"\n")
+            if newline != -1:
+                handle.truncate(start + newline + 1)
+                break
+            position = start
+    return header
+
+
+def append_cards_to_csv(
+    rows: list[dict[str, str]], file_path: str | os.PathLike[str] | None = None
+) -> Path:
+    """Append ``rows`` to the cards CSV without rewriting existing history.
+
+    Writers are serialised with a file lock and every batch is flushed and
+    fsynced before the lock is released, so a save costs the same no matter
+    how many rows the file already holds.
+    """
 
-    if file_path.exists():
-        existing_df = pd.read_csv(file_path)
-        combined = pd.concat([existing_df, pd.DataFrame(rows)], ignore_index=True)
-    else:
-        combined = pd.DataFrame(rows)
+    file_path = Path(file_path or get_cards_file_path())
 
-    combined.to_csv(file_path, index=False, encoding="utf-8-sig")
+    with open(file_path, "a+b") as handle, locked(handle):
+        fieldnames = _verify_cards_file(handle)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer, fieldnames=fieldnames, restval="", extrasaction="ignore"
+        )
+        writer.writerows(rows)
+        handle.write(buffer.getvalue().encode("utf-8"))
+        handle.flush()
+        os.fsync(handle.fileno())
     return file_path
+
+
+# ----------------------------------------------------------------------
+# SQLite store ---------------------------------------------------------
+# ----------------------------------------------------------------------
+_CARDS_TABLE = f"""
+CREATE TABLE IF NOT EXISTS cards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f"{column} TEXT NOT NULL DEFAULT ''" for column in CARD_COLUMNS)}
+)"""
+_CARD_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_cards_lu_tanggal_shift "
+    "ON cards (lu, tanggal, shift)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_card_id ON cards (card_id)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_issue ON cards (issue)",
+)
+_SCHEMA = ";\n".join((_CARDS_TABLE, *_CARD_INDEXES)) + """;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS card_partitions (
+    month TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    date_min TEXT NOT NULL,
+    date_max TEXT NOT NULL,
+    id_min INTEGER NOT NULL,
+    id_max INTEGER NOT NULL,
+    compacted_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS card_index (
+    card_id TEXT PRIMARY KEY,
+    month TEXT NOT NULL,
+    hash TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Month a row belongs to: its production date, or when it was saved.
+_MONTH = "substr(COALESCE(NULLIF(tanggal, ''), saved_at), 1, 7)"
+
+_INSERT = (
+    f"INSERT INTO cards ({', '.join(CARD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in CARD_COLUMNS)})"
+)
+
+
+@dataclass
+class CardPartition:
+    """Manifest entry of one compacted month."""
+
+    month: str
+    path: Path
+    rows: int
+    date_min: str
+    date_max: str
+    id_min: int
+    id_max: int
+
+
+@dataclass
+class CardUpsert:
+    """Outcome of :meth:`CardStore.upsert`, as lists of ``card_id``."""
+
+    path: Path
+    inserted: list[str] = field(default_factory=list)
+    replaced: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> list[str]:
+        return self.inserted + self.replaced
+
+
+@dataclass
+class CardPage:
+    """One page of :meth:`CardStore.query`, newest first.
+
+    Pass ``next_cursor`` as ``before`` to fetch the following page; it is
+    ``None`` on the last page.
+    """
+
+    records: list[CardRecord]
+    next_cursor: Optional[int] = None
+
+
+class CardStore:
+    """Issue cards in an indexed SQLite database (WAL mode).
+
+    Rows from ``migrate_from`` (the old ``issue_cards.csv``) are imported
+    once, the first time the database is opened; the CSV is left in place.
+    A single connection is shared between threads behind a lock.
+
+    The database only needs to hold open months: :meth:`compact` moves
+    closed months into one Parquet file each under ``partition_dir``
+    (needs the optional ``archive`` extra). The ``card_partitions`` table
+    is their manifest; queries read only the partitions whose date and id
+    bounds can match, so old months cost nothing until asked for.
+    """
+
+    # Parsed partitions kept in memory, most recently used last.
+    MAX_CACHED_PARTITIONS = 6
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        migrate_from: str | os.PathLike[str] | None = None,
+        partition_dir: str | os.PathLike[str] | None = None,
+    ) -> None:
+        self.path = Path(path or get_cards_db_path())
+        self.partition_dir = (
+            Path(partition_dir) if partition_dir else self.path.with_name("cards")
+        )
+        self._tables: OrderedDict[Path, tuple[int, object]] = OrderedDict()
+        self._tables_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(_SCHEMA)
+        self._upgrade_ids()
+        self._index: Optional[dict[str, tuple[str, str]]] = None
+        if migrate_from is not None:
+            self.migrate_csv(migrate_from)
+        self._build_card_index()
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def save(self, rows: Iterable[dict[str, str]]) -> Path:
+        """Upsert ``rows`` (see :meth:`upsert`) and return the database path."""
+
+        return self.upsert(rows).path
+
+    def upsert(self, rows: Iterable[dict[str, str]]) -> CardUpsert:
+        """Store the rows of each card, replacing what it saved before.
+
+        Rows are grouped by ``card_id`` and compared with the content hash
+        in the ``card_index`` table (``saved_at`` is not part of it):
+        unchanged cards are skipped, changed cards have their previous rows
+        deleted, including from a compacted month, and only new or changed
+        rows are written. Saving the same cards twice writes nothing.
+        """
+
+        groups: dict[str, list[dict[str, str]]] = {}
+        for row in rows:
+            groups.setdefault(str(row.get("card_id") or ""), []).append(row)
+        hashes = {card_id: _content_hash(group) for card_id, group in groups.items()}
+
+        result = CardUpsert(self.path)
+        index = self._card_index()
+        pending = [
+            card_id
+            for card_id in groups
+            if not card_id or index.get(card_id, ("", ""))[1] != hashes[card_id]
+        ]
+        result.unchanged = [card_id for card_id in groups if card_id not in pending]
+        if not pending:
+            return result
+
+        indexed: dict[str, tuple[str, str]] = {}
+        # Compacted month -> cards whose old rows must leave its partition.
+        stale: dict[str, list[str]] = {}
+        with self._transaction() as conn:
+            compacted = {
+                row[0] for row in conn.execute("SELECT month FROM card_partitions")
+            }
+            for card_id in pending:
+                group = groups[card_id]
+                if card_id:
+                    # Checked again here: another instance may share the file.
+                    previous = conn.execute(
+                        "SELECT month, hash FROM card_index WHERE card_id = ?",
+                        (card_id,),
+                    ).fetchone()
+                    if previous is not None and previous[1] == hashes[card_id]:
+                        result.unchanged.append(card_id)
+                        indexed[card_id] = previous
+                        continue
+                    if previous is not None:
+                        conn.execute("DELETE FROM cards WHERE card_id = ?", (card_id,))
+                        if previous[0] in compacted:
+                            stale.setdefault(previous[0], []).append(card_id)
+                        result.replaced.append(card_id)
+                    else:
+                        result.inserted.append(card_id)
+                    indexed[card_id] = (_row_month(group[0]), hashes[card_id])
+                    conn.execute(
+                        "INSERT OR REPLACE INTO card_index VALUES (?, ?, ?)",
+                        (card_id, *indexed[card_id]),
+                    )
+                else:
+                    result.inserted.append(card_id)
+                conn.executemany(_INSERT, map(_row_values, group))
+        index.update(indexed)
+
+        for month, card_ids in stale.items():
+            self._drop_from_partition(month, card_ids)
+        return result
+
+    def migrate_csv(self, csv_path: str | os.PathLike[str]) -> int:
+        """Import a cards CSV once; returns the number of rows imported."""
+
+        csv_path = Path(csv_path)
+        with self._transaction() as conn:
+            # Checked inside the write transaction so two instances opening
+            # the store at the same time cannot both import the file.
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone():
+                return 0
+            imported = 0
+            if csv_path.exists():
+                with open(csv_path, newline="", encoding="utf-8-sig") as handle:
+                    cursor = conn.executemany(
+                        _INSERT, map(_row_values, csv.DictReader(handle))
+                    )
+                    imported = cursor.rowcount
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)",
+                (datetime.now().isoformat(timespec="seconds"),),
+            )
+        return imported
+
+    def query(
+        self,
+        *,
+        lu: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        shift: str | None = None,
+        card_id: str | None = None,
+        issue: str | None = None,
+        user: str | None = None,
+        limit: int = 50,
+        before: int | None = None,
+    ) -> CardPage:
+        """Return saved rows matching every given filter, newest first.
+
+        Dates are inclusive ``YYYY-MM-DD`` strings; ``issue`` matches
+        exactly. Paging is keyset based, so later pages cost the same as
+        the first.
+        """
+
+        where, params = _filters(
+            lu=lu,
+            date_from=date_from,
+            date_to=date_to,
+            shift=shift,
+            card_id=card_id,
+            issue=issue,
+            user=user,
+        )
+        if before is not None:
+            where.append("id < ?")
+            params.append(before)
+        sql = f"SELECT id, {', '.join(CARD_COLUMNS)} FROM cards"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        rows = self._merge_partitions(
+            rows,
+            limit + 1,
+            before=before,
+            lu=lu,
+            date_from=date_from,
+            date_to=date_to,
+            shift=shift,
+            card_id=card_id,
+            issue=issue,
+            user=user,
+        )
+
+        records = [
+            CardRecord.from_dict(dict(zip(CARD_COLUMNS, row[1:])))
+            for row in rows[:limit]
+        ]
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return CardPage(records, next_cursor)
+
+    def count(self, **filters: str | None) -> int:
+        """Number of rows matching the filters accepted by :meth:`query`."""
+
+        where, params = _filters(**filters)
+        sql = "SELECT COUNT(*) FROM cards"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            total = self._conn.execute(sql, params).fetchone()[0]
+        for partition in self._matching_partitions(
+            filters.get("date_from"), filters.get("date_to")
+        ):
+            if not any(filters.values()):
+                total += partition.rows
+            else:
+                total += len(self._partition_rows(partition, **filters))
+        return total
+
+    def partitions(self) -> list[CardPartition]:
+        """Manifest of the compacted months, newest first."""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT month, path, rows, date_min, date_max, id_min, id_max "
+                "FROM card_partitions ORDER BY id_max DESC"
+            ).fetchall()
+        return [
+            CardPartition(month, self.partition_dir / name, *rest)
+            for month, name, *rest in rows
+        ]
+
+    def compact(self, *, before: str | None = None) -> list[str]:
+        """Move months before ``before`` (``YYYY-MM``) into Parquet partitions.
+
+        ``before`` defaults to the current month, so only closed months are
+        touched. Rows are merged into the month's file, then deleted from
+        the database and recorded in the manifest in one transaction.
+        Returns the months compacted; does nothing without pyarrow.
+        """
+
+        if pa is None:
+            return []
+        before = before or f"{date.today():%Y-%m}"
+        with self._lock:
+            months = [
+                row[0]
+                for row in self._conn.execute(
+                    f"SELECT DISTINCT {_MONTH} FROM cards "
+                    f"WHERE {_MONTH} < ? AND {_MONTH} GLOB ?",
+                    (before, "[0-9][0-9][0-9][0-9]-[0-9][0-9]"),
+                )
+            ]
+        if not months:
+            return []
+
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        # Another app instance may compact the same database.
+        with open(self.partition_dir / ".lock", "a+b") as handle, locked(handle):
+            for month in sorted(months):
+                self._compact_month(month)
+        return sorted(months)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _upgrade_ids(self) -> None:
+        """Stop SQLite from reusing the ids of compacted rows.
+
+        Databases created before compaction declared ``id`` without
+        ``AUTOINCREMENT``, so the id of a deleted highest row was handed out
+        again and collided with its copy in a partition. The table is
+        rebuilt once and the sequence starts above every compacted id.
+        """
+
+        with self._lock:
+            (sql,) = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cards'"
+            ).fetchone()
+            if "AUTOINCREMENT" in sql.upper():
+                return
+        columns = ", ".join(CARD_COLUMNS)
+        with self._transaction() as conn:
+            conn.execute("ALTER TABLE cards RENAME TO cards_old")
+            conn.execute(_CARDS_TABLE)
+            conn.execute(
+                f"INSERT INTO cards (id, {columns}) SELECT id, {columns} FROM cards_old"
+            )
+            # The old indexes go with the old table and are created afresh.
+            conn.execute("DROP TABLE cards_old")
+            for statement in _CARD_INDEXES:
+                conn.execute(statement)
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = 'cards'")
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT 'cards', MAX("
+                "(SELECT COALESCE(MAX(id), 0) FROM cards), "
+                "(SELECT COALESCE(MAX(id_max), 0) FROM card_partitions))"
+            )
+
+    def _card_index(self) -> dict[str, tuple[str, str]]:
+        """``card_id`` -> (month, content hash), read from the table once."""
+
+        with self._lock:
+            if self._index is None:
+                self._index = {
+                    card_id: (month, content_hash)
+                    for card_id, month, content_hash in self._conn.execute(
+                        "SELECT card_id, month, hash FROM card_index"
+                    )
+                }
+            return self._index
+
+    def _build_card_index(self) -> None:
+        """Index cards saved before upserts existed, once.
+
+        Older saves appended a card again on every click; the index takes
+        the rows of its latest save. Compacted months are read first so
+        rows still in the database win.
+        """
+
+        with self._lock:
+            if self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'card_index_built'"
+            ).fetchone():
+                return
+        latest: dict[str, list[tuple]] = {}
+        # Rows are (id, *CARD_COLUMNS).
+        saved_at = 1 + CARD_COLUMNS.index("saved_at")
+
+        def collect(rows: Iterable[tuple]) -> None:
+            for row in rows:
+                if not row[1]:
+                    continue
+                group = latest.get(row[1])
+                if group is None or row[saved_at] > group[0][saved_at]:
+                    latest[row[1]] = [row]
+                elif row[saved_at] == group[0][saved_at]:
+                    group.append(row)
+
+        for partition in sorted(self._matching_partitions(None, None), key=_id_max):
+            collect(sorted(self._partition_rows(partition)))
+        with self._lock:
+            collect(
+                self._conn.execute(
+                    f"SELECT id, {', '.join(CARD_COLUMNS)} FROM cards "
+                    "WHERE card_id != '' ORDER BY id"
+                )
+            )
+        entries = []
+        for card_id, group in latest.items():
+            records = [dict(zip(CARD_COLUMNS, row[1:])) for row in group]
+            entries.append((card_id, _row_month(records[0]), _content_hash(records)))
+
+        with self._transaction() as conn:
+            if conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'card_index_built'"
+            ).fetchone():
+                return
+            conn.executemany(
+                "INSERT OR IGNORE INTO card_index VALUES (?, ?, ?)", entries
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('card_index_built', ?)",
+                (datetime.now().isoformat(timespec="seconds"),),
+            )
+
+    def _compact_month(self, month: str) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(CARD_COLUMNS)} FROM cards "
+                f"WHERE {_MONTH} = ? ORDER BY id",
+                (month,),
+            ).fetchall()
+        if not rows:
+            return
+
+        table = pa.Table.from_pylist(
+            [dict(zip(("id", *CARD_COLUMNS), row)) for row in rows],
+            schema=_arrow_schema(),
+        )
+        path = self.partition_dir / f"{month}.parquet"
+        if path.exists():
+            existing = pq.read_table(path, schema=_arrow_schema())
+            # Rows left behind by an interrupted earlier run are replaced.
+            keep = pc.invert(pc.is_in(existing["id"], value_set=table["id"]))
+            table = pa.concat_tables([existing.filter(keep), table]).sort_by("id")
+        self._write_partition(path, table)
+
+        with self._transaction() as conn:
+            # Rows saved for this month after the read stay for the next run.
+            conn.execute(
+                f"DELETE FROM cards WHERE {_MONTH} = ? AND id <= ?",
+                (month, rows[-1][0]),
+            )
+            self._record_partition(conn, month, path, table)
+
+    def _drop_from_partition(self, month: str, card_ids: list[str]) -> None:
+        """Remove replaced cards from a compacted month."""
+
+        if pa is None:
+            return
+        path = self.partition_dir / f"{month}.parquet"
+        with open(self.partition_dir / ".lock", "a+b") as handle, locked(handle):
+            if not path.exists():
+                return
+            table = pq.read_table(path, schema=_arrow_schema())
+            table = table.filter(
+                pc.invert(pc.is_in(table["card_id"], value_set=pa.array(card_ids)))
+            )
+            self._write_partition(path, table)
+            with self._transaction() as conn:
+                self._record_partition(conn, month, path, table)
+
+    def _write_partition(self, path: Path, table) -> None:
+        tmp_path = path.with_name(f".{path.stem}.{os.urandom(4).hex()}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        with self._tables_lock:
+            self._tables.pop(path, None)
+
+    @staticmethod
+    def _record_partition(
+        conn: sqlite3.Connection, month: str, path: Path, table
+    ) -> None:
+        if table.num_rows == 0:
+            conn.execute("DELETE FROM card_partitions WHERE month = ?", (month,))
+            return
+        dates = [
+            tanggal or saved_at[:10]
+            for tanggal, saved_at in zip(
+                table["tanggal"].to_pylist(), table["saved_at"].to_pylist()
+            )
+        ]
+        ids = pc.min_max(table["id"])
+        conn.execute(
+            "INSERT OR REPLACE INTO card_partitions " "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                month,
+                path.name,
+                table.num_rows,
+                min(dates),
+                max(dates),
+                ids["min"].as_py(),
+                ids["max"].as_py(),
+                datetime.now().isoformat(timespec="seconds"),
+            ),
+        )
+
+    def _matching_partitions(
+        self,
+        date_from: str | None,
+        date_to: str | None,
+        before: int | None = None,
+    ) -> list[CardPartition]:
+        if pa is None:
+            # Compacted months cannot be read without pyarrow.
+            return []
+        return [
+            partition
+            for partition in self.partitions()
+            if not (date_from and partition.date_max < date_from)
+            and not (date_to and partition.date_min > date_to)
+            and not (before is not None and partition.id_min >= before)
+        ]
+
+    def _merge_partitions(
+        self, rows: list[tuple], wanted: int, *, before: int | None, **filters
+    ) -> list[tuple]:
+        """Add matching compacted rows to ``rows``; keeps the newest ``wanted``."""
+
+        partitions = self._matching_partitions(
+            filters.get("date_from"), filters.get("date_to"), before
+        )
+        if not partitions:
+            return rows
+        merged = {row[0]: row for row in rows}
+        for partition in partitions:
+            ordered = sorted(merged, reverse=True)
+            if len(ordered) >= wanted and ordered[wanted - 1] > partition.id_max:
+                # Every row left in this and older partitions is older.
+                break
+            for row in self._partition_rows(partition, before=before, **filters)[
+                :wanted
+            ]:
+                merged.setdefault(row[0], row)
+        return [merged[key] for key in sorted(merged, reverse=True)[:wanted]]
+
+    def _partition_rows(
+        self, partition: CardPartition, *, before: int | None = None, **filters
+    ) -> list[tuple]:
+        """Rows of ``partition`` matching the filters, newest first."""
+
+        table = self._partition_table(partition.path)
+        if table is None:
+            return []
+        mask = None
+        conditions = [
+            pc.equal(table[column], value)
+            for column in ("lu", "shift", "card_id", "issue", "user")
+            if (value := filters.get(column))
+        ]
+        if filters.get("date_from"):
+            conditions.append(pc.greater_equal(table["tanggal"], filters["date_from"]))
+        if filters.get("date_to"):
+            conditions.append(pc.less_equal(table["tanggal"], filters["date_to"]))
+        if before is not None:
+            conditions.append(pc.less(table["id"], before))
+        for condition in conditions:
+            mask = condition if mask is None else pc.and_(mask, condition)
+        if mask is not None:
+            table = table.filter(mask)
+        table = table.sort_by([("id", "descending")])
+        columns = [table[name].to_pylist() for name in ("id", *CARD_COLUMNS)]
+        return list(zip(*columns))
+
+    def _partition_table(self, path: Path):
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        with self._tables_lock:
+            cached = self._tables.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                self._tables.move_to_end(path)
+                return cached[1]
+        table = pq.read_table(path, schema=_arrow_schema())
+        with self._tables_lock:
+            self._tables[path] = (mtime_ns, table)
+            while len(self._tables) > self.MAX_CACHED_PARTITIONS:
+                self._tables.popitem(last=False)
+        return table
+
+
+def _arrow_schema():
+    return pa.schema(
+        [("id", pa.int64())] + [(column, pa.string()) for column in CARD_COLUMNS]
+    )
+
+
+# Everything a card's rows say, apart from who stored them when.
+_CONTENT_COLUMNS = tuple(
+    column for column in CARD_COLUMNS if column not in ("card_id", "saved_at")
+)
+
+
+def _content_hash(rows: Iterable[dict[str, str]]) -> str:
+    content = [
+        [str(row.get(column) or "") for column in _CONTENT_COLUMNS] for row in rows
+    ]
+    return hashlib.sha1(
+        json.dumps(content, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _row_month(row: dict[str, str]) -> str:
+    return str(row.get("tanggal") or row.get("saved_at") or "")[:7]
+
+
+def _id_max(partition: CardPartition) -> int:
+    return partition.id_max
+
+
+def _row_values(row: dict[str, str]) -> tuple[str, ...]:
+    return tuple(str(row.get(column) or "") for column in CARD_COLUMNS)
+
+
+def _filters(
+    *,
+    lu: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    shift: str | None = None,
+    card_id: str | None = None,
+    issue: str | None = None,
+    user: str | None = None,
+) -> tuple[list[str], list[str]]:
+    where: list[str] = []
+    params: list[str] = []
+    for column, value in (
+        ("lu", lu),
+        ("shift", shift),
+        ("card_id", card_id),
+        ("issue", issue),
+        ("user", user),
+    ):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if date_from:
+        where.append("tanggal >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("tanggal <= ?")
+        params.append(date_to)
+    return where, params
+
+
+_default_store: Optional[CardStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_card_store() -> CardStore:
+    """The shared store under ``data/``, migrating ``issue_cards.csv`` once."""
+
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CardStore(
+                get_cards_db_path(),
+                migrate_from=get_cards_file_path(),
+                partition_dir=get_cards_partition_dir(),
+            )
+        return _default_store
+
+
+def save_cards_to_store(rows: list[dict[str, str]]) -> Path:
+    """Default card persister: insert ``rows`` into the shared store."""
+
+    return get_card_store().save(rows)
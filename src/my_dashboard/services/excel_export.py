@@ -0,0 +1,372 @@
+"""Streaming export of saved cards and stop reasons to the ``Data`` sheet.
+
+The sheet is an append log: a card saved again after an edit gets a new row
+rather than replacing the old one, and the row with the latest ``saved_at``
+for a ``card_id`` is the current one. Stop reasons are keyed by
+:func:`stop_rows_key` so the same table is written only once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import openpyxl
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from ..utils.filelock import locked
+from ..utils.helpers import get_excel_filename
+
+DATA_SHEET = "Data"
+
+DATA_COLUMNS = (
+    "jenis",
+    "tanggal",
+    "shift",
+    "lu",
+    "user",
+    "card_id",
+    "issue",
+    "detail",
+    "action",
+    "reason",
+    "stops",
+    "downtime",
+    "saved_at",
+)
+
+
+def card_data_rows(rows: Iterable[dict[str, str]]) -> list[list[object]]:
+    """``Data`` sheet rows for card rows from :func:`build_card_rows`."""
+
+    return [
+        [
+            "card",
+            row.get("tanggal", ""),
+            row.get("shift", ""),
+            row.get("lu", ""),
+            row.get("user", ""),
+            row.get("card_id", ""),
+            row.get("issue", ""),
+            row.get("detail", ""),
+            row.get("action", ""),
+            None,
+            None,
+            None,
+            row.get("saved_at", ""),
+        ]
+        for row in rows
+    ]
+
+
+def stop_reason_data_rows(
+    stops: Optional[pd.DataFrame],
+    *,
+    lu: str = "",
+    tanggal: str = "",
+    shift: str = "",
+    user: str = "",
+) -> list[list[object]]:
+    """``Data`` sheet rows for a processed ``stops_reason`` table."""
+
+    if stops is None or stops.empty:
+        return []
+    saved_at = datetime.now().isoformat(timespec="seconds")
+    stop_counts = pd.to_numeric(stops.get("Stops"), errors="coerce")
+    downtimes = pd.to_numeric(stops.get("Downtime"), errors="coerce")
+    return [
+        [
+            "stop",
+            tanggal,
+            shift,
+            lu,
+            user,
+            None,
+            None,
+            None,
+            None,
+            reason,
+            None if pd.isna(count) else int(count),
+            None if pd.isna(downtime) else float(downtime),
+            saved_at,
+        ]
+        for reason, count, downtime in zip(stops["Reason"], stop_counts, downtimes)
+    ]
+
+
+def stop_rows_key(rows: Sequence[Sequence[object]]) -> str:
+    """Key of a set of stop rows for the ``once`` groups of the exporter.
+
+    Made of the query (line, date, shift) and the reasons, stops and
+    downtimes, so saving again with the same table is a no-op while a
+    table that changed since (a shift re-read after it ended) is written.
+    """
+
+    if not rows:
+        return ""
+    _, tanggal, shift, lu, *_ = rows[0]
+    digest = hashlib.sha1(
+        repr([tuple(row[9:12]) for row in rows]).encode("utf-8")
+    ).hexdigest()
+    return f"stop|{lu}|{tanggal}|{shift}|{digest}"
+
+
+def append_to_data_sheet(
+    rows: Sequence[Sequence[object]],
+    file_path: str | os.PathLike[str] | None = None,
+    *,
+    once: Optional[Mapping[str, Sequence[Sequence[object]]]] = None,
+) -> Path:
+    """Append ``rows`` to the ``Data`` sheet of ``DB.xlsx``.
+
+    ``once`` maps a key to rows that are appended only if that key has not
+    been appended to this workbook before; the keys are kept in a
+    ``.DB.xlsx.keys`` file next to it and forgotten when the ``Data`` sheet
+    is found empty (a new workbook).
+
+    The workbook is never loaded: the ``Data`` sheet XML is streamed into a
+    copy of the archive with the new rows (inline strings) added before
+    ``</sheetData>``; every other part is copied as is, so styles and the
+    other sheets are untouched. A sheet written in a form this does not
+    recognise falls back to :func:`_append_by_copy`. An empty ``Data``
+    sheet gets the :data:`DATA_COLUMNS` header first.
+    """
+
+    file_path = Path(file_path or get_excel_filename())
+    tmp_path = file_path.with_name(f".{file_path.stem}.{os.getpid()}.tmp.xlsx")
+
+    keys_path = file_path.with_name(f".{file_path.name}.keys")
+
+    lock_path = file_path.with_name(f".{file_path.name}.lock")
+    with open(lock_path, "a+b") as handle, locked(handle):
+        fresh = not _sheet_has_rows(file_path)
+        seen = set() if fresh else _read_keys(keys_path)
+        rows = list(rows)
+        new_keys = []
+        for key, group in (once or {}).items():
+            if key and key not in seen and group:
+                rows.extend(group)
+                new_keys.append(key)
+                seen.add(key)
+        if not rows:
+            return file_path
+        try:
+            try:
+                _append_in_archive(file_path, tmp_path, rows)
+            except _UnsupportedSheet:
+                _append_by_copy(file_path, tmp_path, rows)
+            os.replace(tmp_path, file_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        if fresh or new_keys:
+            with open(keys_path, "w" if fresh else "a", encoding="utf-8") as keys:
+                keys.writelines(f"{key}\n" for key in new_keys)
+    return file_path
+
+
+def _read_keys(keys_path: Path) -> set[str]:
+    try:
+        with open(keys_path, encoding="utf-8") as keys:
+            return {line.rstrip("\n") for line in keys if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def _sheet_has_rows(file_path: Path) -> bool:
+    """Whether the ``Data`` sheet holds any row, reading as little as needed."""
+
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            part = _data_sheet_part(archive)
+            with archive.open(part) as reader:
+                tail = b""
+                while chunk := reader.read(_CHUNK):
+                    buffer = tail + chunk
+                    if _ROW_START.search(buffer):
+                        return True
+                    if b"</sheetData>" in buffer or b"<sheetData/>" in buffer:
+                        return False
+                    tail = buffer[-64:]
+                return False
+    except (_UnsupportedSheet, KeyError):
+        pass
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        if DATA_SHEET not in workbook.sheetnames:
+            return False
+        return any(
+            any(value is not None for value in row)
+            for row in workbook[DATA_SHEET].iter_rows(values_only=True)
+        )
+    finally:
+        workbook.close()
+
+
+class _UnsupportedSheet(Exception):
+    pass
+
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+}
+_ROW_NUMBER = re.compile(rb"<row\b[^>]*?\br=\"(\d+)\"")
+_XML_INVALID = re.compile(
+    "[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]"
+)
+_ROW_START = re.compile(rb"<row[\s>]")
+_DIMENSION = re.compile(rb"<dimension\b[^>]*/>")
+_CHUNK = 1 << 16
+
+
+def _data_sheet_part(archive: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rel_id = None
+    for sheet in workbook.iterfind("main:sheets/main:sheet", _NS):
+        if sheet.get("name") == DATA_SHEET:
+            rel_id = sheet.get(f"{{{_NS['r']}}}id")
+    if rel_id is None:
+        raise _UnsupportedSheet(DATA_SHEET)
+
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iterfind("rel:Relationship", _NS):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target", "")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    raise _UnsupportedSheet(rel_id)
+
+
+def _xml_text(value: object) -> str:
+    """``value`` as text with the characters XML 1.0 forbids removed.
+
+    Control characters pasted into a card would otherwise leave a workbook
+    Excel refuses to open.
+    """
+
+    return _XML_INVALID.sub("", str(value))
+
+
+def _row_xml(number: int, values: Sequence[object]) -> bytes:
+    cells = []
+    for column, value in enumerate(values, start=1):
+        if value is None or value == "":
+            continue
+        ref = f"{get_column_letter(column)}{number}"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_xml_text(value))
+            cells.append(
+                f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}'
+                "</t></is></c>"
+            )
+    return f'<row r="{number}">{"".join(cells)}</row>'.encode("utf-8")
+
+
+def _append_in_archive(
+    file_path: Path, tmp_path: Path, rows: Sequence[Sequence[object]]
+) -> None:
+    with zipfile.ZipFile(file_path) as source:
+        part = _data_sheet_part(source)
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                copy = zipfile.ZipInfo(info.filename, info.date_time)
+                copy.compress_type = info.compress_type
+                copy.external_attr = info.external_attr
+                with source.open(info) as reader, target.open(copy, "w") as writer:
+                    if info.filename == part:
+                        _stream_sheet(reader, writer, rows)
+                    else:
+                        shutil.copyfileobj(reader, writer, _CHUNK)
+
+
+def _stream_sheet(reader, writer, rows: Sequence[Sequence[object]]) -> None:
+    """Copy sheet XML from ``reader`` to ``writer`` with ``rows`` appended."""
+
+    last_row = 0
+    first = True
+    # Held back until the end so the closing tags can be found in it.
+    tail = b""
+    while chunk := reader.read(_CHUNK):
+        if first:
+            # The new rows make the stored dimension stale; it is optional.
+            chunk = _DIMENSION.sub(b"", chunk, count=1)
+            first = False
+        buffer = tail + chunk
+        numbers = _ROW_NUMBER.findall(buffer)
+        if numbers:
+            last_row = int(numbers[-1])
+        # Keep enough to cover a tag cut in half and the closing elements.
+        keep = max(len(buffer) - _CHUNK, 0)
+        writer.write(buffer[:keep])
+        tail = buffer[keep:]
+
+    end = tail.rfind(b"</sheetData>")
+    if end != -1:
+        head, rest = tail[:end], tail[end:]
+    else:
+        empty = tail.rfind(b"<sheetData/>")
+        if empty == -1:
+            raise _UnsupportedSheet("sheetData")
+        head = tail[:empty] + b"<sheetData>"
+        rest = b"</sheetData>" + tail[empty + len(b"<sheetData/>") :]
+
+    new_rows = []
+    if last_row == 0:
+        new_rows.append(_row_xml(1, DATA_COLUMNS))
+        last_row = 1
+    for offset, row in enumerate(rows, start=1):
+        new_rows.append(_row_xml(last_row + offset, row))
+    writer.write(head + b"".join(new_rows) + rest)
+
+
+def _append_by_copy(
+    file_path: Path, tmp_path: Path, rows: Sequence[Sequence[object]]
+) -> None:
+    """Stream every sheet (values only) into a new write-only workbook.
+
+    Slower, and cell styles are not carried over, but it copes with any
+    workbook openpyxl can read.
+    """
+
+    source = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        target = Workbook(write_only=True)
+        if DATA_SHEET not in source.sheetnames:
+            _copy_data_sheet(target.create_sheet(DATA_SHEET), [], rows)
+        for sheet in source.worksheets:
+            copy = target.create_sheet(sheet.title)
+            source_rows = sheet.iter_rows(values_only=True)
+            if sheet.title == DATA_SHEET:
+                _copy_data_sheet(copy, source_rows, rows)
+            else:
+                for row in source_rows:
+                    copy.append(row)
+        target.save(tmp_path)
+    finally:
+        source.close()
+
+
+def _copy_data_sheet(sheet, source_rows, rows) -> None:
+    empty = True
+    for row in source_rows:
+        if empty and not any(value is not None for value in row):
+            # A fresh sheet reads back as a single empty row.
+            continue
+        empty = False
+        sheet.append(row)
+    if empty:
+        sheet.append(list(DATA_COLUMNS))
+    for row in rows:
+        sheet.append([_xml_text(v) if isinstance(v, str) else v for v in row])
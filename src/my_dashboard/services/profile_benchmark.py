@@ -0,0 +1,138 @@
+"""Compare loss-tree query profiles by bytes transferred and parse time.
+
+Run from the project root::
+
+    PYTHONPATH=src python -m my_dashboard.services.profile_benchmark [cassettes]
+
+The bundled fixture (``assets/spa1.html``, a ``full`` page) is always
+measured. Pages for the smaller profiles only exist once the server has
+produced them: record a session with ``environment = record`` (each screen
+asks for its own profile) and pass the cassette folder. Profiles without a
+page are listed at the end.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..utils.constants import LOSS_TREE_PROFILES
+from ..utils.helpers import loss_tree_profile_of, resource_path
+from .spa_service import (
+    DataFrameSplitter,
+    DataLossesTableProcessor,
+    HTMLTableExtractor,
+    SPADataProcessor,
+    StopReasonTableProcessor,
+)
+
+FIXTURES = ("assets/spa1.html",)
+
+
+@dataclass
+class PageMeasurement:
+    label: str
+    profile: str
+    size: int
+    tables: int
+    parse_all: float
+    parse_main: float
+
+
+def _best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure_page(
+    label: str, profile: str, html: str, *, repeat: int = 5
+) -> PageMeasurement:
+    """Time the processing pipeline on ``html``.
+
+    ``parse_all`` parses every table before processing (the previous
+    pipeline), ``parse_main`` is the current one that parses only the main
+    data table.
+    """
+
+    def parse_all() -> None:
+        tables = HTMLTableExtractor(html).extract()
+        sections = DataFrameSplitter(tables).split_by_column_14()
+        DataLossesTableProcessor(sections).process()
+        StopReasonTableProcessor(sections).process()
+
+    def parse_main() -> None:
+        asyncio.run(SPADataProcessor(html, is_html=True).process())
+
+    return PageMeasurement(
+        label=label,
+        profile=profile,
+        size=len(html.encode("utf-8")),
+        tables=len(HTMLTableExtractor(html).extract()),
+        parse_all=_best_of(repeat, parse_all),
+        parse_main=_best_of(repeat, parse_main),
+    )
+
+
+def _cassette_pages(cassette_dir: Path) -> list[tuple[str, str, str]]:
+    pages = []
+    for path in sorted(cassette_dir.glob("*.json")):
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        profile = loss_tree_profile_of(entry.get("url", ""))
+        if profile is None or entry.get("status_code") != 200:
+            continue
+        html = base64.b64decode(entry.get("body", "")).decode("utf-8", "replace")
+        pages.append((path.stem[:10], profile, html))
+    return pages
+
+
+def main(cassette_dir: Optional[str] = None, repeat: int = 5) -> list[PageMeasurement]:
+    pages = [
+        (fixture, "full", Path(resource_path(fixture)).read_text(encoding="utf-8"))
+        for fixture in FIXTURES
+    ]
+    if cassette_dir:
+        pages.extend(_cassette_pages(Path(cassette_dir)))
+
+    results = [measure_page(*page, repeat=repeat) for page in pages]
+
+    print(
+        f"{'page':<20} {'profile':<13} {'KB':>7} {'tables':>6} "
+        f"{'all tables':>10} {'main only':>10}"
+    )
+    for result in results:
+        print(
+            f"{result.label:<20} {result.profile:<13} {result.size / 1024:7.1f} "
+            f"{result.tables:6} {result.parse_all * 1000:8.1f}ms "
+            f"{result.parse_main * 1000:8.1f}ms"
+        )
+
+    by_profile: dict[str, list[PageMeasurement]] = {}
+    for result in results:
+        by_profile.setdefault(result.profile, []).append(result)
+    if len(by_profile) > 1:
+        print("\nMean per profile")
+        for profile, group in by_profile.items():
+            print(
+                f"{profile:<13} {statistics.mean(r.size for r in group) / 1024:7.1f} KB"
+                f"  {statistics.mean(r.parse_main for r in group) * 1000:8.1f}ms"
+                f"  ({len(group)} pages)"
+            )
+    missing = [profile for profile in LOSS_TREE_PROFILES if profile not in by_profile]
+    if missing:
+        print(f"\nTidak ada halaman untuk profil: {', '.join(missing)}")
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover - benchmarking entry point
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
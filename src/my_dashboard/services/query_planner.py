@@ -0,0 +1,272 @@
+"""Plan multi-day SPA history queries from cache coverage and fetch cost."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Iterable, Literal, Optional, Sequence
+
+import pandas as pd
+
+Granularity = Literal["shift", "day", "range"]
+ALL_SHIFTS = ("1", "2", "3")
+
+
+@dataclass(frozen=True)
+class QueryUnit:
+    """One SPA loss-tree query; ``shift == ""`` aggregates every shift."""
+
+    line: str
+    date_min: date
+    date_max: date
+    shift: str
+    func_location: str
+
+    @property
+    def days(self) -> int:
+        return (self.date_max - self.date_min).days + 1
+
+
+@dataclass
+class PlanGroup:
+    """Units whose results are stitched into one requested output."""
+
+    key: tuple[str, str, str]
+    units: list[QueryUnit]
+
+
+@dataclass
+class QueryPlan:
+    groups: list[PlanGroup] = field(default_factory=list)
+    to_fetch: list[QueryUnit] = field(default_factory=list)
+    cost: float = 0.0
+
+
+class QueryPlanner:
+    """Choose between aggregated and per-shift queries for a history request.
+
+    ``is_cached`` reports whether a unit's result is already available.
+    Fetching a unit costs ``request_cost`` plus ``span_cost`` for every day
+    beyond the first, so a long aggregated query is cheaper than many
+    per-shift requests but never cheaper than data already on hand.
+    """
+
+    def __init__(
+        self,
+        is_cached: Callable[[QueryUnit], bool],
+        *,
+        request_cost: float = 1.0,
+        span_cost: float = 0.1,
+    ) -> None:
+        self._is_cached = is_cached
+        self.request_cost = request_cost
+        self.span_cost = span_cost
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def plan(
+        self,
+        lines: Iterable[str],
+        start: date,
+        end: date,
+        shifts: Sequence[str] = ALL_SHIFTS,
+        granularity: Granularity = "shift",
+        func_location: str = "PACK",
+    ) -> QueryPlan:
+        shifts = tuple(str(shift) for shift in shifts)
+        aggregatable = set(shifts) == set(ALL_SHIFTS)
+        days = [
+            start + timedelta(days=offset) for offset in range((end - start).days + 1)
+        ]
+
+        range_label = f"{start.isoformat()}..{end.isoformat()}"
+
+        plan = QueryPlan()
+        for line in lines:
+            if granularity == "shift":
+                for day in days:
+                    for shift in shifts:
+                        unit = QueryUnit(line, day, day, shift, func_location)
+                        plan.groups.append(
+                            PlanGroup((line, day.isoformat(), shift), [unit])
+                        )
+            elif not aggregatable:
+                # A shift subset cannot be served by an all-shift query.
+                per_day = {
+                    day: [
+                        QueryUnit(line, day, day, shift, func_location)
+                        for shift in shifts
+                    ]
+                    for day in days
+                }
+                if granularity == "day":
+                    for day, units in per_day.items():
+                        plan.groups.append(
+                            PlanGroup((line, day.isoformat(), ""), units)
+                        )
+                else:
+                    units = [unit for units in per_day.values() for unit in units]
+                    plan.groups.append(PlanGroup((line, range_label, ""), units))
+            elif granularity == "day":
+                for day in days:
+                    units = self._cheapest_day(line, day, func_location)
+                    plan.groups.append(PlanGroup((line, day.isoformat(), ""), units))
+            else:
+                units = self._cheapest_range(line, days, func_location)
+                plan.groups.append(PlanGroup((line, range_label, ""), units))
+
+        seen: set[QueryUnit] = set()
+        for group in plan.groups:
+            for unit in group.units:
+                if unit not in seen and not self._is_cached(unit):
+                    seen.add(unit)
+                    plan.to_fetch.append(unit)
+        plan.cost = sum(self._fetch_cost(unit) for unit in plan.to_fetch)
+        return plan
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _fetch_cost(self, unit: QueryUnit) -> float:
+        return self.request_cost + self.span_cost * (unit.days - 1)
+
+    def _cost(self, units: Iterable[QueryUnit]) -> float:
+        return sum(
+            0.0 if self._is_cached(unit) else self._fetch_cost(unit) for unit in units
+        )
+
+    def _per_shift(self, line: str, day: date, func_location: str) -> list[QueryUnit]:
+        return [QueryUnit(line, day, day, shift, func_location) for shift in ALL_SHIFTS]
+
+    def _cheapest_day(
+        self, line: str, day: date, func_location: str
+    ) -> list[QueryUnit]:
+        per_shift = self._per_shift(line, day, func_location)
+        aggregated = [QueryUnit(line, day, day, "", func_location)]
+        if self._cost(aggregated) < self._cost(per_shift):
+            return aggregated
+        return per_shift
+
+    def _cheapest_range(
+        self, line: str, days: list[date], func_location: str
+    ) -> list[QueryUnit]:
+        whole = [QueryUnit(line, days[0], days[-1], "", func_location)]
+        if self._is_cached(whole[0]):
+            return whole
+
+        # Covered days are reused; each uncovered run is fetched either as one
+        # aggregated query or per day, whichever costs less.
+        units: list[QueryUnit] = []
+        run: list[date] = []
+
+        def flush() -> None:
+            if not run:
+                return
+            aggregated = [QueryUnit(line, run[0], run[-1], "", func_location)]
+            per_day = [
+                unit
+                for day in run
+                for unit in self._cheapest_day(line, day, func_location)
+            ]
+            units.extend(
+                aggregated if self._cost(aggregated) < self._cost(per_day) else per_day
+            )
+            run.clear()
+
+        for day in days:
+            cheapest = self._cheapest_day(line, day, func_location)
+            if self._cost(cheapest) == 0:
+                flush()
+                units.extend(cheapest)
+            else:
+                run.append(day)
+        flush()
+
+        return whole if self._cost(whole) <= self._cost(units) else units
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series.astype(str).str.replace("%", ""), errors="coerce")
+
+
+def stitch_results(
+    parts: Sequence[dict[str, pd.DataFrame]],
+    weights: Optional[Sequence[float]] = None,
+) -> dict[str, pd.DataFrame]:
+    """Combine several processed SPA results into one.
+
+    Stop reasons are summed per line and reason (``Stops`` and
+    ``Downtime``). In the metrics row only the ``STOP`` count is summed;
+    every other metric, the ``UPDT``/``PDT`` downtime percentages included,
+    is averaged weighted by ``weights`` (the duration each part covers;
+    equal when omitted), and ``RANGE`` spans from the first part's start to
+    the last part's end. Averaged ratios are an approximation; a single
+    aggregated query is exact.
+    """
+
+    if weights is None:
+        weights = [1.0] * len(parts)
+    elif len(weights) != len(parts):
+        raise ValueError("weights harus sepanjang parts")
+    weighted = [(part, weight) for part, weight in zip(parts, weights) if part]
+    if len(weighted) == 1:
+        return weighted[0][0]
+    if not weighted:
+        return {"data_losses": pd.DataFrame(), "stops_reason": pd.DataFrame()}
+    parts = [part for part, _ in weighted]
+
+    stops = pd.concat(
+        [part.get("stops_reason", pd.DataFrame()) for part in parts], ignore_index=True
+    )
+    if not stops.empty:
+        stops["Stops"] = _numeric(stops["Stops"])
+        stops["Downtime"] = _numeric(stops["Downtime"])
+        stops = (
+            stops.groupby(["Line", "Reason"], as_index=False, sort=False)[
+                ["Stops", "Downtime"]
+            ]
+            .sum()
+            .sort_values("Stops", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+    frames = [part.get("data_losses", pd.DataFrame()) for part in parts]
+    losses = pd.concat(frames, ignore_index=True)
+    # One weight per metrics row, in the order pd.concat stacked them.
+    row_weights = pd.Series(
+        [
+            weight
+            for frame, (_, weight) in zip(frames, weighted)
+            for _ in range(len(frame))
+        ],
+        dtype=float,
+    )
+    combined: dict[str, object] = {}
+    for column in losses.columns:
+        if column == "RANGE":
+            ranges = losses[column].dropna().astype(str).tolist()
+            if ranges:
+                combined[column] = (
+                    f"{ranges[0].split(' to ')[0]} to {ranges[-1].split(' to ')[-1]}"
+                )
+            continue
+        values = _numeric(losses[column])
+        if column == "STOP":
+            combined[column] = round(values.sum(), 3)
+            continue
+        present = values.notna() & (row_weights > 0)
+        total = row_weights[present].sum()
+        combined[column] = round(
+            (
+                (values[present] * row_weights[present]).sum() / total
+                if total
+                else values.mean()
+            ),
+            3,
+        )
+
+    return {
+        "data_losses": pd.DataFrame([combined]) if combined else pd.DataFrame(),
+        "stops_reason": stops,
+    }
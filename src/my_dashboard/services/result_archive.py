@@ -0,0 +1,346 @@
+"""Columnar history of every processed SPA result, partitioned by line/date.
+
+Needs the optional ``archive`` extra (``pyarrow``); without it
+:meth:`ResultArchive.available` is false and the controller skips archiving.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from ..utils.csvhandle import get_archive_dir
+from ..utils.filelock import locked
+from ..utils.helpers import loss_tree_profile_of
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional "archive" extra
+    pa = pc = ds = pq = None
+
+# Profiles whose stop reason table is cut short; their stops are not archived
+# so they never replace a complete list for the same shift.
+TRUNCATED_PROFILES = ("preview", "metrics-only")
+
+# Source column -> (archive column, arrow type name).
+_COLUMNS = {
+    "stops_reason": {
+        "Line": ("spa_line", "string"),
+        "Reason": ("reason", "string"),
+        "Stops": ("stops", "int32"),
+        "Downtime": ("downtime", "float64"),
+    },
+    "data_losses": {
+        "RANGE": ("range", "string"),
+        "STOP": ("stops", "int32"),
+        "PR": ("pr", "float64"),
+        "MTBF": ("mtbf", "float64"),
+        "UPDT": ("updt", "float64"),
+        "PDT": ("pdt", "float64"),
+        "NATR": ("natr", "float64"),
+    },
+}
+
+
+def _arrow_schema(table: str):
+    fields = [
+        ("date", pa.date32()),
+        ("func_location", pa.string()),
+        ("shift", pa.string()),
+        ("date_max", pa.date32()),
+        ("days", pa.int16()),
+    ]
+    fields += [
+        (column, getattr(pa, type_name)())
+        for column, type_name in _COLUMNS[table].values()
+    ]
+    fields += [("fetched_at", pa.timestamp("s")), ("url", pa.string())]
+    return pa.schema(fields)
+
+
+def _partitioning():
+    return ds.partitioning(
+        pa.schema([("line", pa.string()), ("month", pa.string())]), flavor="hive"
+    )
+
+
+def _normalize_line(value: str) -> str:
+    return str(value).strip().removeprefix("LU")
+
+
+def parse_result_url(url: str) -> Optional[dict[str, object]]:
+    """Line, functional location, dates and shift encoded in a loss-tree URL."""
+
+    params = {
+        key: values[0]
+        for key, values in parse_qs(urlsplit(url).query, keep_blank_values=True).items()
+    }
+    line = params.get("db_Line", "")
+    func_location = params.get("db_FunctionalLocation", "")
+    try:
+        date_min = date.fromisoformat(params.get("db_SegmentDateMin", ""))
+    except ValueError:
+        return None
+    if "-L0" not in line:
+        return None
+    try:
+        date_max = date.fromisoformat(params.get("db_SegmentDateMax") or "")
+    except ValueError:
+        date_max = date_min
+    return {
+        "line": line.rsplit("-L0", 1)[1],
+        "func_location": func_location.rsplit("-", 1)[-1],
+        "date": date_min,
+        "date_max": date_max,
+        "shift": params.get("db_ShiftStart", ""),
+    }
+
+
+class ResultArchive:
+    """Append processed results to Parquet datasets under ``data/archive``.
+
+    Each table (``stops_reason``, ``data_losses``) is a hive-partitioned
+    dataset (``line=<lu>/month=<YYYY-MM>``) with typed columns and one file
+    per partition. Archiving a shift that is already present replaces its
+    rows instead of duplicating them. Queries prune partitions by line and
+    month and push the remaining filters down to the row groups.
+    """
+
+    TABLES = tuple(_COLUMNS)
+
+    def __init__(self, folder: str | os.PathLike[str] | None = None) -> None:
+        if not self.available():
+            raise RuntimeError(
+                "Arsip Parquet membutuhkan pyarrow (pip install my-dashboard[archive])"
+            )
+        self._folder = Path(folder) if folder is not None else None
+        self._datasets: dict[str, object] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return pa is not None
+
+    @property
+    def folder(self) -> Path:
+        if self._folder is None:
+            self._folder = Path(get_archive_dir())
+        return self._folder
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def archive(
+        self,
+        url: str,
+        processed: dict[str, pd.DataFrame],
+        *,
+        fetched_at: datetime | None = None,
+    ) -> list[Path]:
+        """Write the tables of one result; returns the files written.
+
+        URLs that are not loss-tree queries are ignored.
+        """
+
+        key = parse_result_url(url)
+        if key is None:
+            return []
+        fetched_at = (fetched_at or datetime.now()).replace(microsecond=0)
+        truncated = loss_tree_profile_of(url) in TRUNCATED_PROFILES
+
+        written = []
+        for table in self.TABLES:
+            df = processed.get(table)
+            if df is None or (table == "stops_reason" and truncated):
+                continue
+            arrow_table = self._to_arrow(table, df, key, fetched_at, url)
+            written.append(self._write(table, arrow_table, key))
+        return written
+
+    def query_stops(
+        self,
+        *,
+        line: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        shift: str | None = None,
+        reason: str | Sequence[str] | None = None,
+        func_location: str | None = None,
+        include_spans: bool = False,
+    ) -> pd.DataFrame:
+        """Archived stop reasons matching every given filter.
+
+        ``shift`` is ``"1"``-``"3"`` or ``""`` for whole-day results.
+        Multi-day results are left out unless ``include_spans`` is set.
+        """
+
+        return self._query(
+            "stops_reason",
+            line=line,
+            date_from=date_from,
+            date_to=date_to,
+            shift=shift,
+            func_location=func_location,
+            include_spans=include_spans,
+            reason=reason,
+        )
+
+    def query_losses(
+        self,
+        *,
+        line: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        shift: str | None = None,
+        func_location: str | None = None,
+        include_spans: bool = False,
+    ) -> pd.DataFrame:
+        """Archived line metrics (PR, MTBF, ...) matching the filters."""
+
+        return self._query(
+            "data_losses",
+            line=line,
+            date_from=date_from,
+            date_to=date_to,
+            shift=shift,
+            func_location=func_location,
+            include_spans=include_spans,
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _to_arrow(
+        self,
+        table: str,
+        df: pd.DataFrame,
+        key: dict[str, object],
+        fetched_at: datetime,
+        url: str,
+    ):
+        rows = len(df)
+        columns: dict[str, object] = {
+            "date": [key["date"]] * rows,
+            "func_location": [key["func_location"]] * rows,
+            "shift": [key["shift"]] * rows,
+            "date_max": [key["date_max"]] * rows,
+            "days": [(key["date_max"] - key["date"]).days + 1] * rows,
+        }
+        for source, (column, type_name) in _COLUMNS[table].items():
+            values = df[source] if source in df.columns else pd.Series([None] * rows)
+            if type_name == "string":
+                columns[column] = [
+                    None if pd.isna(value) else str(value) for value in values
+                ]
+            else:
+                numbers = pd.to_numeric(
+                    values.astype(str).str.replace("%", "").str.replace(",", ""),
+                    errors="coerce",
+                )
+                columns[column] = [
+                    None if pd.isna(value) else value for value in numbers.tolist()
+                ]
+        columns["fetched_at"] = [fetched_at] * rows
+        columns["url"] = [url] * rows
+        return pa.Table.from_pydict(columns, schema=_arrow_schema(table))
+
+    def _write(self, table: str, arrow_table, key: dict[str, object]) -> Path:
+        folder = (
+            self.folder / table / f"line={key['line']}" / f"month={key['date']:%Y-%m}"
+        )
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / "data.parquet"
+
+        # Other app instances may archive into the same month.
+        with open(folder / ".lock", "a+b") as handle, locked(handle):
+            if path.exists():
+                # Parquet stores second timestamps as milliseconds.
+                existing = pq.ParquetFile(path).read().cast(arrow_table.schema)
+                same_result = pc.and_(
+                    pc.and_(
+                        pc.equal(existing["func_location"], key["func_location"]),
+                        pc.equal(existing["shift"], key["shift"]),
+                    ),
+                    pc.and_(
+                        pc.equal(existing["date"], key["date"]),
+                        pc.equal(existing["date_max"], key["date_max"]),
+                    ),
+                )
+                arrow_table = pa.concat_tables(
+                    [existing.filter(pc.invert(same_result)), arrow_table]
+                )
+            arrow_table = arrow_table.sort_by(
+                [("date", "ascending"), ("shift", "ascending")]
+            )
+            tmp_path = folder / f".data.{os.urandom(4).hex()}.tmp"
+            pq.write_table(arrow_table, tmp_path)
+            os.replace(tmp_path, path)
+
+        # The next query rediscovers the files.
+        self._datasets.pop(table, None)
+        return path
+
+    def _dataset(self, table: str):
+        dataset = self._datasets.get(table)
+        if dataset is None:
+            source = self.folder / table
+            if not source.exists():
+                return None
+            dataset = ds.dataset(
+                source,
+                format="parquet",
+                partitioning=_partitioning(),
+                schema=pa.unify_schemas([_arrow_schema(table), _partitioning().schema]),
+            )
+            self._datasets[table] = dataset
+        return dataset
+
+    def _query(
+        self,
+        table: str,
+        *,
+        line: str | None,
+        date_from: date | None,
+        date_to: date | None,
+        shift: str | None,
+        func_location: str | None,
+        include_spans: bool,
+        reason: str | Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        dataset = self._dataset(table)
+        if dataset is None:
+            schema = pa.unify_schemas([_arrow_schema(table), _partitioning().schema])
+            return schema.empty_table().to_pandas().drop(columns="month")
+
+        conditions = []
+        if line:
+            conditions.append(ds.field("line") == _normalize_line(line))
+        if date_from:
+            conditions.append(ds.field("month") >= f"{date_from:%Y-%m}")
+            conditions.append(ds.field("date") >= date_from)
+        if date_to:
+            conditions.append(ds.field("month") <= f"{date_to:%Y-%m}")
+            conditions.append(ds.field("date") <= date_to)
+        if shift is not None:
+            conditions.append(ds.field("shift") == str(shift).removeprefix("Shift "))
+        if func_location:
+            conditions.append(ds.field("func_location") == func_location[:4].upper())
+        if not include_spans:
+            conditions.append(ds.field("days") == 1)
+        if reason:
+            reasons = [reason] if isinstance(reason, str) else list(reason)
+            conditions.append(ds.field("reason").isin(reasons))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        result = dataset.to_table(filter=expression).to_pandas()
+        result = result.drop(columns="month")
+        return result.sort_values(["date", "shift"], kind="stable", ignore_index=True)
@@ -0,0 +1,75 @@
+"""Persistent on-disk cache of processed SPA results keyed by URL."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from ..utils.csvhandle import get_spa_cache_dir
+
+
+class SPAResultStore:
+    """Store each processed result as one JSON file named after its URL.
+
+    Files are written to a temporary name and atomically renamed, so an
+    interrupted write never leaves a half-written entry behind.
+    """
+
+    def __init__(self, folder: str | os.PathLike[str] | None = None) -> None:
+        self._folder = Path(folder) if folder is not None else None
+
+    @property
+    def folder(self) -> Path:
+        if self._folder is None:
+            self._folder = Path(get_spa_cache_dir())
+        self._folder.mkdir(parents=True, exist_ok=True)
+        return self._folder
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.folder / f"{digest}.json"
+
+    def has(self, url: str) -> bool:
+        return self._path(url).exists()
+
+    def saved_at(self, url: str) -> Optional[datetime]:
+        """When the entry for ``url`` was last written, or ``None``."""
+
+        try:
+            return datetime.fromtimestamp(self._path(url).stat().st_mtime)
+        except OSError:
+            return None
+
+    def load(self, url: str) -> Optional[dict[str, pd.DataFrame]]:
+        path = self._path(url)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        return {
+            name: pd.read_json(StringIO(table), orient="split", dtype=False)
+            for name, table in payload.get("tables", {}).items()
+        }
+
+    def save(self, url: str, processed: dict[str, pd.DataFrame]) -> Path:
+        path = self._path(url)
+        payload = {
+            "url": url,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "tables": {
+                name: df.to_json(orient="split", index=False)
+                for name, df in processed.items()
+            },
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
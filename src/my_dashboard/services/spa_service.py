@@ -4,9 +4,12 @@ from io import StringIO
 import httpx
 import numpy as np
 import pandas as pd
+from lxml import html as lxml_html
 from tabulate import tabulate
 
 from ..utils.constants import HEADERS, NTLM_AUTH
+from ..utils.http_policy import RequestPolicy, send_with_policy
+from ..utils.timing import DEFAULT_RECORDER, RequestTiming, RequestTimingRecorder
 
 
 class SPADataFetcher:
@@ -19,12 +22,16 @@ class SPADataFetcher:
         headers: dict[str, str] | None = None,
         auth=None,
         client: httpx.AsyncClient | None = None,
+        policy: RequestPolicy | None = None,
+        timings: RequestTimingRecorder | None = None,
     ) -> None:
         self.url = url
         self.raw_html: str | None = None
         self._headers = headers or HEADERS
         self._auth = auth or NTLM_AUTH
         self._client = client
+        self._policy = policy
+        self._timings = timings or DEFAULT_RECORDER
 
     async def fetch(self, client: httpx.AsyncClient | None = None) -> str:
         """Fetch HTML content from the URL asynchronously."""
@@ -35,12 +42,16 @@ class SPADataFetcher:
         active_client = client or self._client
         should_close = False
         if active_client is None:
-            active_client = httpx.AsyncClient(timeout=30)
+            active_client = httpx.AsyncClient(
+                timeout=30, event_hooks=self._timings.event_hooks
+            )
             should_close = True
 
         try:
-            response = await active_client.get(
+            response = await send_with_policy(
+                active_client,
                 self.url,
+                policy=self._policy,
                 headers=self._headers,
                 auth=self._auth,
                 follow_redirects=True,
@@ -53,6 +64,12 @@ class SPADataFetcher:
         self.raw_html = response.text
         return self.raw_html
 
+    @property
+    def timing(self) -> RequestTiming | None:
+        """Network timing breakdown of the last request for this URL."""
+
+        return self._timings.latest(self.url)
+
 
 class HTMLTableExtractor:
     """Extracts and processes tables from HTML content."""
@@ -61,9 +78,13 @@ class HTMLTableExtractor:
         self.html_content = html_content
         self.tables: list[pd.DataFrame] = []
 
-    def extract(self) -> list[pd.DataFrame]:
-        """Extract tables from HTML and replace empty strings with NaN."""
-        tables = pd.read_html(StringIO(self.html_content))
+    def extract(self, match: str = ".+") -> list[pd.DataFrame]:
+        """Extract tables from HTML and replace empty strings with NaN.
+
+        Only tables whose text matches the ``match`` regex are parsed, which
+        is far cheaper than converting every table on the page.
+        """
+        tables = pd.read_html(StringIO(self.html_content), match=match)
         if not tables:
             raise ValueError("No tables found in the HTML content.")
 
@@ -72,6 +93,61 @@ class HTMLTableExtractor:
         return self.tables
 
 
+class EquipmentDataExtractor:
+    """Extracts per-machine stop reasons from an equipment data page.
+
+    Only the machine header tables (first cell holding a functional location
+    such as ``ID01-SE-CP-L021-MAKE``) and the stop table that follows each
+    of them are converted to DataFrames; every other table is skipped.
+    """
+
+    LINE_PREFIXES = ("ID01", "PMID")
+    COLUMNS = ["Machine", "Description", "Stops", "DT [min]"]
+
+    def __init__(self, html_content: str):
+        self.html_content = html_content
+
+    @staticmethod
+    def _read_table(table, **kwargs) -> pd.DataFrame:
+        markup = lxml_html.tostring(table, encoding="unicode")
+        return pd.read_html(StringIO(markup), **kwargs)[0]
+
+    def _is_machine_header(self, table) -> bool:
+        cells = table.xpath(".//td")
+        if not cells:
+            return False
+        return cells[0].text_content().strip().startswith(self.LINE_PREFIXES)
+
+    def extract(self) -> pd.DataFrame:
+        """Return one row per machine stop reason (empty if none are found)."""
+
+        root = lxml_html.fromstring(self.html_content)
+        tables = root.xpath("//table")
+
+        frames: list[pd.DataFrame] = []
+        for idx, table in enumerate(tables[:-1]):
+            if not self._is_machine_header(table):
+                continue
+
+            header = self._read_table(table)
+            machine_name = header[2].iloc[1] if header.shape[1] > 2 else np.nan
+
+            stops = self._read_table(tables[idx + 1], header=0)
+            stops = stops.rename(columns={stops.columns[-1]: "Machine"})
+            if not set(self.COLUMNS).issubset(stops.columns):
+                continue
+            stops["Machine"] = stops["Machine"].fillna(machine_name)
+            frames.append(stops[self.COLUMNS])
+
+        if not frames:
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        combined = pd.concat(frames, ignore_index=True)
+        for column in ("Stops", "DT [min]"):
+            combined[column] = pd.to_numeric(combined[column], errors="coerce")
+        return combined
+
+
 class DataFrameCleaner:
     """Handles DataFrame cleaning operations."""
 
@@ -110,14 +186,15 @@ class DataFrameCleaner:
 class DataFrameSplitter:
     """Splits DataFrames based on specific column values."""
 
-    def __init__(self, tables: list[pd.DataFrame]):
+    def __init__(self, tables: list[pd.DataFrame], main_table: int = 3):
         self.tables = tables
+        self.main_table = main_table
         self.sections: list[pd.DataFrame] = []
 
     def split_by_column_14(self) -> list[pd.DataFrame]:
-        """Split the fourth table by rows where column 14 has value 'i'."""
-        # Select the fourth table as main datatable
-        datatable = self.tables[3]
+        """Split the main table by rows where column 14 has value 'i'."""
+        # Select the main datatable (the fourth table on a full page)
+        datatable = self.tables[self.main_table]
 
         # Remove duplicate rows
         datatable = DataFrameCleaner.remove_duplicate_rows(datatable)
@@ -194,6 +271,9 @@ class DataLossesTableProcessor:
 class SPADataProcessor:
     """Main processor that orchestrates all data processing operations."""
 
+    # Header text that only the main loss-tree table contains.
+    MAIN_TABLE_MATCH = "Time range"
+
     def __init__(
         self,
         source: str,
@@ -202,12 +282,14 @@ class SPADataProcessor:
         headers: dict[str, str] | None = None,
         auth=None,
         client: httpx.AsyncClient | None = None,
+        policy: RequestPolicy | None = None,
     ) -> None:
         self._source = source
         self._is_html = is_html
         self._headers = headers or HEADERS
         self._auth = auth or NTLM_AUTH
         self._client = client
+        self._policy = policy
         self.fetcher: SPADataFetcher | None = (
             None
             if is_html
@@ -216,6 +298,7 @@ class SPADataProcessor:
                 headers=self._headers,
                 auth=self._auth,
                 client=client,
+                policy=policy,
             )
         )
         self.raw_html: str | None = source if is_html else None
@@ -241,13 +324,15 @@ class SPADataProcessor:
                     headers=self._headers,
                     auth=self._auth,
                     client=self._client,
+                    policy=self._policy,
                 )
             self.raw_html = await self.fetcher.fetch(client=client)
 
+        # Only the main data table is used; skip the ~100 nested tables.
         extractor = HTMLTableExtractor(self.raw_html)
-        self.tables = extractor.extract()
+        self.tables = extractor.extract(match=self.MAIN_TABLE_MATCH)
 
-        splitter = DataFrameSplitter(self.tables)
+        splitter = DataFrameSplitter(self.tables, main_table=0)
         self.splitted_tables = splitter.split_by_column_14()
 
         self.processed_data = {
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 import tkinter as tk
+from datetime import date, datetime, timedelta
 from tkinter import messagebox
 from typing import Optional, Set
+from urllib.parse import urlsplit
 
 import httpx
 import pandas as pd
@@ -12,19 +17,39 @@ import qrcode
 import ttkbootstrap as ttk
 from async_tkinter_loop import async_handler
 from PIL import ImageTk
+from ttkbootstrap.dialogs import Querybox
 from ttkbootstrap.toast import ToastNotification
 
 from my_dashboard.services.achievement_service import (
+    TARGET_CACHE,
     compute_row_updates,
     fetch_actual_metrics,
     load_target_shift,
 )
 
+from ..components.history_window import HistoryWindow
 from ..components.target_editor import TargetEditor
 
-from ..controllers import ControllerError, DashboardController
-from ..utils.csvhandle import get_targets_file_path, save_user
-from ..utils.helpers import get_url_period_loss_tree, read_config, resource_path
+from ..controllers import CircuitOpenError, ControllerError, DashboardController
+from ..controllers.harvest import ShiftHarvestScheduler, parse_boundaries, shift_end
+from ..services.card_service import CardUpsert
+from ..utils.csvhandle import (
+    get_slow_request_log_path,
+    get_targets_file_path,
+    save_user,
+)
+from ..utils.endpoints import EndpointPool, EndpointRoutingTransport
+from ..utils.governor import background_priority, configure_governor
+from ..utils.io_worker import get_io_worker
+from ..utils.helpers import (
+    get_url_period_equipment_data,
+    get_url_period_loss_tree,
+    read_config,
+    resource_path,
+)
+from ..utils.http_policy import CircuitBreaker, RequestPolicy
+from ..utils.timing import RequestTimingRecorder
+from ..utils.transport import create_transport
 from .dashboard_view import DashboardView
 from .decorators import with_button_state, with_progressbar
 
@@ -39,13 +64,56 @@ class App(ttk.Window):
         self.iconbitmap(resource_path("assets/c5_spa.ico"))
 
         self.data_config = read_config()
+        configure_governor(self.data_config["DEFAULT"])
 
         self.selected_shift = tk.StringVar()
         self._active_toasts: Set[ToastNotification] = set()
+        self._closing = False
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
-        self.controller = DashboardController()
+        self._keepalive_expiry = max(
+            5.0, self.data_config.getfloat("DEFAULT", "keepalive_expiry", fallback=60)
+        )
+        self._endpoints = EndpointPool.from_config(self.data_config["DEFAULT"])
+        self._shift_boundaries = parse_boundaries(
+            self.data_config.get("DEFAULT", "shift_boundaries", fallback="")
+        )
+        self.controller = DashboardController(
+            http_client_factory=lambda: httpx.AsyncClient(
+                timeout=30,
+                limits=httpx.Limits(keepalive_expiry=self._keepalive_expiry),
+                transport=self._create_transport(),
+            ),
+            keepalive_expiry=self._keepalive_expiry,
+            request_timings=RequestTimingRecorder(
+                slow_threshold=self.data_config.getfloat(
+                    "DEFAULT", "slow_request_threshold", fallback=5
+                ),
+                slow_log_path=get_slow_request_log_path(),
+                measure_dns=self.data_config.getboolean(
+                    "DEFAULT", "measure_dns", fallback=False
+                ),
+            ),
+            url_builder=self._get_url,
+            archive_results=self.data_config.getboolean(
+                "DEFAULT", "archive_results", fallback=True
+            ),
+            prefetch_budget=self.data_config.getint(
+                "DEFAULT", "prefetch_budget", fallback=3
+            ),
+            request_policy=RequestPolicy.from_config(self.data_config["DEFAULT"]),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=self.data_config.getint(
+                    "DEFAULT", "breaker_failures", fallback=3
+                ),
+                reset_timeout=self.data_config.getfloat(
+                    "DEFAULT", "breaker_reset", fallback=30
+                ),
+            ),
+            shift_boundaries=self._shift_boundaries,
+        )
         self.target_editor: Optional[TargetEditor] = None
+        self.history_window: Optional[HistoryWindow] = None
         self.data_window: Optional[ttk.Toplevel] = None
         self.view = DashboardView(self)
         self.sidebar = self.view.sidebar
@@ -64,16 +132,60 @@ class App(ttk.Window):
 
         # self.sidebar.btn_target.configure(command=self.show_target_editor)
         self.sidebar.btn_get_data.configure(command=self.get_data_and_update_tables)
+        self.sidebar.chk_auto_refresh.configure(command=self.toggle_auto_refresh)
+        self.sidebar.btn_backfill.configure(command=self.prompt_backfill)
+        self.sidebar.btn_history.configure(command=self.show_history_window)
         # self.sidebar.btn_result.configure(command=self.refresh_achievement_table)
         # self.sidebar.btn_save.configure(command=self.save_data_cards_to_csv)
 
         link_up_values = sorted(self.data_config.get("DEFAULT", "link_up").split(","))
+        self.link_up_values = link_up_values
         self.sidebar.lu.configure(values=link_up_values)
         if link_up_values:
             self.sidebar.lu.current(0)
 
         self.issue_table.view.bind("<Double-1>", self.on_table_double_click)
 
+        self._auto_refresh_interval = max(
+            5.0,
+            self.data_config.getfloat("DEFAULT", "auto_refresh_interval", fallback=60),
+        )
+        self._auto_refresh_task: Optional[asyncio.Task] = None
+        self._detail_task: Optional[asyncio.Task] = None
+        # The unknown environment already reported; the scheduler asks often.
+        self._warned_environment: Optional[str] = None
+
+        # Warm the SPA connection once the event loop is running.
+        self._warmer_task: Optional[asyncio.Task] = None
+        if self.data_config.getboolean("DEFAULT", "prewarm_connection", fallback=True):
+            self.after(100, self._start_connection_warmer)
+        self._endpoint_probe_task: Optional[asyncio.Task] = None
+        if self._endpoints is not None:
+            self.after(100, self._start_endpoint_probe)
+
+        # Fill the local cache with each closed shift before the handover rush.
+        self._harvester = ShiftHarvestScheduler(
+            self._harvest_closed_shift,
+            boundaries=self._shift_boundaries,
+            delay=60
+            * self.data_config.getfloat("DEFAULT", "harvest_delay_minutes", fallback=5),
+            jitter=60
+            * self.data_config.getfloat(
+                "DEFAULT", "harvest_jitter_minutes", fallback=2
+            ),
+        )
+        if self.data_config.getboolean("DEFAULT", "harvest_enabled", fallback=True):
+            self.after(100, self._start_harvester)
+
+        # Parse every target table off the UI thread; lookups then hit memory.
+        threading.Thread(
+            target=TARGET_CACHE.preload, name="target-preload", daemon=True
+        ).start()
+
+        # Move closed months of saved cards out of the live database.
+        if self.data_config.getboolean("DEFAULT", "compact_cards", fallback=True):
+            self.after(self.CARD_COMPACTION_DELAY_MS, self._compact_cards)
+
         # self._initialize_issue_table()
 
     async def _initialize_stop_reason_table(self):
@@ -92,6 +204,24 @@ class App(ttk.Window):
         )
         self.issue_table.reset_table()
 
+    def _merge_issue_table(self, issue_df: pd.DataFrame) -> None:
+        """Update rows in place and append new ones, keeping the user's view."""
+
+        if issue_df.empty:
+            return
+        if not self.issue_table.tablerows:
+            self._populate_issue_table(issue_df)
+            return
+
+        existing = {tuple(row.values[:2]): row for row in self.issue_table.tablerows}
+        for values in issue_df.values.tolist():
+            row = existing.get(tuple(values[:2]))
+            if row is None:
+                # insert_rows() reverses its input; keep the server's order.
+                self.issue_table.insert_row("end", values)
+            elif list(row.values) != values:
+                row.values = values
+
     def _get_selected_date(self) -> str:
         if hasattr(self.date_entry, "entry"):
             return self.date_entry.entry.get()
@@ -126,6 +256,12 @@ class App(ttk.Window):
 
         return f"{exc.__class__.__name__}: {exc}\nURL: {url}"
 
+    def _mark_stale(self, time_text: str, stale_since: datetime) -> None:
+        self.time_period.configure(
+            text=f"{time_text}\n[DATA LAMA - {stale_since:%Y-%m-%d %H:%M}]".strip(),
+            bootstyle="warning",
+        )
+
     def add_new_card(self, issue_text: Optional[str] = None):
         return self.view.card_frame.add_card(issue_text)
 
@@ -261,9 +397,37 @@ class App(ttk.Window):
             )
             return
 
+        # Render the small preview page first unless the full page is on hand.
+        self._cancel_detail_fetch()
+        stored_after = self._closed_shift_end(date_entry, shift_number)
+        preview_url = self._get_url(
+            link_up, date_entry, shift_value, func_location, profile="preview"
+        )
+        progressive = (
+            bool(preview_url)
+            and preview_url != url
+            and not self.controller.circuit_open
+            and not self.controller.has_local_result(url, stored_after=stored_after)
+        )
+
         # Fetch remote data
+        stale_since = None
         try:
-            processed = await self.controller.fetch_remote_issue_data(url)
+            processed = await self.controller.fetch_remote_issue_data(
+                preview_url if progressive else url,
+                equipment_url=self._get_equipment_url(link_up, date_entry, shift_value),
+                stored_after=stored_after,
+            )
+        except CircuitOpenError as exc:
+            if exc.stale is None:
+                self._show_toast(
+                    title="Server Tidak Tersedia",
+                    message=str(exc),
+                    bootstyle="danger",
+                    duration=3000,
+                )
+                return
+            processed, stale_since = exc.stale, exc.stale_since
         except ControllerError as exc:
             self._show_toast(
                 title="Kesalahan",
@@ -314,9 +478,11 @@ class App(ttk.Window):
                 style="warning.TLabelframe",
             )
 
-        # Load target data
+        # Load target data; lookups are served from memory, so they skip the
+        # I/O queue and never wait behind exports.
         try:
-            target_series = load_target_shift(
+            target_series = await asyncio.to_thread(
+                load_target_shift,
                 self.sidebar.lu.get().strip("LU"),
                 self.sidebar.func_location.get(),
                 shift_number,
@@ -353,6 +519,20 @@ class App(ttk.Window):
             actual_data=actual_record,
         )
 
+        if stale_since is not None:
+            self._mark_stale(str(time_text), stale_since)
+            self._show_toast(
+                title="Data Lama",
+                message=(
+                    "Server SPA tidak merespons. Menampilkan data terakhir "
+                    f"dari {stale_since:%H:%M:%S}."
+                ),
+                bootstyle="warning",
+                duration=3000,
+            )
+            return
+
+        self.time_period.configure(bootstyle="default")
         self._show_toast(
             title="Berhasil",
             message="Issue table dan achievement table berhasil diperbarui.",
@@ -360,6 +540,53 @@ class App(ttk.Window):
             duration=3000,
         )
 
+        if progressive:
+            self._detail_task = asyncio.get_running_loop().create_task(
+                self._load_full_detail(url, stored_after)
+            )
+
+        # Warm the selections the user is most likely to open next.
+        self.controller.prefetch_neighbours(
+            link_up,
+            date_entry,
+            shift_value,
+            func_location,
+            link_ups=self.link_up_values,
+        )
+
+    def _cancel_detail_fetch(self) -> None:
+        if self._detail_task is not None and not self._detail_task.done():
+            self._detail_task.cancel()
+        self._detail_task = None
+
+    async def _load_full_detail(
+        self, url: str, stored_after: Optional[datetime]
+    ) -> None:
+        """Second phase of a progressive fetch: merge every stop reason."""
+
+        try:
+            processed = await self.controller.fetch_remote_issue_data(
+                url, stored_after=stored_after
+            )
+        except (ControllerError, httpx.HTTPError, ValueError):
+            self._show_toast(
+                title="Peringatan",
+                message="Detail lengkap gagal dimuat; hanya alasan teratas yang ditampilkan.",
+                bootstyle="warning",
+                duration=3000,
+            )
+            return
+        except Exception as exc:
+            self._show_toast(
+                title="Kesalahan",
+                message=str(exc),
+                bootstyle="danger",
+                duration=3000,
+            )
+            return
+
+        self._merge_issue_table(processed.get("stops_reason", pd.DataFrame()))
+
     @async_handler
     @with_button_state("btn_get_data")
     @with_progressbar
@@ -417,11 +644,269 @@ class App(ttk.Window):
             duration=3000,
         )
 
-    def _get_url(self, link_up, date_entry, shift, functional_location="PACK") -> str:
-        """Helper method to generate URLs based on environment."""
+    # ------------------------------------------------------------------
+    # Endpoint selection -----------------------------------------------
+    # ------------------------------------------------------------------
+    def _create_transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        transport = create_transport(self.data_config["DEFAULT"])
+        # Record/replay address cassettes by the canonical URL; never reroute.
+        if transport is None and self._endpoints is not None:
+            return EndpointRoutingTransport(self._endpoints)
+        return transport
+
+    def _start_endpoint_probe(self) -> None:
         if self.data_config.get("DEFAULT", "environment") == "production":
+            self._endpoint_probe_task = asyncio.get_running_loop().create_task(
+                self._probe_endpoints()
+            )
+
+    async def _probe_endpoints(self) -> None:
+        """Keep latency and health figures fresh for every configured host."""
+
+        interval = max(
+            5.0,
+            self.data_config.getfloat(
+                "DEFAULT", "endpoint_probe_interval", fallback=30
+            ),
+        )
+        transport = EndpointRoutingTransport(self._endpoints)
+        try:
+            while True:
+                await transport.probe()
+                await asyncio.sleep(interval)
+        finally:
+            await transport.aclose()
+
+    # ------------------------------------------------------------------
+    # Post-shift harvest -----------------------------------------------
+    # ------------------------------------------------------------------
+    def _start_harvester(self) -> None:
+        if self.data_config.get("DEFAULT", "environment") in ("production", "record"):
+            self._harvester.start()
+
+    async def _harvest_closed_shift(self, day: date, shift: str) -> None:
+        await self.controller.harvest_shift(
+            day,
+            shift,
+            self.link_up_values,
+            concurrency=self.data_config.getint(
+                "DEFAULT", "backfill_concurrency", fallback=4
+            ),
+        )
+
+    def _closed_shift_end(self, date_entry: str, shift: int) -> Optional[datetime]:
+        """End of the selected shift if it has already closed, else ``None``."""
+
+        try:
+            end = shift_end(
+                date.fromisoformat(date_entry), shift, self._shift_boundaries
+            )
+        except (ValueError, IndexError):
+            return None
+        return end if end <= datetime.now() else None
+
+    # ------------------------------------------------------------------
+    # Card compaction --------------------------------------------------
+    # ------------------------------------------------------------------
+    CARD_COMPACTION_DELAY_MS = 60_000
+    CARD_COMPACTION_INTERVAL_MS = 6 * 60 * 60 * 1000
+
+    def _compact_cards(self) -> None:
+        """Queue compaction when the I/O worker is idle, then reschedule."""
+
+        worker = get_io_worker()
+        if worker.pending:
+            # Card saves and exports go first; try again shortly.
+            self.after(self.CARD_COMPACTION_DELAY_MS, self._compact_cards)
+            return
+        future = worker.submit(self.controller.compact_cards, key=("compact-cards",))
+        # Best effort: a failed run leaves the rows in the database.
+        future.add_done_callback(lambda done: done.exception())
+        self.after(self.CARD_COMPACTION_INTERVAL_MS, self._compact_cards)
+
+    # ------------------------------------------------------------------
+    # Connection warm-up -----------------------------------------------
+    # ------------------------------------------------------------------
+    def _connection_root(self) -> str:
+        environment = self.data_config.get("DEFAULT", "environment")
+        if environment not in ("production", "record", "development"):
+            return ""
+        parts = urlsplit(self._get_url("", "", ""))
+        return f"{parts.scheme}://{parts.netloc}/" if parts.netloc else ""
+
+    def _start_connection_warmer(self) -> None:
+        root_url = self._connection_root()
+        if root_url:
+            self._warmer_task = asyncio.get_running_loop().create_task(
+                self._keep_connection_warm(root_url)
+            )
+
+    async def _keep_connection_warm(self, root_url: str) -> None:
+        """Authenticate a pooled connection now and again after idle expiry."""
+
+        while True:
+            if self.controller.connection_idle_expired():
+                await self.controller.warm_connection(root_url)
+            await asyncio.sleep(self._keepalive_expiry / 4)
+
+    # ------------------------------------------------------------------
+    # Auto refresh -----------------------------------------------------
+    # ------------------------------------------------------------------
+    AUTO_REFRESH_MAX_INTERVAL = 600.0
+    AUTO_REFRESH_SLOW_RATIO = 0.25
+
+    def toggle_auto_refresh(self) -> None:
+        """Start or stop polling the current URL from the sidebar toggle."""
+
+        if not self.sidebar.auto_refresh.get():
+            if self._auto_refresh_task and not self._auto_refresh_task.done():
+                self._auto_refresh_task.cancel()
+            self._auto_refresh_task = None
+            return
+
+        if self._auto_refresh_task and not self._auto_refresh_task.done():
+            return
+        self._auto_refresh_task = asyncio.get_running_loop().create_task(
+            self._auto_refresh_loop()
+        )
+
+    def _next_refresh_delay(
+        self, current: float, elapsed: float, *, failed: bool = False
+    ) -> float:
+        """Double the delay when the server is slow or failing, else reset it."""
+
+        base = self._auto_refresh_interval
+        if failed or elapsed > base * self.AUTO_REFRESH_SLOW_RATIO:
+            return min(max(current, base) * 2, self.AUTO_REFRESH_MAX_INTERVAL)
+        return base
+
+    async def _auto_refresh_loop(self) -> None:
+        delay = self._auto_refresh_interval
+        # A URL whose shift had ended when it was last polled; it cannot
+        # change any more, so it is not polled again.
+        finished: Optional[str] = None
+        while self.sidebar.auto_refresh.get() and self.winfo_exists():
+            await asyncio.sleep(delay)
+
+            url = self.controller.current_url
+            if not url or not self.sidebar.auto_refresh.get() or url == finished:
+                continue
+
+            closed_at = self.controller.result_closed_at(url)
+            polled_at = datetime.now()
+            started = time.monotonic()
+            try:
+                with background_priority():
+                    processed = await self.controller.poll_remote_issue_data(url)
+            except Exception:
+                delay = self._next_refresh_delay(delay, 0.0, failed=True)
+                continue
+            delay = self._next_refresh_delay(delay, time.monotonic() - started)
+            if closed_at is not None and polled_at >= closed_at:
+                finished = url
+
+            if processed is None:
+                continue
+
+            self._populate_issue_table(processed.get("stops_reason", pd.DataFrame()))
+            self.update_achievement_table(
+                show_message=False,
+                actual_data=self._extract_actual_record(
+                    processed.get("data_losses", pd.DataFrame())
+                ),
+            )
+
+    # ------------------------------------------------------------------
+    # History backfill -------------------------------------------------
+    # ------------------------------------------------------------------
+    def prompt_backfill(self) -> None:
+        """Ask how many days to backfill, ending at the selected date."""
+
+        days = Querybox.get_integer(
+            prompt="Jumlah hari yang akan diambil (berakhir di tanggal terpilih):",
+            title="Backfill Riwayat",
+            initialvalue=7,
+            minvalue=1,
+            maxvalue=90,
+            parent=self,
+        )
+        if not days:
+            return
+
+        try:
+            end_date = date.fromisoformat(self._get_selected_date())
+        except ValueError:
+            self._show_toast(
+                title="Kesalahan",
+                message="Format tanggal tidak valid.",
+                bootstyle="danger",
+                duration=3000,
+            )
+            return
+
+        self.backfill_history(end_date - timedelta(days=days - 1), end_date)
+
+    def _on_backfill_progress(self, done: int, total: int) -> None:
+        self.sidebar.btn_backfill.configure(text=f"Backfill {done}/{total}")
+
+    @async_handler
+    @with_button_state("btn_backfill")
+    @with_progressbar
+    async def backfill_history(self, start_date: date, end_date: date):
+        link_up = self.sidebar.lu.get().strip("LU")
+        func_location = self.sidebar.func_location.get()[:4]
+
+        try:
+            report = await self.controller.backfill_history(
+                link_up,
+                func_location,
+                start_date,
+                end_date,
+                concurrency=self.data_config.getint(
+                    "DEFAULT", "backfill_concurrency", fallback=4
+                ),
+                progress=self._on_backfill_progress,
+            )
+        finally:
+            self.sidebar.btn_backfill.configure(text="Backfill")
+
+        self._show_toast(
+            title="Backfill Selesai" if not report.failed else "Backfill Sebagian",
+            message=(
+                f"{report.fetched} diambil, {report.skipped} sudah tersimpan, "
+                f"{len(report.failed)} gagal dari {report.total} shift."
+            ),
+            bootstyle="success" if not report.failed else "warning",
+            duration=5000,
+        )
+
+    def _get_url(
+        self,
+        link_up,
+        date_entry,
+        shift,
+        functional_location="PACK",
+        date_max=None,
+        profile="full",
+    ) -> str:
+        """Helper method to generate URLs based on environment.
+
+        ``profile`` picks the loss-tree sections (see ``LOSS_TREE_PROFILES``);
+        each caller asks for what it shows.
+        """
+        # Record/replay environments use production URLs as cassette keys.
+        if self.data_config.get("DEFAULT", "environment") in (
+            "production",
+            "record",
+            "replay",
+        ):
             return get_url_period_loss_tree(
-                link_up, date_entry, shift, functional_location
+                link_up,
+                date_entry,
+                shift,
+                functional_location,
+                date_max,
+                profile=profile,
             )
 
         elif self.data_config.get("DEFAULT", "environment") == "development":
@@ -430,14 +915,27 @@ class App(ttk.Window):
             # return "http://127.0.0.1:5500/assets/no_pdt.html"
 
         else:
-            self._show_toast(
-                title="Kesalahan",
-                message=f"Environment {self.data_config.get('DEFAULT', 'environment')} tidak diketahui. Silakan periksa konfigurasi.",
-                bootstyle="danger",
-                duration=3000,
-            )
+            environment = self.data_config.get("DEFAULT", "environment")
+            if environment != self._warned_environment:
+                self._warned_environment = environment
+                self._show_toast(
+                    title="Kesalahan",
+                    message=f"Environment {environment} tidak diketahui. Silakan periksa konfigurasi.",
+                    bootstyle="danger",
+                    duration=3000,
+                )
             return ""
 
+    def _get_equipment_url(self, link_up, date_entry, shift) -> str:
+        """Equipment data URL, or an empty string outside production."""
+        if self.data_config.get("DEFAULT", "environment") in (
+            "production",
+            "record",
+            "replay",
+        ):
+            return get_url_period_equipment_data(link_up, date_entry, shift)
+        return ""
+
     def _show_toast(self, **kwargs):
         if not self.winfo_exists():
             return
@@ -466,9 +964,32 @@ class App(ttk.Window):
                 pass
         self._active_toasts.clear()
 
-    def _on_close(self):
+    CLOSE_TIMEOUT = 5.0
+
+    @async_handler
+    async def _on_close(self):
+        if self._closing:
+            return
+        self._closing = True
+        for task in (
+            self._auto_refresh_task,
+            self._warmer_task,
+            self._endpoint_probe_task,
+            self._detail_task,
+        ):
+            if task and not task.done():
+                task.cancel()
+        self._harvester.cancel()
         self._cleanup_toasts()
-        self.destroy()
+        # Destroying the window ends the async mainloop, so the pooled client
+        # and the circuit-breaker probe are shut down first.
+        self.withdraw()
+        try:
+            await asyncio.wait_for(self.controller.aclose(), self.CLOSE_TIMEOUT)
+        except Exception:
+            pass
+        finally:
+            self.destroy()
 
     def update_achievement_table(
         self,
@@ -649,18 +1170,31 @@ class App(ttk.Window):
             )
             return
 
-        url = self._get_url(
+        url_args = (
             self.sidebar.lu.get().strip("LU"),
             self._get_selected_date(),
             str(shift_number),
             self.sidebar.func_location.get()[:4],
         )
-
-        if not url:
+        full_url = self._get_url(*url_args)
+        if not full_url:
             return
+        # Only the line metrics are shown here: reuse a full page already on
+        # hand, otherwise ask for the smallest one.
+        stored_after = self._closed_shift_end(url_args[1], shift_number)
+        full_on_hand = self.controller.has_current_result(full_url)
+        full_on_hand = full_on_hand or self.controller.has_local_result(
+            full_url, stored_after=stored_after
+        )
+        url = (
+            full_url
+            if full_on_hand
+            else self._get_url(*url_args, profile="metrics-only")
+        )
 
         try:
-            target_series = load_target_shift(
+            target_series = await asyncio.to_thread(
+                load_target_shift,
                 self.sidebar.lu.get().strip("LU"),
                 self.sidebar.func_location.get(),
                 shift_number,
@@ -691,8 +1225,13 @@ class App(ttk.Window):
             return
 
         try:
+            # A metrics-only page must not become the result auto refresh
+            # polls and Save exports.
             processed = await self.controller.fetch_remote_issue_data(
-                url, use_cache=True
+                url,
+                use_cache=True,
+                stored_after=stored_after,
+                make_current=url == full_url,
             )
         except ControllerError as exc:
             self._show_toast(
@@ -743,21 +1282,42 @@ class App(ttk.Window):
         # Save username to CSV
         save_user(username)
 
+        file_path = None
         try:
-            file_path = self.controller.save_cards(
-                self.view.iter_card_data(), username, lu, tanggal, shift
+            # Read the cards from the widgets here; the write runs off the UI.
+            cards = list(self.view.iter_card_data())
+            result = await get_io_worker().run(
+                self.controller.save_cards, cards, username, lu, tanggal, shift
             )
+            file_path = getattr(result, "path", result)
+
+            if isinstance(result, CardUpsert):
+                if not result.changed:
+                    self._show_toast(
+                        title="Informasi",
+                        message="Tidak ada perubahan; card sudah tersimpan.",
+                        bootstyle="info",
+                        duration=3000,
+                    )
+                    return
+                # Only new and edited cards go to the Excel copy.
+                changed = set(result.changed)
+                cards = [card for card in cards if card.get("id", "") in changed]
 
             self._show_toast(
                 title="Berhasil",
-                message=f"Data card berhasil ditambahkan ke file:\n{file_path}",
+                message=f"Data card berhasil disimpan ke:\n{file_path}",
                 bootstyle="success",
                 duration=3000,
             )
+            if file_path and self.data_config.getboolean(
+                "DEFAULT", "export_excel", fallback=True
+            ):
+                self._export_cards_to_excel(cards, username, lu, tanggal, shift)
         except Exception as exc:
             self._show_toast(
                 title="Kesalahan",
-                message=f"Gagal menyimpan data card ke CSV.\n{exc}",
+                message=f"Gagal menyimpan data card.\n{exc}",
                 bootstyle="danger",
                 duration=3000,
             )
@@ -769,7 +1329,7 @@ class App(ttk.Window):
         if not file_path:
             self._show_toast(
                 title="Data Kosong",
-                message="Tidak ada data card yang dapat disimpan ke CSV.",
+                message="Tidak ada data card yang dapat disimpan.",
                 bootstyle="info",
                 duration=3000,
             )
@@ -778,6 +1338,21 @@ class App(ttk.Window):
             # )
             # return
 
+    @async_handler
+    async def _export_cards_to_excel(self, cards, username, lu, tanggal, shift):
+        try:
+            await get_io_worker().run(
+                self.controller.export_to_excel, cards, username, lu, tanggal, shift
+            )
+        except Exception as exc:
+            # The cards are already saved; only the Excel copy is missing.
+            self._show_toast(
+                title="Peringatan",
+                message=f"Gagal menulis ke Excel (file sedang dibuka?).\n{exc}",
+                bootstyle="warning",
+                duration=3000,
+            )
+
     def clear_data_cards(self):
         if not self.view.cards:
             messagebox.showinfo("Informasi", "Tidak ada card untuk dihapus.")
@@ -790,6 +1365,20 @@ class App(ttk.Window):
 
         self.view.clear_cards()
 
+    def show_history_window(self):
+        if self.history_window and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
+
+        # Both open the card store (CSV migration, index build) on first use;
+        # the window calls them off the Tk thread.
+        self.history_window = HistoryWindow(
+            self,
+            self.controller.query_cards,
+            count=self.controller.count_cards,
+            link_up_values=self.link_up_values,
+        )
+
     def show_target_editor(self):
         if self.target_editor and self.target_editor.winfo_exists():
             self.target_editor.destroy()
@@ -810,5 +1399,7 @@ class App(ttk.Window):
         func_location = self.sidebar.func_location.get()
         file_path = get_targets_file_path(lu_value.strip("LU"), func_location)
 
-        self.target_editor = TargetEditor(file_path)
+        self.target_editor = TargetEditor(
+            file_path, on_save=TARGET_CACHE.store, write_lock=TARGET_CACHE.file_lock
+        )
         self.target_editor.grab_set()
@@ -247,11 +247,9 @@ class DashboardView(ttk.Frame):
     def _on_user_entry(self, event) -> None:
         """Handle when user types and commits (Enter or loses focus)."""
         username = self.entry_user.get().strip()
-        if username:
-            save_user(username)
+        if username and save_user(username):
             # Refresh autocomplete values
-            current_users = load_users()
-            self.entry_user.configure(completevalues=current_users)
+            self.entry_user.configure(completevalues=load_users())
 
     # ------------------------------------------------------------------
     # Public helpers ---------------------------------------------------
@@ -4,6 +4,33 @@ FILENAME = "DB.xlsx"
 TARGET_FOLDER = "Target"
 MAIN_URL = "http://ots.app.pmi/db.aspx?"
 
+# Loss-tree sections requested per consumer. "stops" drops the long-stop
+# details and line failure analysis nobody parses; "metrics-only" also trims
+# the reason list to one row (kept so the table layout stays the same).
+LOSS_TREE_PROFILES = {
+    "full": {
+        "db_LongStopDetails": 3,
+        "db_ReasonCNT": 30,
+        "db_LineFailureAnalysis": "x",
+    },
+    "stops": {
+        "db_LongStopDetails": 0,
+        "db_ReasonCNT": 30,
+        "db_LineFailureAnalysis": "",
+    },
+    # First phase of a progressive fetch: top reasons only, details follow.
+    "preview": {
+        "db_LongStopDetails": 0,
+        "db_ReasonCNT": 10,
+        "db_LineFailureAnalysis": "",
+    },
+    "metrics-only": {
+        "db_LongStopDetails": 0,
+        "db_ReasonCNT": 1,
+        "db_LineFailureAnalysis": "",
+    },
+}
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36"
 }
@@ -1,8 +1,10 @@
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 
 from .helpers import get_script_folder
+from .user_registry import UserRegistry
 
 columns = ["Shift 1", "Shift 2", "Shift 3"]
 data = [
@@ -15,10 +17,15 @@ data = [
 ]
 
 
-def get_targets_file_path(lu, func_location: str = None):
-    script_folder = Path(get_script_folder())
-    target_folder = script_folder / "Target"
+def get_targets_folder() -> str:
+    """Get or create the folder holding the ``target_<func>_<lu>.csv`` files."""
+    target_folder = Path(get_script_folder()) / "Target"
     target_folder.mkdir(parents=True, exist_ok=True)
+    return str(target_folder)
+
+
+def get_targets_file_path(lu, func_location: str = None):
+    target_folder = Path(get_targets_folder())
 
     filename = target_folder / f"target_{func_location.lower()}_{lu}.csv"
     if not filename.exists():
@@ -58,6 +65,46 @@ def get_cards_file_path() -> str:
     return str(filename)
 
 
+def get_cards_db_path() -> str:
+    """Get the SQLite database holding saved issue cards."""
+    script_folder = Path(get_script_folder())
+    data_folder = script_folder / "data"
+    data_folder.mkdir(parents=True, exist_ok=True)
+    return str(data_folder / "issue_cards.db")
+
+
+def get_cards_partition_dir() -> str:
+    """Get or create the folder holding compacted monthly card partitions."""
+    script_folder = Path(get_script_folder())
+    partition_folder = script_folder / "data" / "cards"
+    partition_folder.mkdir(parents=True, exist_ok=True)
+    return str(partition_folder)
+
+
+def get_spa_cache_dir() -> str:
+    """Get or create the folder holding persisted SPA results."""
+    script_folder = Path(get_script_folder())
+    cache_folder = script_folder / "data" / "spa_cache"
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    return str(cache_folder)
+
+
+def get_archive_dir() -> str:
+    """Get or create the folder holding the Parquet result archive."""
+    script_folder = Path(get_script_folder())
+    archive_folder = script_folder / "data" / "archive"
+    archive_folder.mkdir(parents=True, exist_ok=True)
+    return str(archive_folder)
+
+
+def get_slow_request_log_path() -> str:
+    """Get the log file listing requests slower than the configured threshold."""
+    script_folder = Path(get_script_folder())
+    data_folder = script_folder / "data"
+    data_folder.mkdir(parents=True, exist_ok=True)
+    return str(data_folder / "slow_requests.log")
+
+
 def get_users_file_path() -> str:
     """Get or create the users CSV file path."""
     script_folder = Path(get_script_folder())
@@ -66,33 +113,27 @@ def get_users_file_path() -> str:
 
     filename = data_folder / "users.csv"
     if not filename.exists():
-        pd.DataFrame(columns=["username"]).to_csv(filename, index=False)
+        filename.write_text("username\n", encoding="utf-8")
 
     return str(filename)
 
 
+_user_registry: Optional[UserRegistry] = None
+
+
+def get_user_registry() -> UserRegistry:
+    """The process-wide registry of usernames stored in ``users.csv``."""
+    global _user_registry
+    if _user_registry is None:
+        _user_registry = UserRegistry(get_users_file_path())
+    return _user_registry
+
+
 def load_users() -> list[str]:
-    """Load unique usernames from the users CSV file."""
-    try:
-        df = pd.read_csv(get_users_file_path())
-        return sorted(df["username"].dropna().unique().tolist())
-    except Exception:
-        return []
-
-
-def save_user(username: str) -> None:
-    """Append a new username to the users CSV if it doesn't exist."""
-    if not username or not username.strip():
-        return
-
-    username = username.strip()
-    filepath = get_users_file_path()
-
-    try:
-        df = pd.read_csv(filepath)
-        if username not in df["username"].values:
-            new_row = pd.DataFrame([{"username": username}])
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(filepath, index=False)
-    except Exception:
-        pass
+    """Return the known usernames, sorted."""
+    return get_user_registry().names()
+
+
+def save_user(username: str) -> bool:
+    """Register a username; returns ``True`` when it was not known yet."""
+    return get_user_registry().add(username)
@@ -0,0 +1,275 @@
+"""Latency-aware routing of OTS requests across several equivalent hosts."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .constants import MAIN_URL
+from .governor import Priority, get_governor
+
+
+@dataclass
+class EndpointStats:
+    base_url: str
+    latency: Optional[float] = None
+    samples: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_since: Optional[float] = None
+    last_error: str = ""
+
+
+class EndpointPool:
+    """Track latency and errors per base URL and pick the fastest healthy one.
+
+    Latency is an exponentially weighted moving average (``alpha``) of the
+    time to response headers. ``failure_threshold`` consecutive failures mark
+    an endpoint unhealthy; it becomes eligible again after ``cooldown``
+    seconds or as soon as a probe succeeds. Endpoints without samples are
+    tried first so every host gets measured.
+    """
+
+    def __init__(
+        self,
+        base_urls: Iterable[str],
+        *,
+        alpha: float = 0.3,
+        failure_threshold: int = 2,
+        cooldown: float = 30.0,
+    ) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        for base_url in base_urls:
+            base_url = _origin(base_url)
+            if base_url and base_url not in self.endpoints:
+                self.endpoints[base_url] = EndpointStats(base_url)
+        if not self.endpoints:
+            raise ValueError("EndpointPool membutuhkan minimal satu URL")
+        self.alpha = alpha
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+
+    @classmethod
+    def from_config(cls, section) -> Optional["EndpointPool"]:
+        """Build a pool from the comma-separated ``url`` key in ``config.ini``.
+
+        Returns ``None`` when fewer than two usable hosts are configured, in
+        which case requests go straight to ``MAIN_URL``.
+        """
+
+        base_urls = [
+            value.strip()
+            for value in section.get("url", fallback="").split(",")
+            if urlsplit(value.strip()).netloc
+        ]
+        if len(base_urls) < 2:
+            return None
+        return cls(
+            base_urls,
+            failure_threshold=section.getint("endpoint_failures", fallback=2),
+            cooldown=section.getfloat("endpoint_cooldown", fallback=30.0),
+        )
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def is_healthy(self, base_url: str) -> bool:
+        stats = self.endpoints[base_url]
+        if stats.unhealthy_since is None:
+            return True
+        return time.monotonic() - stats.unhealthy_since >= self.cooldown
+
+    def ranked(self) -> list[str]:
+        """Endpoints ordered best first: healthy, then unmeasured, then fastest."""
+
+        def key(stats: EndpointStats) -> tuple[bool, bool, float]:
+            return (
+                not self.is_healthy(stats.base_url),
+                stats.latency is not None,
+                stats.latency or 0.0,
+            )
+
+        return [stats.base_url for stats in sorted(self.endpoints.values(), key=key)]
+
+    def best(self) -> str:
+        return self.ranked()[0]
+
+    def record_success(self, base_url: str, latency: float) -> None:
+        stats = self.endpoints[base_url]
+        stats.samples += 1
+        stats.consecutive_failures = 0
+        stats.unhealthy_since = None
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency += self.alpha * (latency - stats.latency)
+
+    def record_failure(self, base_url: str, error: str = "") -> None:
+        stats = self.endpoints[base_url]
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.last_error = error
+        if stats.consecutive_failures >= self.failure_threshold:
+            # Restart the cooldown so a still-broken host is not retried early.
+            stats.unhealthy_since = time.monotonic()
+
+    def snapshot(self) -> list[EndpointStats]:
+        return [EndpointStats(**vars(self.endpoints[url])) for url in self.ranked()]
+
+
+class EndpointRoutingTransport(httpx.AsyncBaseTransport):
+    """Send each request to the pool's best endpoint, failing over on errors.
+
+    Requests keep their canonical ``MAIN_URL`` address everywhere above the
+    transport (cache keys, logs, cassettes); only the scheme and host are
+    rewritten here. A transport error moves on to the next endpoint; a 5xx
+    response is counted against the endpoint and returned so the request
+    policy can retry, which then lands on a different host.
+    """
+
+    def __init__(
+        self, pool: EndpointPool, inner: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.pool = pool
+        self._inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        error: Optional[httpx.TransportError] = None
+        for base_url in self.pool.ranked():
+            if error is not None and not self.pool.is_healthy(base_url):
+                break
+            try:
+                return await self._send(request, base_url)
+            except httpx.TransportError as exc:
+                error = exc
+        assert error is not None
+        raise error
+
+    async def probe(self, path: str = "/") -> None:
+        """``HEAD`` every endpoint once to refresh its latency and health."""
+
+        async def probe_one(base_url: str) -> None:
+            request = httpx.Request("HEAD", base_url + path)
+            try:
+                async with get_governor().slot(Priority.BACKGROUND):
+                    response = await self._send(request, base_url)
+                await response.aclose()
+            except httpx.TransportError:
+                pass
+
+        await asyncio.gather(*(probe_one(url) for url in list(self.pool.endpoints)))
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    async def _send(self, request: httpx.Request, base_url: str) -> httpx.Response:
+        target = urlsplit(base_url)
+        headers = request.headers.copy()
+        headers["Host"] = target.netloc
+        routed = httpx.Request(
+            request.method,
+            request.url.copy_with(
+                scheme=target.scheme, netloc=target.netloc.encode("ascii")
+            ),
+            headers=headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+
+        started = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(routed)
+        except httpx.TransportError as exc:
+            self.pool.record_failure(base_url, type(exc).__name__)
+            raise
+        elapsed = time.perf_counter() - started
+
+        if response.status_code >= 500:
+            self.pool.record_failure(base_url, str(response.status_code))
+        else:
+            self.pool.record_success(base_url, elapsed)
+        return response
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return ""
+    return f"{parts.scheme or 'http'}://{parts.netloc}"
+
+
+def start_stand_in_server(
+    delay: float = 0.0, status: int = 200, body: bytes = b"OK"
+) -> ThreadingHTTPServer:
+    """Serve ``body`` on a random local port after ``delay`` seconds.
+
+    Stand-in for an OTS host when exercising endpoint selection offline;
+    call ``shutdown()`` on the returned server when done.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, with_body: bool) -> None:
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            self._reply(True)
+
+        def do_HEAD(self) -> None:
+            self._reply(False)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def main(delays: list[float]) -> None:
+    """Route requests across local stand-in servers with the given delays."""
+
+    servers = [start_stand_in_server(delay) for delay in delays]
+    pool = EndpointPool(f"http://127.0.0.1:{server.server_port}" for server in servers)
+    transport = EndpointRoutingTransport(pool)
+    try:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await transport.probe()
+            for _ in range(10):
+                await client.get(MAIN_URL + "table=ping")
+            fastest = servers[delays.index(min(delays))]
+            fastest.shutdown()
+            fastest.server_close()
+            for _ in range(5):
+                await client.get(MAIN_URL + "table=ping")
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    for stats in pool.snapshot():
+        latency = f"{stats.latency * 1000:7.1f} ms" if stats.latency else "      -   "
+        print(
+            f"{stats.base_url:28} {latency}  ok {stats.samples:3}  "
+            f"fail {stats.failures:3}  healthy {pool.is_healthy(stats.base_url)}"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover - manual check with stand-in hosts
+    asyncio.run(main([float(value) for value in sys.argv[1:]] or [0.2, 0.05, 0.1]))
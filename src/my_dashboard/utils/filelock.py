@@ -0,0 +1,43 @@
+"""Advisory whole-file locks for files shared between app instances."""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+if os.name == "nt":  # pragma: no cover - exercised on Windows workstations
+    import msvcrt
+
+    def _lock(handle: IO) -> None:
+        handle.seek(0)
+        # LK_LOCK retries for ~10 seconds before raising OSError.
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(handle: IO) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(handle: IO) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(handle: IO) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked(handle: IO) -> Iterator[IO]:
+    """Hold an exclusive lock on an open file for the duration of the block.
+
+    On Windows the lock covers the first byte, which every writer locks, so
+    it serialises writers the same way ``flock`` does elsewhere.
+    """
+
+    _lock(handle)
+    try:
+        yield handle
+    finally:
+        _unlock(handle)
@@ -0,0 +1,201 @@
+"""Process-wide rate limiter and concurrency governor for OTS requests."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import AsyncIterator, Iterator, Optional
+
+
+class Priority(IntEnum):
+    USER = 0
+    BACKGROUND = 10
+
+
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.USER
+)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Mark every request issued inside the block (and tasks it spawns) as background."""
+
+    token = request_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+@dataclass
+class GovernorMetrics:
+    queue_depth: int
+    in_flight: int
+    granted: int
+    mean_wait: float
+    p95_wait: float
+    max_wait: float
+
+
+class RequestGovernor:
+    """Token bucket plus in-flight cap, granting slots by priority then FIFO.
+
+    ``rate`` tokens per second are added up to ``burst``; each granted slot
+    consumes one token and counts against ``max_in_flight`` until released.
+    """
+
+    def __init__(
+        self, rate: float = 2.0, burst: int = 4, max_in_flight: int = 4
+    ) -> None:
+        self.configure(rate=rate, burst=burst, max_in_flight=max_in_flight)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._waits: deque[float] = deque(maxlen=500)
+        self._granted = 0
+
+    def configure(
+        self,
+        *,
+        rate: float | None = None,
+        burst: int | None = None,
+        max_in_flight: int | None = None,
+    ) -> None:
+        if rate is not None:
+            self.rate = max(0.01, rate)
+        if burst is not None:
+            self.burst = max(1, burst)
+        if max_in_flight is not None:
+            self.max_in_flight = max(1, max_in_flight)
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    @asynccontextmanager
+    async def slot(self, priority: Priority | None = None) -> AsyncIterator[float]:
+        """Wait for permission to send one request; yields the time waited."""
+
+        waited = await self.acquire(priority)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority | None = None) -> float:
+        if priority is None:
+            priority = request_priority.get()
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before cancellation: hand the slot back.
+                self.release()
+            raise
+
+        waited = time.monotonic() - started
+        self._waits.append(waited)
+        self._granted += 1
+        return waited
+
+    def release(self) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def metrics(self) -> GovernorMetrics:
+        waits = sorted(self._waits)
+        return GovernorMetrics(
+            queue_depth=sum(1 for *_, future in self._waiters if not future.done()),
+            in_flight=self._in_flight,
+            granted=self._granted,
+            mean_wait=sum(waits) / len(waits) if waits else 0.0,
+            p95_wait=waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            max_wait=waits[-1] if waits else 0.0,
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        self._refill()
+        while self._waiters and self._in_flight < self.max_in_flight:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < 1:
+                self._schedule_refill()
+                return
+            _, _, future = heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _schedule_refill(self) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            return
+        delay = (1 - self._tokens) / self.rate
+
+        def wake() -> None:
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, wake)
+
+
+_GOVERNOR = RequestGovernor()
+
+
+def get_governor() -> RequestGovernor:
+    """Return the governor shared by every outbound SPA request."""
+
+    return _GOVERNOR
+
+
+@contextmanager
+def governor_lifted() -> Iterator[RequestGovernor]:
+    """Remove the shared rate and concurrency limits inside the block.
+
+    For offline runs (cassette replay, tests) where throttling would only
+    distort the measurement; the previous limits are restored on exit.
+    """
+
+    saved = (_GOVERNOR.rate, _GOVERNOR.burst, _GOVERNOR.max_in_flight)
+    _GOVERNOR.configure(rate=1e9, burst=1_000_000, max_in_flight=1_000_000)
+    _GOVERNOR._tokens = float(_GOVERNOR.burst)
+    try:
+        yield _GOVERNOR
+    finally:
+        rate, burst, max_in_flight = saved
+        _GOVERNOR.configure(rate=rate, burst=burst, max_in_flight=max_in_flight)
+        _GOVERNOR._tokens = min(_GOVERNOR._tokens, float(_GOVERNOR.burst))
+
+
+def configure_governor(section) -> RequestGovernor:
+    """Apply ``config.ini`` limits (missing keys keep current values)."""
+
+    _GOVERNOR.configure(
+        rate=section.getfloat("rate_limit_rps", fallback=_GOVERNOR.rate),
+        burst=section.getint("rate_limit_burst", fallback=_GOVERNOR.burst),
+        max_in_flight=section.getint("max_in_flight", fallback=_GOVERNOR.max_in_flight),
+    )
+    return _GOVERNOR
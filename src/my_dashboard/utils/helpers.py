@@ -1,13 +1,14 @@
 import sys
 from configparser import ConfigParser
 from pathlib import Path
-from urllib.parse import urlencode
+from urllib.parse import parse_qs, urlencode, urlsplit
 
 import httpx
 import openpyxl
 from openpyxl import Workbook
 
-from .constants import HEADERS, MAIN_URL, NTLM_AUTH
+from .constants import HEADERS, LOSS_TREE_PROFILES, MAIN_URL, NTLM_AUTH
+from .governor import get_governor
 
 
 async def get_response(link: str) -> httpx.Response:
@@ -24,7 +25,8 @@ async def get_response(link: str) -> httpx.Response:
         http2=True,
         limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
     ) as client:
-        response = await client.get(link, headers=HEADERS, auth=NTLM_AUTH)
+        async with get_governor().slot():
+            response = await client.get(link, headers=HEADERS, auth=NTLM_AUTH)
         return response
 
 
@@ -53,9 +55,44 @@ def get_url_period_equipment_data(link_up: str, date: str, shift: str) -> str:
     return MAIN_URL + "&".join(f"{key}={value}" for key, value in params.items())
 
 
+def loss_tree_profile_of(url: str) -> str | None:
+    """Name of the profile whose parameters ``url`` carries, if any."""
+    params = parse_qs(urlsplit(url).query, keep_blank_values=True)
+    for name, overrides in LOSS_TREE_PROFILES.items():
+        if all(
+            params.get(key, [""])[0] == str(value) for key, value in overrides.items()
+        ):
+            return name
+    return None
+
+
 def get_url_period_loss_tree(
-    link_up: str, date: str, shift: str = "", functional_location: str = "PACK"
+    link_up: str,
+    date: str,
+    shift: str = "",
+    functional_location: str = "PACK",
+    date_max: str | None = None,
+    profile: str = "full",
 ) -> str:
+    """
+    Generate a URL for the SPA loss tree.
+
+    Args:
+        link_up (str): The line identifier.
+        date (str): The first date of the query.
+        shift (str): The shift, or an empty string for every shift.
+        functional_location (str): ``PACK`` or ``MAKE``.
+        date_max (str | None): The last date of a multi-day query
+            (defaults to ``date``).
+        profile (str): Key of ``LOSS_TREE_PROFILES`` selecting which
+            sections the page contains.
+
+    Returns:
+        str: The generated URL.
+    """
+    if profile not in LOSS_TREE_PROFILES:
+        raise ValueError(f"Profil loss tree tidak dikenal: {profile}")
+    sections = LOSS_TREE_PROFILES[profile]
     line_prefix = "PMID-SE-CP-L0" if link_up == "17" else "ID01-SE-CP-L0"
     params = {
         "table": "SPA_NormPeriodLossTree",
@@ -65,16 +102,16 @@ def get_url_period_loss_tree(
         "db_FunctionalLocation": f"{line_prefix}{link_up}-{functional_location}",
         "db_SegmentDateMin": date,
         "db_ShiftStart": shift,
-        "db_SegmentDateMax": date,
+        "db_SegmentDateMax": date_max or date,
         "db_ShiftEnd": shift,
         "db_Normalize": 0,
         "db_PeriodTime": 10080,
         "s_PeriodTime": "",
-        "db_LongStopDetails": 3,
-        "db_ReasonCNT": 30,
+        "db_LongStopDetails": sections["db_LongStopDetails"],
+        "db_ReasonCNT": sections["db_ReasonCNT"],
         "db_ReasonSort": "stop count",
         "db_Language": "OEM",
-        "db_LineFailureAnalysis": "x",
+        "db_LineFailureAnalysis": sections["db_LineFailureAnalysis"],
     }
 
     """http://ots.app.pmi/db.aspx?table=SPA_NormPeriodLossTree&act=query&submit1=Search&db_Line=ID01-SE-CP-L021&db_FunctionalLocation=ID01-SE-CP-L021-MAKE&db_SegmentDateMin=2025-11-08&db_ShiftStart=&db_SegmentDateMax=&db_ShiftEnd=&db_Normalize=0&db_PeriodTime=10080&s_PeriodTime=&db_LongStopDetails=3&db_ReasonCNT=30&db_ReasonSort=stop+count&db_Language=OEM&db_LineFailureAnalysis=x"""
@@ -170,13 +207,11 @@ def create_excel_file() -> None:
     sheets_list = ["Data", "Username", "Link", "DailyTarget"]
 
     if not file_path.exists():
-        wb = Workbook()
-        wb.active.title = "Data"
-        for sheet_name in sheets_list[1:]:
-            wb.create_sheet(title=sheet_name)
+        wb = Workbook(write_only=True)
+        sheets = {name: wb.create_sheet(title=name) for name in sheets_list}
 
         # Add default data to the "DailyTarget" sheet
-        ws = wb["DailyTarget"]
+        ws = sheets["DailyTarget"]
         ws.append(["", "TARGET"])
         for index in ["STOP", "MTBF", "PR", "NATR", "PDT", "UPDT"]:
             ws.append([index])
@@ -197,10 +232,17 @@ def get_excel_filename() -> str:
     return str(file_path)
 
 
+# (path, sheet index) -> (mtime_ns, size, first-column values)
+_excel_column_cache: dict[tuple[str, int], tuple[int, int, list]] = {}
+
+
 def get_data_from_excel(sheet_index: int):
     """
     Retrieve data from a specific sheet in the Excel file.
 
+    The sheet is streamed in read-only mode and the result is cached until
+    the file's modification time or size changes.
+
     Args:
         sheet_index (int): The index of the sheet to read.
 
@@ -208,12 +250,28 @@ def get_data_from_excel(sheet_index: int):
         list: A list of values from the first column of the sheet.
     """
     file_path = get_excel_filename()
-    wb = openpyxl.load_workbook(file_path)
-    sheet = wb.worksheets[sheet_index]
-
-    data = [row[0].value for row in sheet.iter_rows() if row[0].value]
-    wb.close()
-    return data
+    stat = Path(file_path).stat()
+    cached = _excel_column_cache.get((file_path, sheet_index))
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return list(cached[2])
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = wb.worksheets[sheet_index]
+        data = [
+            row[0]
+            for row in sheet.iter_rows(min_col=1, max_col=1, values_only=True)
+            if row and row[0]
+        ]
+    finally:
+        wb.close()
+
+    _excel_column_cache[(file_path, sheet_index)] = (
+        stat.st_mtime_ns,
+        stat.st_size,
+        data,
+    )
+    return list(data)
 
 
 def read_config():
@@ -245,6 +303,33 @@ def create_config():
         "link_up": ",".join(link_up),
         "url": "http://",
         "parameter": "db_SegmentDateMin=2023-10-01&db_ShiftStart=06:00&db_ShiftEnd=14:00",
+        "prefetch_budget": "3",
+        "auto_refresh_interval": "60",
+        "hedge_requests": "true",
+        "hedge_percentile": "0.95",
+        "max_retries": "2",
+        "breaker_failures": "3",
+        "breaker_reset": "30",
+        "backfill_concurrency": "4",
+        "rate_limit_rps": "2",
+        "rate_limit_burst": "4",
+        "max_in_flight": "4",
+        "cassette_dir": "cassettes",
+        "replay_latency_scale": "1.0",
+        "prewarm_connection": "true",
+        "keepalive_expiry": "60",
+        "endpoint_failures": "2",
+        "endpoint_cooldown": "30",
+        "endpoint_probe_interval": "30",
+        "slow_request_threshold": "5",
+        "measure_dns": "false",
+        "shift_boundaries": "06:00,14:00,22:00",
+        "harvest_enabled": "true",
+        "harvest_delay_minutes": "5",
+        "harvest_jitter_minutes": "2",
+        "archive_results": "true",
+        "export_excel": "true",
+        "compact_cards": "true",
     }
     config_path = Path(get_script_folder()) / "config.ini"
     with open(config_path, "w") as f:
@@ -0,0 +1,288 @@
+"""Tail-latency controls for SPA requests: hedging, retries and circuit breaking."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from .governor import get_governor
+
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+
+@dataclass
+class AttemptRecord:
+    url: str
+    attempt: int
+    latency: float
+    outcome: str
+    hedged: bool = False
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with percentile lookups."""
+
+    def __init__(self, window: int = 200, history: int = 500) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.attempts: deque[AttemptRecord] = deque(maxlen=history)
+
+    def record(self, record: AttemptRecord) -> None:
+        self.attempts.append(record)
+        if record.outcome == "ok":
+            self._samples.append(record.latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class RetryBudget:
+    """Token bucket limiting retries and hedges to a fraction of all requests.
+
+    Every first attempt deposits ``ratio`` tokens (capped at ``max_tokens``);
+    every retry or hedge withdraws one token and is refused once the bucket
+    is empty, so a struggling server is never hit by a retry storm.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+@dataclass
+class RequestPolicy:
+    """Hedging and retry settings applied to one logical request."""
+
+    hedge: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_initial_delay: float = 5.0
+    hedge_min_delay: float = 0.5
+    hedge_max_delay: float = 15.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_cap: float = 8.0
+
+    @classmethod
+    def from_config(cls, section) -> "RequestPolicy":
+        """Build a policy from a ``config.ini`` section (missing keys use defaults)."""
+
+        return cls(
+            hedge=section.getboolean("hedge_requests", fallback=cls.hedge),
+            hedge_percentile=section.getfloat(
+                "hedge_percentile", fallback=cls.hedge_percentile
+            ),
+            max_retries=section.getint("max_retries", fallback=cls.max_retries),
+        )
+
+
+DEFAULT_POLICY = RequestPolicy()
+DEFAULT_TRACKER = LatencyTracker()
+DEFAULT_BUDGET = RetryBudget()
+
+
+def _hedge_delay(policy: RequestPolicy, tracker: LatencyTracker) -> float:
+    if len(tracker) < policy.hedge_min_samples:
+        return policy.hedge_initial_delay
+    delay = tracker.percentile(policy.hedge_percentile) or policy.hedge_initial_delay
+    return min(policy.hedge_max_delay, max(policy.hedge_min_delay, delay))
+
+
+def _is_retryable(result: httpx.Response | BaseException) -> bool:
+    if isinstance(result, httpx.Response):
+        return result.status_code in RETRYABLE_STATUS
+    return isinstance(result, httpx.TransportError)
+
+
+async def _timed_get(
+    client: httpx.AsyncClient,
+    url: str,
+    attempt: int,
+    tracker: LatencyTracker,
+    *,
+    hedged: bool = False,
+    **kwargs,
+) -> httpx.Response:
+    async with get_governor().slot():
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, **kwargs)
+        except asyncio.CancelledError:
+            tracker.record(
+                AttemptRecord(
+                    url, attempt, time.perf_counter() - started, "cancelled", hedged
+                )
+            )
+            raise
+        except Exception as exc:
+            tracker.record(
+                AttemptRecord(
+                    url,
+                    attempt,
+                    time.perf_counter() - started,
+                    type(exc).__name__,
+                    hedged,
+                )
+            )
+            raise
+
+    outcome = "ok" if response.status_code < 500 else str(response.status_code)
+    tracker.record(
+        AttemptRecord(url, attempt, time.perf_counter() - started, outcome, hedged)
+    )
+    return response
+
+
+async def _hedged_get(
+    client: httpx.AsyncClient,
+    url: str,
+    attempt: int,
+    policy: RequestPolicy,
+    tracker: LatencyTracker,
+    budget: RetryBudget,
+    **kwargs,
+) -> httpx.Response:
+    primary = asyncio.ensure_future(_timed_get(client, url, attempt, tracker, **kwargs))
+    if not policy.hedge:
+        return await primary
+
+    attempts = [primary]
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=_hedge_delay(policy, tracker))
+        if done or not budget.withdraw():
+            return await primary
+
+        attempts.append(
+            asyncio.ensure_future(
+                _timed_get(client, url, attempt, tracker, hedged=True, **kwargs)
+            )
+        )
+        pending = set(attempts)
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                # Both attempts failed; report the last failure.
+                raise error
+    finally:
+        # Also runs when the caller is cancelled: no attempt may outlive it
+        # and keep its governor slot or connection.
+        outstanding = [task for task in attempts if not task.done()]
+        for task in outstanding:
+            task.cancel()
+        if outstanding:
+            await asyncio.gather(*outstanding, return_exceptions=True)
+
+
+async def send_with_policy(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    policy: RequestPolicy | None = None,
+    tracker: LatencyTracker | None = None,
+    budget: RetryBudget | None = None,
+    **kwargs,
+) -> httpx.Response:
+    """GET ``url`` with hedging and jittered, budget-limited retries.
+
+    A 5xx response that survives every retry is returned as-is so callers can
+    keep their own status handling; transport errors are re-raised.
+    """
+
+    policy = policy or DEFAULT_POLICY
+    tracker = tracker or DEFAULT_TRACKER
+    budget = budget or DEFAULT_BUDGET
+
+    budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            result: httpx.Response | BaseException = await _hedged_get(
+                client, url, attempt, policy, tracker, budget, **kwargs
+            )
+        except httpx.HTTPError as exc:
+            result = exc
+
+        if (
+            not _is_retryable(result)
+            or attempt >= policy.max_retries
+            or not budget.withdraw()
+        ):
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        # Full jitter keeps simultaneous clients from retrying in lockstep.
+        ceiling = min(policy.backoff_cap, policy.backoff_base * 2**attempt)
+        await asyncio.sleep(random.uniform(0, ceiling))
+        attempt += 1
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for a single upstream host.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    :meth:`allow` returns ``False`` until a success is recorded (typically by
+    a background probe running every ``reset_timeout`` seconds).
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def opened_at(self) -> Optional[float]:
+        return self._opened_at
+
+    def allow(self) -> bool:
+        return not self.is_open
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failure and return ``True`` if it opened the breaker."""
+
+        self._failures += 1
+        if self._opened_at is None and self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            return True
+        return False
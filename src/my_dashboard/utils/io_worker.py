@@ -0,0 +1,151 @@
+"""Single background thread for file I/O, so slow shares never stall Tk."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass
+class _Job:
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    key: Optional[Hashable] = None
+    futures: list[Future] = field(default_factory=list)
+
+
+class IOWorker:
+    """Run file operations one at a time, in the order they were submitted.
+
+    Every call returns a :class:`concurrent.futures.Future`; :meth:`run`
+    wraps it for ``await`` on the event loop. Jobs submitted with the same
+    ``key`` (typically the target path) coalesce while still queued: the
+    newest call replaces the queued one in its place, and every caller's
+    future gets the result of the write that actually ran. Only writes need
+    this ordering; reads run in their own threads and take the file's lock
+    (e.g. ``TargetCache.file_lock``) instead.
+    """
+
+    def __init__(self, name: str = "io-worker") -> None:
+        self._name = name
+        self._queue: deque[_Job] = deque()
+        self._queued: dict[Hashable, _Job] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        **kwargs: Any,
+    ) -> Future:
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Antrean I/O sudah ditutup")
+            job = self._queued.get(key) if key is not None else None
+            if job is not None:
+                job.func, job.args, job.kwargs = func, args, kwargs
+            else:
+                job = _Job(func, args, kwargs, key)
+                self._queue.append(job)
+                if key is not None:
+                    self._queued[key] = job
+            job.futures.append(future)
+            self._ensure_thread()
+            self._condition.notify()
+        return future
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Queue ``func`` and await its result without blocking the loop."""
+
+        return await asyncio.wrap_future(self.submit(func, *args, key=key, **kwargs))
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every job queued so far has run."""
+
+        with self._condition:
+            if self._thread is None:
+                return True
+        try:
+            self.submit(lambda: None).result(timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> None:
+        """Finish queued jobs (up to ``timeout``) and stop the thread."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                job = self._queue.popleft()
+                if job.key is not None:
+                    self._queued.pop(job.key, None)
+
+            try:
+                result = job.func(*job.args, **job.kwargs)
+            except BaseException as exc:
+                for future in job.futures:
+                    future.set_exception(exc)
+            else:
+                for future in job.futures:
+                    future.set_result(result)
+
+
+_io_worker: Optional[IOWorker] = None
+_io_worker_lock = threading.Lock()
+
+
+def get_io_worker() -> IOWorker:
+    """The process-wide worker; queued writes are finished at exit."""
+
+    global _io_worker
+    with _io_worker_lock:
+        if _io_worker is None:
+            _io_worker = IOWorker()
+            atexit.register(_io_worker.shutdown)
+        return _io_worker
@@ -9,6 +9,8 @@ from src.gui.toast import create_toast
 from src.utils.constants import HEADERS, NTLM_AUTH
 from src.utils.csvhandle import load_targets_df
 
+from .governor import get_governor
+
 
 def _extract_actual(data: spa_scraper_pyo3.SPALossTree) -> Tuple[Dict[str, Any], Any]:
     """Helper to extract actual values from spa_scraper_pyo3 result."""
@@ -24,7 +26,8 @@ def _extract_actual(data: spa_scraper_pyo3.SPALossTree) -> Tuple[Dict[str, Any],
 
 
 async def fetch_data(url: str, client: httpx.AsyncClient) -> Tuple[Dict[str, Any], Any]:
-    response = await client.get(url, headers=HEADERS, auth=NTLM_AUTH)
+    async with get_governor().slot():
+        response = await client.get(url, headers=HEADERS, auth=NTLM_AUTH)
     response.raise_for_status()
     data: spa_scraper_pyo3.SPALossTree = spa_scraper_pyo3.extract_loss_tree(
         response.text
@@ -36,7 +39,8 @@ async def post_data(
     url: str, client: httpx.AsyncClient, parameter: str
 ) -> Tuple[Dict[str, Any], Any]:
     full_url = f"{url}&{parameter}"
-    response = await client.post(full_url, headers=HEADERS, auth=NTLM_AUTH)
+    async with get_governor().slot():
+        response = await client.post(full_url, headers=HEADERS, auth=NTLM_AUTH)
     response.raise_for_status()
     data: spa_scraper_pyo3.SPALossTree = spa_scraper_pyo3.extract_loss_tree(
         response.text
@@ -0,0 +1,306 @@
+"""Per-request network timing breakdown collected through httpx hooks."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+import httpx
+
+# Key under which the current leg travels in ``request.extensions``; httpcore
+# ignores extensions it does not know.
+_LEG_KEY = "my_dashboard.timing_leg"
+
+
+@dataclass
+class LegTiming:
+    """One HTTP exchange; an NTLM handshake produces several legs.
+
+    ``dns``, ``connect`` and ``tls`` are only set when the leg opened a new
+    connection (and the transport reports httpcore trace events). ``ttfb``
+    runs from sending the request to receiving the response headers and
+    ``body`` from there to the last body chunk. All times are in seconds.
+    """
+
+    started: float
+    status: Optional[int] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    ttfb: Optional[float] = None
+    body: Optional[float] = None
+    size: int = 0
+    finished: Optional[float] = None
+
+    @property
+    def total(self) -> Optional[float]:
+        return None if self.finished is None else self.finished - self.started
+
+
+@dataclass
+class RequestTiming:
+    """Every leg of one logical request, from first send to final body byte."""
+
+    url: str
+    method: str
+    started_at: datetime
+    legs: list[LegTiming] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.legs) and self.legs[-1].finished is not None
+
+    @property
+    def status(self) -> Optional[int]:
+        return self.legs[-1].status if self.legs else None
+
+    @property
+    def total(self) -> Optional[float]:
+        if not self.complete:
+            return None
+        return self.legs[-1].finished - self.legs[0].started
+
+    @property
+    def dns(self) -> float:
+        return sum(leg.dns or 0.0 for leg in self.legs)
+
+    @property
+    def connect(self) -> float:
+        return sum((leg.connect or 0.0) + (leg.tls or 0.0) for leg in self.legs)
+
+    @property
+    def auth(self) -> float:
+        """Time spent on legs answered with ``401``/``407`` (NTLM negotiation)."""
+
+        return sum(leg.total or 0.0 for leg in self.legs if leg.status in (401, 407))
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        return self.legs[-1].ttfb if self.legs else None
+
+    @property
+    def body(self) -> Optional[float]:
+        return self.legs[-1].body if self.legs else None
+
+    @property
+    def size(self) -> int:
+        return self.legs[-1].size if self.legs else 0
+
+    def summary(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.0f}ms"
+
+        legs = " ".join(f"{leg.status}:{ms(leg.total)}" for leg in self.legs)
+        return (
+            f"total={ms(self.total)} dns={ms(self.dns)} connect={ms(self.connect)} "
+            f"auth={ms(self.auth)} ttfb={ms(self.ttfb)} body={ms(self.body)} "
+            f"size={self.size} legs=[{legs}]"
+        )
+
+
+class _TimedStream(httpx.AsyncByteStream):
+    """Wrap a response body to measure transfer time and wire size."""
+
+    def __init__(self, stream, leg: LegTiming, on_close) -> None:
+        self._stream = stream
+        self._leg = leg
+        self._on_close = on_close
+        self._headers_at = time.perf_counter()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._leg.size += len(chunk)
+            self._leg.body = time.perf_counter() - self._headers_at
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._leg.finished is None:
+                self._leg.finished = time.perf_counter()
+                if self._leg.body is None:
+                    self._leg.body = self._leg.finished - self._headers_at
+                self._on_close(self._leg)
+
+
+class RequestTimingRecorder:
+    """Collect :class:`RequestTiming` records through httpx event hooks.
+
+    Attach with :func:`attach_timing` (or pass :attr:`event_hooks` to a new
+    client). The last ``history`` requests are kept and can be queried by
+    URL; requests slower than ``slow_threshold`` seconds also land in
+    :attr:`slow_requests` and, when ``slow_log_path`` is set, are appended
+    to that file.
+
+    ``measure_dns`` (off by default) resolves the host once more right
+    before each new connection so DNS can be told apart from TCP connect.
+    That lookup runs inside the request being measured: the connection
+    waits for it, so its time is added to that request's total.
+    """
+
+    def __init__(
+        self,
+        *,
+        history: int = 500,
+        slow_threshold: float = 5.0,
+        slow_log_path: str | os.PathLike[str] | None = None,
+        measure_dns: bool = False,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self.measure_dns = measure_dns
+        self._history: deque[RequestTiming] = deque(maxlen=history)
+        self.slow_requests: deque[RequestTiming] = deque(maxlen=history)
+        # Logical requests still waiting for their next NTLM leg, by URL.
+        self._pending: dict[str, RequestTiming] = {}
+
+    @property
+    def event_hooks(self) -> dict[str, list]:
+        return {"request": [self._on_request], "response": [self._on_response]}
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def history(
+        self, url: str | None = None, *, limit: int | None = None
+    ) -> list[RequestTiming]:
+        """Completed timings, newest first, optionally only for ``url``."""
+
+        timings = [
+            timing
+            for timing in reversed(self._history)
+            if url is None or timing.url == url
+        ]
+        return timings[:limit] if limit is not None else timings
+
+    def latest(self, url: str) -> Optional[RequestTiming]:
+        timings = self.history(url, limit=1)
+        return timings[0] if timings else None
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    async def _on_request(self, request: httpx.Request) -> None:
+        url = str(request.url)
+        leg = LegTiming(started=time.perf_counter())
+
+        # Later NTLM legs carry an Authorization header; a plain request
+        # always starts a new logical request.
+        timing = (
+            self._pending.pop(url, None) if "authorization" in request.headers else None
+        )
+        if timing is None:
+            timing = RequestTiming(url, request.method, datetime.now())
+        timing.legs.append(leg)
+
+        request.extensions[_LEG_KEY] = (timing, leg)
+        request.extensions["trace"] = self._tracer(leg)
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        entry = response.request.extensions.get(_LEG_KEY)
+        if entry is None:
+            return
+        timing, leg = entry
+        leg.status = response.status_code
+        leg.ttfb = (
+            time.perf_counter()
+            - leg.started
+            - (leg.dns or 0.0)
+            - (leg.connect or 0.0)
+            - (leg.tls or 0.0)
+        )
+        if response.status_code in (401, 407):
+            self._pending[str(response.request.url)] = timing
+
+        if response.is_closed:
+            # In-memory transports (mock, replay) hand over a body already read.
+            leg.size = len(response.content)
+            leg.body = 0.0
+            leg.finished = time.perf_counter()
+            self._on_leg_closed(timing, leg)
+            return
+        response.stream = _TimedStream(
+            response.stream, leg, lambda leg: self._on_leg_closed(timing, leg)
+        )
+
+    def _on_leg_closed(self, timing: RequestTiming, leg: LegTiming) -> None:
+        if leg.status in (401, 407):
+            return
+
+        self._history.append(timing)
+        total = timing.total or 0.0
+        if total >= self.slow_threshold:
+            self.slow_requests.append(timing)
+            self._write_slow_log(timing)
+
+    def _write_slow_log(self, timing: RequestTiming) -> None:
+        if not self.slow_log_path:
+            return
+        line = (
+            f"{timing.started_at.isoformat(timespec='seconds')}\t"
+            f"{timing.status}\t{timing.summary()}\t{timing.url}\n"
+        )
+        try:
+            with open(self.slow_log_path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+        except OSError:
+            pass
+
+    def _tracer(self, leg: LegTiming):
+        started: dict[str, float] = {}
+
+        async def trace(event: str, info: dict) -> None:
+            # httpcore emits "<prefix>.<step>.started|complete|failed".
+            step, _, phase = event.rpartition(".")
+            now = time.perf_counter()
+            if phase == "started":
+                started[step] = now
+                if step == "connection.connect_tcp" and self.measure_dns:
+                    leg.dns = await _resolve(info.get("host"), info.get("port"))
+                    started[step] = time.perf_counter()
+                return
+            if phase != "complete" or step not in started:
+                return
+            if step == "connection.connect_tcp":
+                leg.connect = now - started[step]
+            elif step == "connection.start_tls":
+                leg.tls = now - started[step]
+
+        return trace
+
+
+async def _resolve(host, port) -> Optional[float]:
+    if not host:
+        return None
+    if isinstance(host, bytes):
+        host = host.decode("ascii")
+    started = time.perf_counter()
+    try:
+        await asyncio.get_running_loop().getaddrinfo(host, port)
+    except OSError:
+        return None
+    return time.perf_counter() - started
+
+
+DEFAULT_RECORDER = RequestTimingRecorder()
+
+
+def attach_timing(
+    client: httpx.AsyncClient, recorder: RequestTimingRecorder | None = None
+) -> httpx.AsyncClient:
+    """Add the recorder's hooks to ``client`` (once) and return the client."""
+
+    recorder = recorder or DEFAULT_RECORDER
+    hooks = client.event_hooks
+    for name, callbacks in recorder.event_hooks.items():
+        for callback in callbacks:
+            if callback not in hooks[name]:
+                hooks[name].append(callback)
+    client.event_hooks = hooks
+    return client
@@ -0,0 +1,197 @@
+"""Record/replay httpx transports for offline, reproducible SPA timing."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from .governor import governor_lifted
+from .helpers import get_script_folder
+from .http_policy import RequestPolicy
+
+# Headers describing the wire encoding no longer apply to the stored body.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _cassette_key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to ``inner`` and store each final response on disk.
+
+    Time spent on ``401`` authentication legs (NTLM negotiate/challenge) is
+    added to the recorded latency of the response that completes the flow.
+    """
+
+    def __init__(
+        self,
+        cassette_dir: str | os.PathLike[str],
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.cassette_dir = Path(cassette_dir)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        self._inner = inner or httpx.AsyncHTTPTransport()
+        self._auth_time: dict[str, float] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _cassette_key(request.method, str(request.url))
+        started = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        elapsed = time.perf_counter() - started
+
+        if response.status_code == 401:
+            self._auth_time[key] = self._auth_time.get(key, 0.0) + elapsed
+        else:
+            entry = {
+                "method": request.method,
+                "url": str(request.url),
+                "status_code": response.status_code,
+                "headers": [
+                    [name, value]
+                    for name, value in response.headers.multi_items()
+                    if name.lower() not in _DROPPED_HEADERS
+                ],
+                "body": base64.b64encode(body).decode("ascii"),
+                "elapsed": elapsed + self._auth_time.pop(key, 0.0),
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            tmp_path = self.cassette_dir / f"{key}.tmp"
+            tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp_path, self.cassette_dir / f"{key}.json")
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=[
+                (name, value)
+                for name, value in response.headers.multi_items()
+                if name.lower() not in _DROPPED_HEADERS
+            ],
+            content=body,
+            request=request,
+            extensions={"http_version": response.extensions.get("http_version", b"")},
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve responses from a cassette directory with recorded latency.
+
+    ``latency_scale`` multiplies every recorded latency (``0`` replays
+    instantly). Requests without a cassette entry fail with
+    :class:`httpx.ConnectError`, just like an unreachable host.
+    """
+
+    def __init__(
+        self, cassette_dir: str | os.PathLike[str], *, latency_scale: float = 1.0
+    ) -> None:
+        self.cassette_dir = Path(cassette_dir)
+        self.latency_scale = max(0.0, latency_scale)
+
+    def load_entry(self, method: str, url: str) -> Optional[dict]:
+        path = self.cassette_dir / f"{_cassette_key(method, url)}.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.load_entry(request.method, str(request.url))
+        if entry is None:
+            raise httpx.ConnectError(
+                f"Tidak ada rekaman untuk {request.url}", request=request
+            )
+
+        delay = float(entry.get("elapsed", 0.0)) * self.latency_scale
+        if delay:
+            await asyncio.sleep(delay)
+
+        return httpx.Response(
+            status_code=entry["status_code"],
+            headers=entry.get("headers", []),
+            content=base64.b64decode(entry.get("body", "")),
+            request=request,
+        )
+
+
+def create_transport(section) -> Optional[httpx.AsyncBaseTransport]:
+    """Return the transport selected by ``environment`` in ``config.ini``.
+
+    ``record`` and ``replay`` use ``cassette_dir`` (default ``cassettes``,
+    relative to the application folder) and ``replay_latency_scale``; every
+    other environment uses httpx's default transport and ``None`` is
+    returned. Clients close their transport, so call this once per client.
+    """
+
+    environment = section.get("environment", fallback="")
+    cassette_dir = Path(section.get("cassette_dir", fallback="cassettes"))
+    if not cassette_dir.is_absolute():
+        cassette_dir = Path(get_script_folder()) / cassette_dir
+    if environment == "record":
+        return RecordingTransport(cassette_dir)
+    if environment == "replay":
+        return ReplayTransport(
+            cassette_dir,
+            latency_scale=section.getfloat("replay_latency_scale", fallback=1.0),
+        )
+    return None
+
+
+async def main(cassette_dir: str, latency_scale: float = 1.0) -> None:
+    """Replay every recorded URL through the fetch and parse path and time it.
+
+    The shared governor's limits are lifted and requests are neither hedged
+    nor retried, so the timings are the recorded latency plus parsing and
+    not the app's rate limiting.
+    """
+
+    from ..services.spa_service import SPADataProcessor
+
+    policy = RequestPolicy(hedge=False, max_retries=0)
+    print(
+        "Governor tanpa batas, tanpa hedging/retry; "
+        f"latensi rekaman x{latency_scale:g}."
+    )
+    transport = ReplayTransport(cassette_dir, latency_scale=latency_scale)
+    with governor_lifted():
+        async with httpx.AsyncClient(transport=transport) as client:
+            for path in sorted(Path(cassette_dir).glob("*.json")):
+                url = json.loads(path.read_text(encoding="utf-8"))["url"]
+                processor = SPADataProcessor(
+                    url, auth=httpx.Auth(), client=client, policy=policy
+                )
+
+                started = time.perf_counter()
+                raw_html = await processor.fetcher.fetch()
+                fetched = time.perf_counter()
+                await processor.process()
+                parsed = time.perf_counter()
+
+                print(
+                    f"{len(raw_html) / 1024:8.1f} KB  "
+                    f"fetch {fetched - started:7.3f}s  "
+                    f"parse {parsed - fetched:7.3f}s  {url}"
+                )
+
+
+if __name__ == "__main__":  # pragma: no cover - benchmarking entry point
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 else "cassettes",
+            float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+        )
+    )
@@ -0,0 +1,129 @@
+"""Process-wide set of known usernames backed by ``users.csv``."""
+
+from __future__ import annotations
+
+import atexit
+import csv
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .filelock import locked
+from .io_worker import get_io_worker
+
+
+class UserRegistry:
+    """Known usernames, read from disk once and kept in memory.
+
+    Membership checks and :meth:`add` never touch the file. New names are
+    appended by a background timer ``flush_delay`` seconds after the last
+    addition, so a burst of focus changes costs a single small write; the
+    write itself runs on the shared I/O worker.
+    Pending names are also flushed when the interpreter exits.
+    """
+
+    def __init__(self, file_path: str | os.PathLike[str], *, flush_delay: float = 2.0):
+        self.file_path = Path(file_path)
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._names: Optional[set[str]] = None
+        self._sorted: Optional[list[str]] = None
+        self._pending: list[str] = []
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Public API -------------------------------------------------------
+    # ------------------------------------------------------------------
+    def __contains__(self, username: object) -> bool:
+        with self._lock:
+            return username in self._loaded()
+
+    def names(self) -> list[str]:
+        """All usernames, sorted."""
+
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._loaded())
+            return list(self._sorted)
+
+    def add(self, username: str) -> bool:
+        """Register ``username``; returns ``True`` when it was new."""
+
+        username = (username or "").strip()
+        if not username:
+            return False
+        with self._lock:
+            names = self._loaded()
+            if username in names:
+                return False
+            names.add(username)
+            self._sorted = None
+            self._pending.append(username)
+            self._schedule_flush()
+        return True
+
+    def flush(self) -> None:
+        """Append pending names to the file now."""
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            self._append(pending)
+        except OSError:
+            # Keep them for the next attempt instead of losing them.
+            with self._lock:
+                self._pending[:0] = pending
+
+    # ------------------------------------------------------------------
+    # Internal helpers -------------------------------------------------
+    # ------------------------------------------------------------------
+    def _loaded(self) -> set[str]:
+        if self._names is None:
+            self._names = set()
+            try:
+                with open(self.file_path, newline="", encoding="utf-8-sig") as handle:
+                    for row in csv.DictReader(handle):
+                        name = (row.get("username") or "").strip()
+                        if name:
+                            self._names.add(name)
+            except OSError:
+                pass
+        return self._names
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self._queue_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _queue_flush(self) -> None:
+        try:
+            get_io_worker().submit(self.flush, key=("users", str(self.file_path)))
+        except RuntimeError:
+            # The worker is shutting down; write from this thread instead.
+            self.flush()
+
+    def _append(self, names: list[str]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([name] for name in names)
+
+        with open(self.file_path, "a+b") as handle, locked(handle):
+            size = handle.seek(0, os.SEEK_END)
+            if size == 0:
+                handle.write(b"username\n")
+            else:
+                handle.seek(size - 1)
+                if handle.read(1) != b"\n":
+                    handle.write(b"\n")
+            handle.write(buffer.getvalue().encode("utf-8"))
+            handle.flush()
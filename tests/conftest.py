@@ -0,0 +1,153 @@
+"""Shared fixtures: a fake SPA server and controllers wired to it."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Callable, Optional
+
+import httpx
+import pandas as pd
+import pytest
+
+from my_dashboard.controllers import DashboardController
+from my_dashboard.services.result_store import SPAResultStore
+from my_dashboard.utils.governor import governor_lifted
+from my_dashboard.utils.helpers import get_url_period_loss_tree
+from my_dashboard.utils.http_policy import RequestPolicy
+
+# No hedging or retries: one logical request is one request on the wire.
+TEST_POLICY = RequestPolicy(hedge=False, max_retries=0)
+
+
+def spa_body(pr: float = 60.0, stops=(("Jam", 1, 5.0),), line: str = "LU18") -> str:
+    """A page the :class:`FakeSPAProcessor` understands."""
+
+    return json.dumps({"pr": pr, "line": line, "stops": [list(s) for s in stops]})
+
+
+def processed(pr: float = 60.0, stops=(("Jam", 1, 5.0),), line: str = "LU18"):
+    """The processed result :class:`FakeSPAProcessor` makes of ``spa_body``."""
+
+    return {
+        "data_losses": pd.DataFrame(
+            [{"PR": f"{pr}%", "STOP": sum(count for _, count, _ in stops)}]
+        ),
+        "stops_reason": pd.DataFrame(
+            [
+                {"Line": line, "Reason": reason, "Stops": count, "Downtime": down}
+                for reason, count, down in stops
+            ],
+            columns=["Line", "Reason", "Stops", "Downtime"],
+        ),
+    }
+
+
+class FakeSPAProcessor:
+    """Stands in for ``SPADataProcessor``: the page body is JSON."""
+
+    def __init__(self, source: str, *, is_html: bool = False, **_) -> None:
+        self._source = source if is_html else None
+        self.processed_data: dict[str, pd.DataFrame] = {}
+
+    async def process(self, **_) -> dict[str, pd.DataFrame]:
+        if self._source is None:
+            return self.processed_data
+        page = json.loads(self._source)
+        self.processed_data = processed(
+            page["pr"], [tuple(s) for s in page["stops"]], page["line"]
+        )
+        return self.processed_data
+
+
+class FakeSPAServer:
+    """Answers every URL with ``spa_body()`` unless told otherwise.
+
+    ``pages`` overrides the body per URL, URLs in ``down`` fail to connect
+    and every request URL is recorded in ``requests``.
+    """
+
+    def __init__(self) -> None:
+        self.pages: dict[str, str] = {}
+        self.down: set[str] = set()
+        self.requests: list[str] = []
+        self.transport = httpx.MockTransport(self._handle)
+
+    def set_page(self, url: str, body: str) -> None:
+        self.pages[str(httpx.URL(url))] = body
+
+    def fail(self, url: str) -> None:
+        self.down.add(str(httpx.URL(url)))
+
+    def requested(self, url: str) -> int:
+        return self.requests.count(str(httpx.URL(url)))
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.requests.append(url)
+        if url in self.down:
+            raise httpx.ConnectError("SPA mati", request=request)
+        return httpx.Response(200, text=self.pages.get(url, spa_body()))
+
+
+def loss_tree_url(line: str, day, shift, func_location: str = "PACK", **kwargs) -> str:
+    return get_url_period_loss_tree(
+        str(line), str(day), str(shift), func_location, **kwargs
+    )
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_governor():
+    """Lift the shared rate limit so tests measure behaviour, not throttling."""
+
+    with governor_lifted() as governor:
+        yield governor
+
+
+@pytest.fixture
+def spa_server() -> FakeSPAServer:
+    return FakeSPAServer()
+
+
+@pytest.fixture
+def result_store(tmp_path) -> SPAResultStore:
+    return SPAResultStore(tmp_path / "results")
+
+
+@pytest.fixture
+def make_controller(spa_server, result_store) -> Callable[..., DashboardController]:
+    """Build a controller talking to ``spa_server``, storing in ``result_store``."""
+
+    def build(**overrides) -> DashboardController:
+        options: dict[str, object] = dict(
+            http_client_factory=lambda: httpx.AsyncClient(
+                transport=spa_server.transport
+            ),
+            spa_scraper_cls=FakeSPAProcessor,
+            result_store=result_store,
+            archive_results=False,
+            request_policy=TEST_POLICY,
+        )
+        options.update(overrides)
+        return DashboardController(**options)
+
+    return build
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Poll ``condition`` until it holds; fail the test after ``timeout``."""
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "kondisi tidak terpenuhi"
+        await asyncio.sleep(0.01)
+
+
+def store_at(store: SPAResultStore, url: str, moment, result: Optional[dict] = None):
+    """Save ``result`` for ``url`` and date the entry ``moment``."""
+
+    path = store.save(url, result if result is not None else processed())
+    os.utime(path, (moment.timestamp(), moment.timestamp()))
+    return path
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import date, timedelta
+
+from conftest import loss_tree_url, spa_body
+
+
+def test_poll_skips_unchanged_body_and_parses_a_changed_one(
+    make_controller, spa_server
+):
+    url = loss_tree_url("18", date.today() - timedelta(days=2), "1")
+
+    async def scenario():
+        controller = make_controller()
+        await controller.fetch_remote_issue_data(url)
+        assert await controller.poll_remote_issue_data(url) is None
+
+        spa_server.set_page(url, spa_body(75))
+        polled = await controller.poll_remote_issue_data(url)
+        assert polled["data_losses"].iloc[0]["PR"] == "75%"
+        await controller.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_body_hashes_stay_bounded_over_a_long_session(make_controller):
+    day = date.today() - timedelta(days=30)
+    current = loss_tree_url("18", day, "1")
+
+    async def scenario():
+        controller = make_controller(warm_cache_size=2, last_known_size=3)
+        await controller.fetch_remote_issue_data(current)
+        for offset in range(1, 20):
+            other = loss_tree_url("18", day + timedelta(days=offset), "2")
+            await controller.fetch_remote_issue_data(other, make_current=False)
+        assert len(controller._content_hashes) <= 5
+        await controller.aclose()
+
+    asyncio.run(scenario())
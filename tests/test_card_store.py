@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from my_dashboard.services.card_service import CARD_COLUMNS, CardStore
+
+pytest.importorskip("pyarrow")
+
+
+def _row(card_id: str, tanggal: str) -> dict[str, str]:
+    return {
+        "card_id": card_id,
+        "issue": f"issue {card_id}",
+        "detail": "",
+        "action": "",
+        "saved_at": "2026-10-02T08:00:00",
+        "user": "tester",
+        "lu": "LU18",
+        "tanggal": tanggal,
+        "shift": "Shift 1",
+    }
+
+
+def _card_ids(store: CardStore) -> list[str]:
+    return [record.card_id for record in store.query(limit=50).records]
+
+
+def test_compaction_does_not_free_ids_for_reuse(tmp_path):
+    store = CardStore(tmp_path / "cards.db")
+    store.save([_row("c1", "2026-10-01")])
+    # Back-dated into a closed month while holding the highest id.
+    store.save([_row("c2", "2026-09-30")])
+    assert store.compact(before="2026-10") == ["2026-09"]
+
+    store.save([_row("c3", "2026-10-02")])
+
+    assert store.count() == 3
+    assert _card_ids(store) == ["c3", "c2", "c1"]
+    store.close()
+
+
+def test_legacy_database_is_upgraded_above_compacted_ids(tmp_path):
+    path = tmp_path / "cards.db"
+    store = CardStore(path)
+    store.save([_row("c1", "2026-10-01")])
+    store.save([_row("c2", "2026-09-30")])
+    store.compact(before="2026-10")
+    store.close()
+
+    # Rebuild the table the way databases were created before the fix.
+    columns = ", ".join(CARD_COLUMNS)
+    conn = sqlite3.connect(path)
+    conn.executescript(f"""
+        ALTER TABLE cards RENAME TO cards_new;
+        CREATE TABLE cards (
+            id INTEGER PRIMARY KEY,
+            {", ".join(f"{column} TEXT NOT NULL DEFAULT ''" for column in CARD_COLUMNS)}
+        );
+        INSERT INTO cards (id, {columns}) SELECT id, {columns} FROM cards_new;
+        DROP TABLE cards_new;
+        DELETE FROM sqlite_sequence;
+        """)
+    conn.close()
+
+    store = CardStore(path)
+    store.save([_row("c3", "2026-10-02")])
+
+    assert _card_ids(store) == ["c3", "c2", "c1"]
+    assert store.query(card_id="c1").records
+    store.close()
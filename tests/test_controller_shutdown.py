@@ -0,0 +1,67 @@
+import asyncio
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from conftest import loss_tree_url
+
+from my_dashboard.utils.http_policy import CircuitBreaker
+
+
+def test_aclose_stops_the_health_probe(make_controller, spa_server):
+    url = loss_tree_url("18", date.today() - timedelta(days=2), "1")
+    spa_server.fail(url)
+
+    async def scenario():
+        controller = make_controller(
+            circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        )
+        with pytest.raises(httpx.ConnectError):
+            await controller.fetch_remote_issue_data(url)
+        assert controller.circuit_open
+        # Let the probe retry at least once.
+        await asyncio.sleep(0.12)
+        await controller.aclose()
+        probes = len(spa_server.requests)
+        assert probes >= 2
+
+        await asyncio.sleep(0.2)
+        return probes
+
+    probes = asyncio.run(scenario())
+    assert len(spa_server.requests) == probes
+
+
+def test_closing_the_window_waits_for_the_controller(make_controller, spa_server):
+    from my_dashboard.ui.app_window import App
+
+    url = loss_tree_url("18", date.today() - timedelta(days=2), "1")
+    spa_server.fail(url)
+    events = []
+
+    async def scenario():
+        controller = make_controller(
+            circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        )
+        with pytest.raises(httpx.ConnectError):
+            await controller.fetch_remote_issue_data(url)
+
+        app = App.__new__(App)
+        app.controller = controller
+        app._closing = False
+        app._auto_refresh_task = app._warmer_task = None
+        app._endpoint_probe_task = app._detail_task = None
+        app._harvester = SimpleNamespace(cancel=lambda: events.append("harvester"))
+        app._cleanup_toasts = lambda: None
+        app.withdraw = lambda: events.append("withdraw")
+        app.destroy = lambda: events.append("destroy")
+
+        await App._on_close.__wrapped__(app)
+        probes = len(spa_server.requests)
+        await asyncio.sleep(0.2)
+        return probes
+
+    probes = asyncio.run(scenario())
+    assert events == ["harvester", "withdraw", "destroy"]
+    assert len(spa_server.requests) == probes
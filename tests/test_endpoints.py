@@ -0,0 +1,99 @@
+import asyncio
+from configparser import ConfigParser
+
+import httpx
+import pytest
+
+from my_dashboard.utils.endpoints import EndpointPool, EndpointRoutingTransport
+
+FAST, SLOW = "http://ots-a.local", "http://ots-b.local"
+
+
+def test_unmeasured_hosts_come_first_then_the_fastest():
+    pool = EndpointPool([SLOW + "/db.aspx", FAST, FAST + "/"])
+    assert list(pool.endpoints) == [SLOW, FAST]
+
+    pool.record_success(SLOW, 0.5)
+    assert pool.ranked() == [FAST, SLOW]
+    pool.record_success(FAST, 0.1)
+    assert pool.best() == FAST
+
+    # The moving average lets one slow answer move a host only part way.
+    pool.record_success(FAST, 1.1)
+    assert pool.endpoints[FAST].latency == pytest.approx(0.4)
+    assert pool.best() == FAST
+
+
+def test_repeated_failures_sideline_a_host_until_the_cooldown():
+    pool = EndpointPool([FAST, SLOW], failure_threshold=2, cooldown=60)
+    pool.record_success(FAST, 0.1)
+    pool.record_success(SLOW, 0.5)
+
+    pool.record_failure(FAST, "ConnectError")
+    assert pool.best() == FAST
+    pool.record_failure(FAST, "ConnectError")
+    assert not pool.is_healthy(FAST)
+    assert pool.ranked() == [SLOW, FAST]
+
+    pool.cooldown = 0
+    assert pool.is_healthy(FAST)
+    pool.record_success(FAST, 0.1)
+    assert pool.endpoints[FAST].unhealthy_since is None
+
+
+def test_requests_fail_over_and_keep_the_canonical_address():
+    seen = []
+
+    def handle(request):
+        seen.append((request.url.host, request.headers["Host"]))
+        if request.url.host == "ots-a.local":
+            raise httpx.ConnectError("host mati", request=request)
+        return httpx.Response(200, text="OK")
+
+    async def scenario():
+        pool = EndpointPool([FAST, SLOW], failure_threshold=1)
+        transport = EndpointRoutingTransport(pool, httpx.MockTransport(handle))
+        async with httpx.AsyncClient(transport=transport) as client:
+            first = await client.get("http://ots.app.pmi/db.aspx?table=ping")
+            second = await client.get("http://ots.app.pmi/db.aspx?table=ping")
+        return pool, first, second
+
+    pool, first, second = asyncio.run(scenario())
+    assert first.text == second.text == "OK"
+    assert str(first.request.url) == "http://ots.app.pmi/db.aspx?table=ping"
+    # The broken host is tried once, then skipped.
+    assert seen == [
+        ("ots-a.local", "ots-a.local"),
+        ("ots-b.local", "ots-b.local"),
+        ("ots-b.local", "ots-b.local"),
+    ]
+    assert pool.endpoints[FAST].last_error == "ConnectError"
+
+
+def test_server_errors_count_against_the_host_and_are_returned():
+    async def scenario():
+        pool = EndpointPool([FAST, SLOW])
+        transport = EndpointRoutingTransport(
+            pool, httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("http://ots.app.pmi/db.aspx")
+        return pool, response
+
+    pool, response = asyncio.run(scenario())
+    assert response.status_code == 503
+    (stats,) = [stats for stats in pool.snapshot() if stats.failures]
+    assert stats.last_error == "503"
+
+
+def test_from_config_needs_two_hosts():
+    config = ConfigParser()
+    config.read_string(
+        "[DEFAULT]\nurl = http://ots-a.local, not-a-url\nendpoint_cooldown = 5\n"
+    )
+    assert EndpointPool.from_config(config["DEFAULT"]) is None
+
+    config["DEFAULT"]["url"] = f"{FAST}, {SLOW}"
+    pool = EndpointPool.from_config(config["DEFAULT"])
+    assert list(pool.endpoints) == [FAST, SLOW]
+    assert pool.cooldown == 5.0
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import openpyxl
+import pandas as pd
+
+from my_dashboard.services.excel_export import (
+    DATA_SHEET,
+    append_to_data_sheet,
+    card_data_rows,
+    stop_reason_data_rows,
+    stop_rows_key,
+)
+
+
+def _workbook(path):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = DATA_SHEET
+    workbook.create_sheet("Target")
+    workbook.save(path)
+    return path
+
+
+def _data_rows(path):
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return [list(row) for row in workbook[DATA_SHEET].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def _stops(downtime=12.5):
+    table = pd.DataFrame(
+        {"Reason": ["Jam", "Changeover"], "Stops": [3, 1], "Downtime": [downtime, 30]}
+    )
+    return stop_reason_data_rows(
+        table, lu="LU18", tanggal="2026-10-19", shift="Shift 1", user="budi"
+    )
+
+
+def _card(action):
+    return card_data_rows(
+        [
+            {
+                "tanggal": "2026-10-19",
+                "shift": "Shift 1",
+                "lu": "LU18",
+                "card_id": "c1",
+                "issue": "Jam",
+                "action": action,
+                "saved_at": "2026-10-19T08:00:00",
+            }
+        ]
+    )
+
+
+def test_stop_rows_are_written_once(tmp_path):
+    path = _workbook(tmp_path / "DB.xlsx")
+    stops = _stops()
+
+    append_to_data_sheet(_card("cek"), path, once={stop_rows_key(stops): stops})
+    # Saved again (an edited card): the same stop table must not come back.
+    append_to_data_sheet(_card("ganti"), path, once={stop_rows_key(_stops()): _stops()})
+
+    rows = _data_rows(path)
+    assert [row[0] for row in rows] == ["jenis", "card", "stop", "stop", "card"]
+    # The sheet is an append log: both versions of the card are kept.
+    assert [row[8] for row in rows if row[0] == "card"] == ["cek", "ganti"]
+
+
+def test_changed_stop_table_is_written(tmp_path):
+    path = _workbook(tmp_path / "DB.xlsx")
+    for stops in (_stops(12.5), _stops(40.0)):
+        append_to_data_sheet([], path, once={stop_rows_key(stops): stops})
+
+    assert [row[11] for row in _data_rows(path) if row[0] == "stop"] == [
+        12.5,
+        30,
+        40.0,
+        30,
+    ]
+
+
+def test_new_workbook_forgets_written_keys(tmp_path):
+    path = _workbook(tmp_path / "DB.xlsx")
+    stops = _stops()
+    append_to_data_sheet([], path, once={stop_rows_key(stops): stops})
+
+    _workbook(path)
+    append_to_data_sheet([], path, once={stop_rows_key(stops): stops})
+
+    assert [row[0] for row in _data_rows(path)] == ["jenis", "stop", "stop"]
+
+
+def test_control_characters_do_not_break_the_workbook(tmp_path):
+    path = _workbook(tmp_path / "DB.xlsx")
+
+    append_to_data_sheet(_card("ganti\x0bsensor\x00 \x1b[0m"), path)
+
+    (card,) = [row for row in _data_rows(path) if row[0] == "card"]
+    assert card[8] == "gantisensor [0m"
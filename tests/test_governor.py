@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from my_dashboard.utils.governor import (
+    Priority,
+    RequestGovernor,
+    background_priority,
+    request_priority,
+)
+
+
+def test_user_requests_overtake_queued_background_ones():
+    async def scenario():
+        governor = RequestGovernor(rate=1000, burst=10, max_in_flight=1)
+        granted = []
+
+        async def request(name, priority):
+            async with governor.slot(priority):
+                granted.append(name)
+
+        await governor.acquire()
+        waiting = [
+            asyncio.create_task(request("prefetch", Priority.BACKGROUND)),
+            asyncio.create_task(request("backfill", Priority.BACKGROUND)),
+        ]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(request("get-data", Priority.USER)))
+        await asyncio.sleep(0)
+        assert governor.metrics().queue_depth == 3
+
+        governor.release()
+        await asyncio.gather(*waiting)
+        return granted
+
+    assert asyncio.run(scenario()) == ["get-data", "prefetch", "backfill"]
+
+
+def test_burst_is_spent_then_requests_follow_the_rate():
+    async def scenario():
+        governor = RequestGovernor(rate=20, burst=2, max_in_flight=10)
+        started = time.monotonic()
+        for _ in range(2):
+            async with governor.slot():
+                pass
+        burst_done = time.monotonic() - started
+        for _ in range(2):
+            async with governor.slot():
+                pass
+        return burst_done, time.monotonic() - started, governor.metrics()
+
+    burst_done, total, metrics = asyncio.run(scenario())
+    assert burst_done < 0.05
+    # Two more tokens at 20/s take about 0.1 s.
+    assert total >= 0.08
+    assert metrics.granted == 4
+    assert metrics.in_flight == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        governor = RequestGovernor(rate=1000, burst=10, max_in_flight=1)
+        await governor.acquire()
+        waiter = asyncio.create_task(governor.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        governor.release()
+
+        await asyncio.wait_for(governor.acquire(), 0.5)
+        return governor.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics.in_flight == 1
+    assert metrics.queue_depth == 0
+
+
+def test_background_priority_marks_requests_inside_the_block():
+    assert request_priority.get() is Priority.USER
+    with background_priority():
+        assert request_priority.get() is Priority.BACKGROUND
+    assert request_priority.get() is Priority.USER
@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+
+from my_dashboard.utils.governor import get_governor
+from my_dashboard.utils.http_policy import (
+    LatencyTracker,
+    RequestPolicy,
+    RetryBudget,
+    send_with_policy,
+)
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_cancel_during_hedge_delay_stops_the_request():
+    finished = []
+
+    async def handler(request):
+        await asyncio.sleep(1.0)
+        finished.append(request.url)
+        return httpx.Response(200)
+
+    async def scenario():
+        async with _client(handler) as client:
+            task = asyncio.ensure_future(
+                send_with_policy(
+                    client,
+                    "http://spa.test/report",
+                    policy=RequestPolicy(hedge_initial_delay=5.0),
+                    tracker=LatencyTracker(),
+                    budget=RetryBudget(),
+                )
+            )
+            await asyncio.sleep(0.05)
+            assert get_governor().metrics().in_flight == 1
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert get_governor().metrics().in_flight == 0
+            # Give a leaked attempt the time it would need to finish.
+            await asyncio.sleep(1.2)
+
+    asyncio.run(scenario())
+    assert finished == []
+
+
+def test_cancel_while_hedged_cancels_both_attempts():
+    started = []
+
+    async def handler(request):
+        started.append(request.url)
+        await asyncio.sleep(1.0)
+        return httpx.Response(200)
+
+    async def scenario():
+        async with _client(handler) as client:
+            task = asyncio.ensure_future(
+                send_with_policy(
+                    client,
+                    "http://spa.test/report",
+                    policy=RequestPolicy(
+                        hedge_initial_delay=0.05, hedge_min_delay=0.05
+                    ),
+                    tracker=LatencyTracker(),
+                    budget=RetryBudget(),
+                )
+            )
+            await asyncio.sleep(0.2)
+            assert len(started) == 2
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert get_governor().metrics().in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_both_attempts_failing_raises_the_transport_error():
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        raise httpx.ConnectError("down", request=request)
+
+    async def scenario():
+        async with _client(handler) as client:
+            await send_with_policy(
+                client,
+                "http://spa.test/report",
+                policy=RequestPolicy(
+                    hedge_initial_delay=0.01, hedge_min_delay=0.01, max_retries=0
+                ),
+                tracker=LatencyTracker(),
+                budget=RetryBudget(),
+            )
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(scenario())
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+
+from my_dashboard.utils.io_worker import IOWorker
+
+
+@pytest.fixture
+def worker():
+    worker = IOWorker(name="test-io")
+    yield worker
+    worker.shutdown()
+
+
+def test_jobs_run_one_at_a_time_in_submission_order(worker):
+    ran = []
+    for index in range(5):
+        worker.submit(ran.append, index)
+    assert worker.flush(timeout=5)
+    assert ran == [0, 1, 2, 3, 4]
+
+
+def test_queued_writes_with_the_same_key_coalesce(worker):
+    gate = threading.Event()
+    written = []
+
+    def write(text):
+        written.append(text)
+        return len(written)
+
+    worker.submit(gate.wait)
+    first = worker.submit(write, "draft", key="cards.csv")
+    other = worker.submit(write, "users", key="users.csv")
+    latest = worker.submit(write, "final", key="cards.csv")
+    assert worker.pending == 3
+    gate.set()
+
+    # The newest call took the queued one's place and both callers see it.
+    assert first.result(5) == latest.result(5) == 1
+    assert other.result(5) == 2
+    assert written == ["final", "users"]
+
+
+def test_run_awaits_the_result_and_raises_the_job_error(worker):
+    def fail():
+        raise OSError("share tidak tersedia")
+
+    async def scenario():
+        assert await worker.run(sum, [1, 2, 3]) == 6
+        with pytest.raises(OSError, match="share"):
+            await worker.run(fail)
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_finishes_queued_jobs_then_refuses_new_ones(worker):
+    gate = threading.Event()
+    ran = []
+    worker.submit(gate.wait)
+    worker.submit(ran.append, "queued")
+    threading.Timer(0.05, gate.set).start()
+
+    worker.shutdown(timeout=5)
+    assert ran == ["queued"]
+    with pytest.raises(RuntimeError):
+        worker.submit(ran.append, "late")
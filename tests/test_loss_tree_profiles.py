@@ -0,0 +1,42 @@
+import asyncio
+from datetime import date, timedelta
+
+from conftest import loss_tree_url, spa_body
+
+FULL_STOPS = (("Jam", 3, 12.0), ("Changeover", 1, 30.0), ("Sensor", 2, 4.0))
+
+
+def test_metrics_only_refresh_keeps_the_full_result_current(
+    make_controller, spa_server
+):
+    day = date.today() - timedelta(days=2)
+    shown = loss_tree_url("18", day, "1")
+    other = loss_tree_url("18", day, "2", profile="metrics-only")
+    spa_server.set_page(shown, spa_body(60, FULL_STOPS))
+    spa_server.set_page(other, spa_body(70, (("Jam", 1, 1.0),)))
+    exported = []
+
+    async def scenario():
+        controller = make_controller(
+            excel_exporter=lambda rows, **kw: exported.append((rows, kw))
+        )
+        # Get Data, then the achievement refresh for another shift.
+        await controller.fetch_remote_issue_data(shown)
+        metrics = await controller.fetch_remote_issue_data(
+            other, use_cache=True, make_current=False
+        )
+        assert metrics["data_losses"].iloc[0]["PR"] == "70%"
+        assert controller.current_url == shown
+
+        # Auto refresh polls what is shown and gets the full table back.
+        spa_server.set_page(shown, spa_body(61, FULL_STOPS))
+        polled = await controller.poll_remote_issue_data(controller.current_url)
+        assert len(polled["stops_reason"]) == len(FULL_STOPS)
+
+        controller.export_to_excel([], "budi")
+        await controller.aclose()
+
+    asyncio.run(scenario())
+    ((rows, kwargs),) = exported
+    (stops,) = kwargs["once"].values()
+    assert [row[9] for row in stops] == [reason for reason, _, _ in FULL_STOPS]
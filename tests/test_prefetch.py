@@ -0,0 +1,89 @@
+import asyncio
+
+from conftest import wait_for
+
+from my_dashboard.controllers.prefetch import PrefetchScheduler
+from my_dashboard.utils.governor import Priority, request_priority
+
+
+def test_queue_is_deduplicated_trimmed_and_fetched_in_background():
+    fetched = []
+
+    async def fetch(url):
+        fetched.append((url, request_priority.get()))
+
+    async def scenario():
+        scheduler = PrefetchScheduler(fetch, budget=2, idle_delay=0)
+        scheduler.schedule(["a", "", "a", "b", "c"])
+        assert scheduler.pending == ["a", "b"]
+        await wait_for(lambda: len(fetched) == 2)
+        scheduler.cancel()
+
+    asyncio.run(scenario())
+    assert fetched == [("a", Priority.BACKGROUND), ("b", Priority.BACKGROUND)]
+    # The caller's context is untouched.
+    assert request_priority.get() is Priority.USER
+
+
+def test_pause_cancels_the_inflight_fetch_and_resume_retries_it():
+    started, finished = [], []
+    release = None
+
+    async def fetch(url):
+        started.append(url)
+        await release.wait()
+        finished.append(url)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        scheduler = PrefetchScheduler(fetch, idle_delay=0)
+        scheduler.schedule(["a", "b"])
+        await wait_for(lambda: started == ["a"])
+
+        # A user request arrives.
+        scheduler.pause()
+        assert scheduler.pending == ["a", "b"]
+        release.set()
+        await asyncio.sleep(0.05)
+        assert finished == []
+
+        scheduler.resume()
+        await wait_for(lambda: finished == ["a", "b"])
+        scheduler.cancel()
+
+    asyncio.run(scenario())
+    assert started == ["a", "a", "b"]
+
+
+def test_a_failed_prefetch_does_not_stop_the_queue():
+    fetched = []
+
+    async def fetch(url):
+        if url == "broken":
+            raise ValueError("halaman rusak")
+        fetched.append(url)
+
+    async def scenario():
+        scheduler = PrefetchScheduler(fetch, idle_delay=0)
+        scheduler.schedule(["broken", "ok"])
+        await wait_for(lambda: fetched == ["ok"])
+        scheduler.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_zero_budget_never_fetches():
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+
+    async def scenario():
+        scheduler = PrefetchScheduler(fetch, budget=0, idle_delay=0)
+        scheduler.schedule(["a"])
+        await asyncio.sleep(0.02)
+        assert scheduler.pending == []
+
+    asyncio.run(scenario())
+    assert fetched == []
@@ -0,0 +1,21 @@
+import asyncio
+from types import SimpleNamespace
+
+
+def test_full_detail_failure_from_the_processor_shows_a_toast():
+    from my_dashboard.ui.app_window import App
+
+    async def broken_fetch(url, **_):
+        raise KeyError("Reason")
+
+    toasts = []
+    app = App.__new__(App)
+    app.controller = SimpleNamespace(fetch_remote_issue_data=broken_fetch)
+    app._show_toast = lambda **toast: toasts.append(toast)
+    app._merge_issue_table = lambda table: toasts.append("merged")
+
+    asyncio.run(App._load_full_detail(app, "http://spa/loss-tree", None))
+
+    (toast,) = toasts
+    assert toast["bootstyle"] == "danger"
+    assert "Reason" in toast["message"]
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import date, timedelta
+
+from conftest import loss_tree_url, processed, store_at
+
+from my_dashboard.controllers.harvest import shift_end
+from my_dashboard.services.query_planner import stitch_results
+
+
+def test_failed_unit_does_not_abort_the_plan(make_controller, spa_server, result_store):
+    day = date.today() - timedelta(days=3)
+    broken = loss_tree_url("18", day, "2")
+    spa_server.fail(broken)
+    controller = make_controller()
+    plan = controller.plan_history(["LU18"], day, day, granularity="shift")
+
+    report = asyncio.run(controller.execute_plan(plan))
+
+    assert report.total == 3 and report.fetched == 2
+    assert [url for url, _ in report.failed] == [broken]
+    assert report.incomplete == [("18", day.isoformat(), "2")]
+    assert set(report.results) == {
+        ("18", day.isoformat(), "1"),
+        ("18", day.isoformat(), "3"),
+    }
+    # Finished units were kept for the next run.
+    assert result_store.has(loss_tree_url("18", day, "1"))
+
+
+def test_plan_refetches_units_stored_before_they_ended(make_controller, result_store):
+    day = date.today() - timedelta(days=3)
+    for shift, offset in (("1", timedelta(hours=-1)), ("2", timedelta(hours=1))):
+        store_at(
+            result_store,
+            loss_tree_url("18", day, shift),
+            shift_end(day, shift) + offset,
+        )
+
+    controller = make_controller()
+    plan = controller.plan_history(
+        ["LU18"], day, day, shifts=("1", "2"), granularity="shift"
+    )
+    assert [unit.shift for unit in plan.to_fetch] == ["1"]
+
+    report = asyncio.run(controller.execute_plan(plan))
+    assert (report.total, report.skipped, report.fetched) == (2, 1, 1)
+    assert set(report.results) == {
+        ("18", day.isoformat(), "1"),
+        ("18", day.isoformat(), "2"),
+    }
+
+
+def test_stitch_weights_metrics_by_duration():
+    day = processed(50, stops=(("Jam", 2, 5.0),))
+    shift = processed(80, stops=(("Jam", 1, 5.0),))
+
+    stitched = stitch_results([day, shift], [24 * 3600, 8 * 3600])
+
+    metrics = stitched["data_losses"].iloc[0]
+    assert metrics["PR"] == 57.5
+    assert metrics["STOP"] == 3
+    assert stitched["stops_reason"]["Stops"].tolist() == [3]
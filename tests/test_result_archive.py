@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+from conftest import loss_tree_url, processed
+
+from my_dashboard.services.result_archive import ResultArchive
+
+pytest.importorskip("pyarrow")
+
+DAY = date(2026, 10, 1)
+
+
+def test_results_are_archived_typed_and_queryable(tmp_path):
+    archive = ResultArchive(tmp_path)
+    archive.archive(
+        loss_tree_url("18", DAY, "2"),
+        processed(61.5, (("Jam", 3, 12.0), ("Sensor", 1, 2.5))),
+    )
+    archive.archive(loss_tree_url("19", DAY, "2"), processed(70))
+
+    stops = archive.query_stops(line="LU18", date_from=DAY, date_to=DAY)
+    assert stops["reason"].tolist() == ["Jam", "Sensor"]
+    assert stops["stops"].tolist() == [3, 1]
+    assert stops["downtime"].tolist() == [12.0, 2.5]
+    assert set(stops["func_location"]) == {"PACK"}
+    assert list((tmp_path / "stops_reason").glob("line=18/month=2026-10/*.parquet"))
+
+    losses = archive.query_losses(shift="Shift 2")
+    assert sorted(losses["pr"].tolist()) == [61.5, 70.0]
+    assert archive.query_stops(reason="Sensor")["line"].tolist() == ["18"]
+
+
+def test_archiving_a_shift_again_replaces_its_rows(tmp_path):
+    archive = ResultArchive(tmp_path)
+    url = loss_tree_url("18", DAY, "1")
+    archive.archive(url, processed(50, (("Jam", 1, 1.0), ("Sensor", 1, 1.0))))
+    archive.archive(url, processed(55, (("Jam", 4, 9.0),)))
+    archive.archive(loss_tree_url("18", DAY, "1", "MAKE"), processed(40))
+
+    stops = archive.query_stops(line="18", func_location="PACK")
+    assert stops[["reason", "stops"]].values.tolist() == [["Jam", 4]]
+    assert archive.query_losses(line="18", func_location="PACK")["pr"].tolist() == [
+        55.0
+    ]
+
+
+def test_truncated_profiles_and_other_urls_keep_stops_out(tmp_path):
+    archive = ResultArchive(tmp_path)
+    url = loss_tree_url("18", DAY, "3")
+    archive.archive(url, processed(60, (("Jam", 3, 12.0), ("Sensor", 1, 2.5))))
+    archive.archive(
+        loss_tree_url("18", DAY, "3", profile="preview"),
+        processed(62, (("Jam", 3, 12.0),)),
+    )
+    assert archive.archive("http://ots.app.pmi/db.aspx?table=Equipment", {}) == []
+
+    # The preview never replaced the complete list, but its metrics count.
+    assert archive.query_stops(line="18")["reason"].tolist() == ["Jam", "Sensor"]
+    assert archive.query_losses(line="18")["pr"].tolist() == [62.0]
+
+
+def test_querying_an_empty_archive_returns_no_rows(tmp_path):
+    stops = ResultArchive(tmp_path).query_stops(line="18")
+    assert stops.empty
+    assert {"reason", "stops", "line"} <= set(stops.columns)
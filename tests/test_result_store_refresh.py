@@ -0,0 +1,80 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+from conftest import loss_tree_url, processed, store_at
+
+from my_dashboard.controllers import CircuitOpenError
+from my_dashboard.controllers.harvest import shift_end
+from my_dashboard.utils.http_policy import CircuitBreaker
+
+
+def test_harvest_refetches_results_stored_before_the_shift_ended(
+    make_controller, spa_server, result_store
+):
+    controller = make_controller()
+    day = date.today() - timedelta(days=2)
+    end = shift_end(day, "2")
+    partial = loss_tree_url("18", day, "2", "PACK")
+    complete = loss_tree_url("18", day, "2", "MAKE")
+    store_at(result_store, partial, end - timedelta(hours=1))
+    store_at(result_store, complete, end + timedelta(minutes=10))
+
+    report = asyncio.run(controller.harvest_shift(day, "2", ["LU18"]))
+
+    assert spa_server.requested(partial) == 1
+    assert spa_server.requested(complete) == 0
+    assert report.skipped == 1 and report.fetched == 1
+    assert result_store.saved_at(partial) >= end
+
+
+def test_backfill_skips_open_shifts_and_never_stores_them(
+    make_controller, spa_server, result_store
+):
+    controller = make_controller()
+    today = date.today()
+
+    report = asyncio.run(
+        controller.backfill_history(
+            "18", "PACK", today - timedelta(days=1), today + timedelta(days=1)
+        )
+    )
+
+    now = datetime.now()
+    days = (today - timedelta(days=1), today, today + timedelta(days=1))
+    expected = [
+        loss_tree_url("18", day, shift, "PACK")
+        for day in days
+        for shift in (1, 2, 3)
+        if shift_end(day, shift) <= now
+    ]
+    assert len(spa_server.requests) == len(expected)
+    assert all(spa_server.requested(url) == 1 for url in expected)
+    assert report.total == len(expected)
+    assert all(result_store.has(url) for url in expected)
+
+
+def test_open_circuit_offers_the_stored_result_after_a_restart(
+    make_controller, spa_server, result_store
+):
+    url = loss_tree_url("18", date.today() - timedelta(days=2), "1")
+    saved = datetime.now().replace(microsecond=0) - timedelta(hours=3)
+    store_at(result_store, url, saved, processed(55))
+    spa_server.fail(url)
+
+    async def scenario():
+        # A fresh controller: nothing fetched yet this session.
+        controller = make_controller(
+            circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        )
+        with pytest.raises(httpx.ConnectError):
+            await controller.fetch_remote_issue_data(url)
+        with pytest.raises(CircuitOpenError) as raised:
+            await controller.fetch_remote_issue_data(url)
+        await controller.aclose()
+        return raised.value
+
+    error = asyncio.run(scenario())
+    assert error.stale["data_losses"].iloc[0]["PR"] == "55%"
+    assert error.stale_since == saved
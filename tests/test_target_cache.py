@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from my_dashboard.services.achievement_service import TargetCache
+
+
+def _write_targets(path, *rows):
+    lines = ["Metric,Shift 1,Shift 2", *(",".join(row) for row in rows)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_lookups_reuse_the_table_until_the_file_changes(tmp_path):
+    path = tmp_path / "target_pack_18.csv"
+    _write_targets(path, ("PR", "80%", "75%"))
+    cache = TargetCache(tmp_path)
+
+    table = cache.table("LU18", "PACK")
+    assert table.values["Shift 1"] == ["80"]
+    assert table.numbers["Shift 2"] == [75.0]
+    assert cache.table("18", "pack") is table
+
+    # Edited outside the app.
+    _write_targets(path, ("PR", "85%", "75%"), ("MTBF", "n/a", "40"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, table.mtime_ns + 1_000_000))
+    reread = cache.table("LU18", "PACK")
+    assert reread.values["Shift 1"] == ["85", "n/a"]
+    assert reread.numbers["Shift 1"] == [85.0, None]
+
+
+def test_preload_reads_every_target_file(tmp_path):
+    _write_targets(tmp_path / "target_pack_18.csv", ("PR", "80", "75"))
+    _write_targets(tmp_path / "target_make_18.csv", ("PR", "70", "65"))
+    (tmp_path / "notes.csv").write_text("x\n", encoding="utf-8")
+    (tmp_path / "target_empty_19.csv").write_text("", encoding="utf-8")
+    cache = TargetCache(tmp_path)
+
+    assert cache.preload() == 2
+    assert cache.table("LU18", "MAKE").values["Shift 2"] == ["65"]
+
+
+def test_store_updates_the_table_the_editor_saved(tmp_path):
+    path = tmp_path / "target_pack_18.csv"
+    _write_targets(path, ("PR", "80", "75"))
+    cache = TargetCache(tmp_path)
+    cache.table("LU18", "PACK")
+
+    # What the target editor does after saving; the rows it passes are kept
+    # as they are, the file is not parsed again.
+    _write_targets(path, ("PR", "90", "75"))
+    cache.store(str(path), ["Metric", "Shift 1", "Shift 2"], [["PR", "90%", "75"]])
+    table = cache.table("LU18", "PACK")
+    assert table.values["Shift 1"] == ["90"]
+    assert table.numbers["Shift 1"] == [90.0]
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(OSError):
+        TargetCache(tmp_path).table("LU20", "PACK")
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from my_dashboard.utils.timing import RequestTimingRecorder, attach_timing
+
+
+def _get(recorder, handler, *urls):
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with attach_timing(client, recorder):
+            for url in urls:
+                await client.get(url)
+
+    asyncio.run(scenario())
+
+
+def test_ntlm_legs_form_one_logical_request():
+    def handler(request):
+        if "authorization" not in request.headers:
+            return httpx.Response(401, headers={"WWW-Authenticate": "NTLM"})
+        return httpx.Response(200, text="ok")
+
+    class OneLegAuth(httpx.Auth):
+        def auth_flow(self, request):
+            response = yield request
+            if response.status_code == 401:
+                request.headers["Authorization"] = "NTLM abc"
+                yield request
+
+    recorder = RequestTimingRecorder()
+
+    async def scenario():
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), auth=OneLegAuth()
+        )
+        async with attach_timing(client, recorder):
+            await client.get("http://spa.test/report")
+
+    asyncio.run(scenario())
+
+    (timing,) = recorder.history()
+    assert [leg.status for leg in timing.legs] == [401, 200]
+    assert timing.status == 200
+    assert recorder.latest("http://spa.test/report") is timing
+
+
+def test_slow_requests_are_logged(tmp_path):
+    log = tmp_path / "slow_requests.log"
+    recorder = RequestTimingRecorder(slow_threshold=0.0, slow_log_path=log)
+
+    _get(recorder, lambda request: httpx.Response(200), "http://spa.test/a")
+
+    assert len(recorder.slow_requests) == 1
+    assert log.read_text(encoding="utf-8").rstrip().endswith("http://spa.test/a")
+
+
+def test_dns_is_not_measured_unless_asked():
+    recorder = RequestTimingRecorder()
+
+    _get(recorder, lambda request: httpx.Response(200), "http://spa.test/a")
+
+    assert recorder.measure_dns is False
+    assert recorder.history()[0].dns == 0.0
@@ -0,0 +1,62 @@
+import asyncio
+import re
+from pathlib import Path
+
+import httpx
+import pytest
+
+from my_dashboard.utils.governor import get_governor
+from my_dashboard.utils.transport import RecordingTransport, ReplayTransport, main
+
+PAGE = (Path(__file__).resolve().parents[1] / "assets" / "spa1.html").read_bytes()
+
+
+def _record(cassette_dir, urls):
+    def serve(request):
+        return httpx.Response(200, content=PAGE)
+
+    async def scenario():
+        transport = RecordingTransport(cassette_dir, httpx.MockTransport(serve))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for url in urls:
+                (await client.get(url)).raise_for_status()
+
+    asyncio.run(scenario())
+
+
+def test_replay_serves_the_recorded_body(tmp_path):
+    url = "http://spa.test/report?line=18"
+    _record(tmp_path, [url])
+
+    async def scenario():
+        transport = ReplayTransport(tmp_path, latency_scale=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get(url)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.content == PAGE
+
+
+def test_replay_of_unrecorded_url_fails_like_a_dead_host(tmp_path):
+    async def scenario():
+        transport = ReplayTransport(tmp_path)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("http://spa.test/missing")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(scenario())
+
+
+def test_benchmark_is_not_throttled_by_the_governor(tmp_path, capsys):
+    _record(tmp_path, [f"http://spa.test/report?shift={n}" for n in range(8)])
+    # The app's default limits: 2 requests per second, burst of 4.
+    get_governor().configure(rate=2.0, burst=4, max_in_flight=4)
+
+    asyncio.run(main(str(tmp_path), latency_scale=0))
+
+    fetches = [
+        float(t) for t in re.findall(r"fetch\s+([\d.]+)s", capsys.readouterr().out)
+    ]
+    assert len(fetches) == 8
+    assert max(fetches) < 0.2
@@ -0,0 +1,44 @@
+import time
+
+from my_dashboard.utils.user_registry import UserRegistry
+
+
+def test_new_names_are_appended_once_and_read_back(tmp_path):
+    path = tmp_path / "users.csv"
+    registry = UserRegistry(path, flush_delay=60)
+    assert registry.add(" budi ")
+    assert registry.add("ani")
+    assert not registry.add("budi")
+    assert not registry.add("  ")
+    assert registry.names() == ["ani", "budi"]
+    # Nothing is written until the flush.
+    assert not path.exists()
+
+    registry.flush()
+    assert path.read_text(encoding="utf-8") == "username\nbudi\nani\n"
+    assert "ani" in UserRegistry(path)
+
+
+def test_append_keeps_existing_rows_without_a_trailing_newline(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text("username\nsiti", encoding="utf-8")
+    registry = UserRegistry(path, flush_delay=60)
+    assert "siti" in registry
+    registry.add("dewi")
+    registry.flush()
+    assert path.read_text(encoding="utf-8") == "username\nsiti\ndewi\n"
+
+
+def test_a_burst_of_additions_is_flushed_in_the_background(tmp_path):
+    path = tmp_path / "users.csv"
+    registry = UserRegistry(path, flush_delay=0.05)
+    for name in ("a", "b", "c"):
+        registry.add(name)
+
+    expected = "username\na\nb\nc\n"
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if path.exists() and path.read_text(encoding="utf-8") == expected:
+            break
+        time.sleep(0.01)
+    assert path.read_text(encoding="utf-8") == expected
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import date, timedelta
+
+from conftest import loss_tree_url, wait_for
+
+
+def test_prefetched_neighbour_answers_get_data(make_controller, spa_server):
+    day = (date.today() - timedelta(days=2)).isoformat()
+    make = loss_tree_url("18", day, "2", "MAKE")
+
+    async def scenario():
+        controller = make_controller()
+        queued = controller.prefetch_neighbours("18", day, "2", "PACK")
+        assert make in queued
+        await wait_for(lambda: controller.has_local_result(make))
+
+        await controller.fetch_remote_issue_data(make)
+        await controller.aclose()
+
+    asyncio.run(scenario())
+    assert spa_server.requested(make) == 1
+
+
+def test_running_shift_neighbour_is_served_only_briefly(make_controller, spa_server):
+    today = date.today().isoformat()
+    make = loss_tree_url("18", today, "3", "MAKE")
+
+    async def scenario():
+        controller = make_controller(running_prefetch_ttl=0.3)
+        assert make in controller.prefetch_neighbours("18", today, "3", "PACK")
+        await wait_for(lambda: controller.has_local_result(make))
+
+        await asyncio.sleep(0.35)
+        assert not controller.has_local_result(make)
+        await controller.fetch_remote_issue_data(make)
+        assert spa_server.requested(make) == 2
+        await controller.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_expired_neighbour_is_prefetched_again(make_controller, spa_server):
+    day = (date.today() - timedelta(days=2)).isoformat()
+    make = loss_tree_url("18", day, "2", "MAKE")
+
+    async def scenario():
+        controller = make_controller(prefetch_ttl=0.1)
+        controller.prefetch_neighbours("18", day, "2", "PACK")
+        await wait_for(lambda: spa_server.requested(make) == 1)
+        await asyncio.sleep(0.15)
+
+        assert make in controller.prefetch_neighbours("18", day, "2", "PACK")
+        await wait_for(lambda: spa_server.requested(make) == 2)
+        await controller.aclose()
+
+    asyncio.run(scenario())